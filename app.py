@@ -1,5 +1,6 @@
 import streamlit as st
 from services.auth_service import login_by_cpf, logout
+from services import outbox, tracing
 import time
 
 st.set_page_config(page_title="Trek - Celular por Assinatura", page_icon="📱", layout="centered")
@@ -11,6 +12,9 @@ st.set_page_config(page_title="Trek - Celular por Assinatura", page_icon="📱",
 if "logged_in" not in st.session_state:
     st.session_state["logged_in"] = False
 
+# Delivers notifications queued before a restart (pages: require_auth)
+outbox.start_worker()
+
 def main():
     if st.session_state["logged_in"]:
         user = st.session_state["user"]
@@ -52,4 +56,6 @@ def main():
             st.warning("Por favor, preencha CPF e Data de Nascimento.")
 
 if __name__ == "__main__":
+    tracing.begin_rerun("Login")
     main()
+    tracing.end_rerun()
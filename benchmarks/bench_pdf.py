@@ -0,0 +1,63 @@
+"""
+Benchmark: full fpdf layout vs the cached contract template.
+
+Usage:
+    python benchmarks/bench_pdf.py [documents]
+"""
+import sys
+import os
+import time
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services import pdf_service
+
+def make_items(count: int):
+    return [
+        ({
+            "name": f"Funcionário {i}", "cpf": f"{i:011d}",
+            "address": f"Rua Exemplo, {i} - Centro - CEP 01001000",
+            "phone": "11999999999", "email": f"func{i}@empresa.com",
+            "start_date": "01/01/2024", "end_date": "01/10/2025", "months": 21,
+            "value_monthly_total": 149.9, "residual_value": 300
+        }, {
+            "brand": "Samsung", "model": "Galaxy S23",
+            "description": "128GB, Tela 6.1", "imei": f"35{i:013d}"
+        }, {})
+        for i in range(count)
+    ]
+
+# Every variant keeps its output, as a real caller would.
+def run_legacy(items):
+    return [
+        pdf_service._render_with_fpdf(pdf_service._contract_fields(contract_data, product_data))
+        for contract_data, product_data, _ in items
+    ]
+
+def run_single(items):
+    return [pdf_service.render_contract_pdf(*item) for item in items]
+
+def run_batch(items):
+    return pdf_service.render_contract_pdfs(items)
+
+def best_of(fn, items, repeat: int = 5) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(items)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    items = make_items(count)
+    pdf_service.get_template()
+
+    legacy = best_of(run_legacy, items)
+    print(f"documents={count}")
+    print(f"fpdf layout:     {legacy / count * 1e6:8.1f} us/doc")
+    for name, fn in [("template single", run_single), ("template batch", run_batch)]:
+        elapsed = best_of(fn, items)
+        print(f"{name}: {elapsed / count * 1e6:8.1f} us/doc  ({legacy / elapsed:.1f}x)")
+
+if __name__ == "__main__":
+    main()
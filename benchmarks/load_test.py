@@ -0,0 +1,384 @@
+"""
+Load test: concurrent simulated sessions through the signup-to-dispatch flow.
+
+Each employee session logs in, opens the Store, picks a phone and signs the
+contract (CEP lookup included); then dispatcher sessions link an IMEI to
+every new order and mark it dispatched. Sessions are driven with Streamlit's
+AppTest, in-process, against the embedded SQLite database and local
+stand-ins for BrasilAPI, product images and SMTP, so the numbers measure
+the app itself. Latencies include the pauses the pages script themselves
+(time.sleep before redirects).
+
+Usage (with benchmarks/requirements.txt installed):
+    python benchmarks/load_test.py [--sessions 50] [--concurrency 10] [--dispatchers 2] [--json FILE]
+"""
+import sys
+import os
+import argparse
+import datetime
+import glob
+import json
+import resource
+import tempfile
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager, nullcontext
+from unittest.mock import MagicMock
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import streamlit
+from streamlit.runtime import Runtime
+from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+from streamlit.runtime.dataframe_source_manager import DataframeSourceManager
+from streamlit.runtime.media_file_manager import MediaFileManager
+from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+from streamlit.runtime.pages_manager import PagesManager
+from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+from streamlit.testing.v1 import AppTest, app_test, local_script_runner
+from streamlit.testing.v1.util import patch_config_options
+from services import catalog_service, image_service, outbox
+from services.documents import imei_for_serial
+from services.storage import LocalContentStore, get_storage, set_storage
+from services.supabase_client import get_supabase
+import stubs
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+APP = os.path.join(ROOT, "app.py")
+STORE = "pages/3_Store.py"
+CONTRACT = "pages/5_Contract.py"
+DISPATCH = "pages/4_Dispatch.py"
+PAGES = ("Login", "Store", "Contract", "Dispatch")
+
+RERUN_TIMEOUT = 60
+# shared_runtime() replaces Streamlit internals; only this release is known to work
+STREAMLIT_VERSION = "1.65.0"
+DISPATCH_LOGIN = ("99988877766", datetime.date(1985, 10, 10))  # seed.sql
+EMPLOYEE_BIRTH_DATE = datetime.date(1990, 1, 1)                # stubs.sqlite_database
+
+
+def percentile(values, q: float):
+    """Nearest-rank percentile (q in 0..100) of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * q // 100))
+    return ordered[int(rank) - 1]
+
+def rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        # ru_maxrss is the peak, in KiB on Linux (bytes on macOS)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class MemorySampler(threading.Thread):
+    """Samples the process RSS (the AppTest "server") while the test runs."""
+
+    def __init__(self, interval: float = 0.1):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.start_rss = self.peak_rss = rss_bytes()
+        self._stopping = threading.Event()
+
+    def run(self):
+        while not self._stopping.wait(self.interval):
+            self.peak_rss = max(self.peak_rss, rss_bytes())
+
+    def stop(self) -> dict:
+        self._stopping.set()
+        self.join()
+        end = rss_bytes()
+        return {"start_mb": self.start_rss / 2**20, "peak_mb": max(self.peak_rss, end) / 2**20, "end_mb": end / 2**20}
+
+
+@contextmanager
+def shared_runtime():
+    """
+    AppTest swaps process-wide state on every run (the Runtime singleton,
+    the pages-directory flag, config options) and resets it when the run
+    ends, which breaks the other sessions running in this process at that
+    moment. While active, AppTest writes that state on throwaway
+    subclasses, and one Runtime and one script bytecode cache serve every
+    session, as in a real server. Every page is compiled into that cache up
+    front: CPython < 3.11.8 can fail to parse while other threads compile
+    (e.g. lazy imports during a session's first rerun).
+    """
+    if streamlit.__version__ != STREAMLIT_VERSION:
+        raise RuntimeError(
+            f"The load test patches Streamlit {STREAMLIT_VERSION} internals (AppTest, Runtime, "
+            f"PagesManager); installed: {streamlit.__version__}. Install benchmarks/requirements.txt "
+            f"(streamlit=={STREAMLIT_VERSION}) or update shared_runtime() for this release."
+        )
+
+    class _Runtime(Runtime):
+        pass
+
+    class _PagesManager(PagesManager):
+        pass
+
+    runtime = MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    runtime.dataframe_source_mgr = DataframeSourceManager()
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+
+    script_cache = ScriptCache()
+
+    previous = (app_test.Runtime, app_test.PagesManager, app_test.ScriptCache, app_test.patch_config_options,
+                local_script_runner.ScriptCache)
+    previous_state = (Runtime._instance, PagesManager.uses_pages_directory)
+    Runtime._instance = runtime
+    PagesManager.uses_pages_directory = True
+    app_test.Runtime, app_test.PagesManager = _Runtime, _PagesManager
+    # Pages are compiled through the PagesManager's cache, the main script
+    # through the runner's own
+    app_test.ScriptCache = local_script_runner.ScriptCache = lambda: script_cache
+    app_test.patch_config_options = lambda options: nullcontext()
+    try:
+        with patch_config_options({"global.appTest": True}):
+            for script in [APP, *sorted(glob.glob(os.path.join(ROOT, "pages", "*.py")))]:
+                script_cache.get_bytecode(script)
+            yield runtime
+    finally:
+        (app_test.Runtime, app_test.PagesManager, app_test.ScriptCache, app_test.patch_config_options,
+         local_script_runner.ScriptCache) = previous
+        Runtime._instance, PagesManager.uses_pages_directory = previous_state
+
+
+class Recorder:
+    def __init__(self):
+        self.samples = {page: [] for page in PAGES}
+        self.errors = []
+        self._lock = threading.Lock()
+
+    def rerun(self, page: str, at: AppTest):
+        """Runs one rerun of `at`, timing it under `page`."""
+        start = time.perf_counter()
+        at.run(timeout=RERUN_TIMEOUT)
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.samples[page].append(elapsed)
+        if at.exception:
+            raise RuntimeError(f"{page}: {at.exception[0].message}")
+        return at
+
+    def error(self, session: str):
+        with self._lock:
+            self.errors.append(f"{session}: {traceback.format_exc(limit=3)}")
+
+
+def _describe(at: AppTest) -> str:
+    titles = [t.value for t in at.title]
+    messages = [e.value for e in at.error] + [w.value for w in at.warning]
+    return f"titles={titles} messages={messages}"
+
+def _text_input(at: AppTest, label: str):
+    return next(t for t in at.text_input if t.label == label)
+
+def _button(at: AppTest, label: str):
+    return next(b for b in at.button if b.label == label)
+
+def login(at: AppTest, recorder: Recorder, cpf: str, birth_date: datetime.date):
+    recorder.rerun("Login", at)
+    at.text_input[0].input(cpf)
+    at.date_input[0].set_value(birth_date)
+    at.button[0].click()
+    recorder.rerun("Login", at)  # redirects to the Store
+    if not at.session_state["logged_in"]:
+        raise RuntimeError(f"Login failed for {cpf}")
+
+def employee_session(index: int, recorder: Recorder):
+    at = AppTest.from_file(APP, default_timeout=RERUN_TIMEOUT)
+    login(at, recorder, stubs.make_cpf(index), EMPLOYEE_BIRTH_DATE)
+
+    at.switch_page(STORE)
+    recorder.rerun("Store", at)
+    choices = [b for b in at.button if b.label == "Escolher este"]
+    if not choices:
+        raise RuntimeError(f"Store: no products ({_describe(at)})")
+    choices[index % len(choices)].click()
+    recorder.rerun("Store", at)  # redirects to the Contract page
+
+    at.switch_page(CONTRACT)
+    recorder.rerun("Contract", at)
+    at.checkbox[0].check()
+    recorder.rerun("Contract", at)
+    if "cep_input_temp" not in [t.key for t in at.text_input]:
+        raise RuntimeError(f"Contract: form not shown ({_describe(at)})")
+    at.text_input(key="cep_input_temp").input("01001-000")
+    _button(at, "Buscar CEP").click()
+    recorder.rerun("Contract", at)
+    _text_input(at, "Número").input(str(100 + index))
+    _text_input(at, "E-mail").input(f"func{index}@empresa.com")
+    _text_input(at, "Celular (com DDD)").input("11999999999")
+    _button(at, "Finalizar e Assinar").click()
+    recorder.rerun("Contract", at)  # signs, then redirects away
+    user_id = at.session_state["user"]["id"]
+    if not get_supabase().table("orders").select("id").eq("user_id", user_id).execute().data:
+        raise RuntimeError(f"Contract: no order created ({_describe(at)})")
+
+def dispatcher_session(index: int, dispatchers: int, recorder: Recorder) -> int:
+    """
+    Links an IMEI to, then dispatches, every pending order assigned to this
+    dispatcher (orders are split between dispatchers by ID). Returns the
+    number of orders dispatched.
+    """
+    def mine(key: str) -> bool:
+        return int(key.rsplit("_", 1)[-1].replace("-", ""), 16) % dispatchers == index
+
+    at = AppTest.from_file(APP, default_timeout=RERUN_TIMEOUT)
+    login(at, recorder, *DISPATCH_LOGIN)
+    at.switch_page(DISPATCH)
+    recorder.rerun("Dispatch", at)
+
+    serial = index * 10**6
+    while True:
+        pending = [t for t in at.text_input if (t.key or "").startswith("imei_") and mine(t.key)]
+        if not pending:
+            break
+        serial += 1
+        pending[0].input(imei_for_serial(serial))
+        at.button(key=f"btn_imei_{pending[0].key[len('imei_'):]}").click()
+        recorder.rerun("Dispatch", at)
+
+    dispatched = 0
+    while True:
+        ready = [b for b in at.button if (b.key or "").startswith("btn_disp_") and mine(b.key)]
+        if not ready:
+            break
+        ready[0].click()
+        recorder.rerun("Dispatch", at)
+        dispatched += 1
+    return dispatched
+
+def _environment(stack: ExitStack, sessions: int):
+    stack.enter_context(shared_runtime())
+    tmp = stack.enter_context(tempfile.TemporaryDirectory())
+    db = stack.enter_context(stubs.sqlite_database(sessions))
+    base_url = stack.enter_context(stubs.brasilapi_stub())
+    stack.enter_context(stubs.isolated_cep_cache())
+    sent = stack.enter_context(stubs.email_sink())
+
+    previous_storage, previous_thumbs = get_storage(), image_service.THUMB_DIR
+    set_storage(LocalContentStore(os.path.join(tmp, "contracts")))
+    image_service.THUMB_DIR = os.path.join(tmp, "thumbnails")
+    image_service._memory_cache.clear()
+
+    def restore():
+        outbox.stop_worker()
+        set_storage(previous_storage)
+        image_service.THUMB_DIR = previous_thumbs
+        image_service._memory_cache.clear()
+        catalog_service.bump_catalog_version()
+    stack.callback(restore)
+
+    # Product photos come from the local stand-in
+    for i, product in enumerate(db.table("products").select("id").execute().data):
+        db.table("products").update({"image_url": f"{base_url}/images/{i}.png"}).eq("id", product["id"]).execute()
+    catalog_service.bump_catalog_version()
+    outbox.reset_metrics()
+    return db, sent
+
+def run_load_test(sessions: int = 50, concurrency: int = 10, dispatchers: int = 2) -> dict:
+    recorder = Recorder()
+    with ExitStack() as stack:
+        db, sent = _environment(stack, sessions)
+        sampler = MemorySampler()
+        sampler.start()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as pool:
+            futures = [pool.submit(employee_session, i, recorder) for i in range(sessions)]
+            for i, future in enumerate(futures):
+                try:
+                    future.result()
+                except Exception:
+                    recorder.error(f"employee {i}")
+        signup_time = time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(dispatchers) as pool:
+            futures = [pool.submit(dispatcher_session, i, dispatchers, recorder) for i in range(dispatchers)]
+            dispatched = 0
+            for i, future in enumerate(futures):
+                try:
+                    dispatched += future.result()
+                except Exception:
+                    recorder.error(f"dispatcher {i}")
+        dispatch_time = time.perf_counter() - started
+
+        # Give the outbox a moment to drain the confirmations
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline and db.table("email_outbox").select("id").eq("status", "pending").execute().data:
+            outbox.ensure_worker()
+            time.sleep(0.2)
+        memory = sampler.stop()
+        orders = db.table("orders").select("status").execute().data
+
+    reruns = sum(len(v) for v in recorder.samples.values())
+    return {
+        "sessions": sessions,
+        "concurrency": concurrency,
+        "dispatchers": dispatchers,
+        "pages": {
+            page: {
+                "reruns": len(samples),
+                "p50_ms": percentile(samples, 50) * 1e3,
+                "p95_ms": percentile(samples, 95) * 1e3,
+                "p99_ms": percentile(samples, 99) * 1e3,
+                "max_ms": max(samples) * 1e3,
+            }
+            for page, samples in recorder.samples.items() if samples
+        },
+        "throughput": {
+            # Signed contracts: every order the signup phase took past "created"
+            "signups_per_min": sum(o["status"] != "created" for o in orders) / signup_time * 60,
+            "dispatches_per_min": dispatched / dispatch_time * 60 if dispatch_time else 0.0,
+            "reruns_per_s": reruns / (signup_time + dispatch_time),
+            "signup_seconds": signup_time,
+            "dispatch_seconds": dispatch_time,
+        },
+        "orders": {status: sum(o["status"] == status for o in orders) for status in {o["status"] for o in orders}},
+        "emails": {"sent": len(sent), **outbox.get_metrics()},
+        "memory": memory,
+        "errors": recorder.errors,
+    }
+
+def print_report(report: dict):
+    print(f"sessions={report['sessions']} concurrency={report['concurrency']} dispatchers={report['dispatchers']}")
+    print(f"\n{'page':10s} {'reruns':>7s} {'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s} {'max ms':>9s}")
+    for page, s in report["pages"].items():
+        print(f"{page:10s} {s['reruns']:7d} {s['p50_ms']:9.1f} {s['p95_ms']:9.1f} {s['p99_ms']:9.1f} {s['max_ms']:9.1f}")
+    t = report["throughput"]
+    print(f"\nsignups:    {t['signups_per_min']:8.1f}/min ({t['signup_seconds']:.1f}s)")
+    print(f"dispatches: {t['dispatches_per_min']:8.1f}/min ({t['dispatch_seconds']:.1f}s)")
+    print(f"reruns:     {t['reruns_per_s']:8.1f}/s")
+    print(f"orders:     {report['orders']}")
+    print(f"emails:     {report['emails']['sent']} sent")
+    m = report["memory"]
+    print(f"memory:     {m['start_mb']:.0f} MB -> peak {m['peak_mb']:.0f} MB (end {m['end_mb']:.0f} MB)")
+    if report["errors"]:
+        print(f"\n{len(report['errors'])} sessions failed:")
+        for error in report["errors"]:
+            print(error)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=50, help="Employees signing up")
+    parser.add_argument("--concurrency", type=int, default=10, help="Simultaneous employee sessions")
+    parser.add_argument("--dispatchers", type=int, default=2)
+    parser.add_argument("--json", help="Also write the report to this file")
+    args = parser.parse_args(argv)
+
+    report = run_load_test(args.sessions, args.concurrency, args.dispatchers)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 1 if report["errors"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+"""
+Runs the benchmark suite and compares results against saved baselines.
+
+Usage:
+    python benchmarks/run.py [-k pattern] [--save NAME]
+    python benchmarks/run.py compare BASELINE [CURRENT] [--threshold 0.1]
+    python benchmarks/run.py list
+
+Results are stored as JSON in benchmarks/results/<NAME>.json. `compare`
+measures the current tree when CURRENT is omitted, and exits with status 1
+when any benchmark's median got slower than the baseline by more than the
+threshold (10% by default).
+"""
+import sys
+import os
+import argparse
+import datetime
+import fnmatch
+import json
+import platform
+import subprocess
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import suite
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+DEFAULT_THRESHOLD = 0.10
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=os.path.dirname(RESULTS_DIR), timeout=10
+        ).stdout.strip() or None
+    except Exception:
+        return None
+
+def _path(name: str) -> str:
+    if name.endswith(".json") or os.sep in name:
+        return name
+    return os.path.join(RESULTS_DIR, f"{name}.json")
+
+def load(name: str) -> dict:
+    with open(_path(name), encoding="utf-8") as f:
+        return json.load(f)
+
+def save(name: str, results: dict) -> str:
+    path = _path(name)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+    return path
+
+def select(patterns) -> list:
+    names = sorted(suite.BENCHMARKS)
+    if not patterns:
+        return names
+    return [n for n in names if any(fnmatch.fnmatch(n, p) or p in n for p in patterns)]
+
+def _print_result(name, result):
+    print(f"{name:40s} {result['median'] * 1e3:10.3f} ms  (min {result['min'] * 1e3:.3f}, "
+          f"±{result['stdev'] * 1e3:.3f}, {result['rounds']}x{result['calls']})", flush=True)
+
+def measure(names, rounds: int, min_time: float) -> dict:
+    return {
+        "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "revision": _git_revision(),
+        "python": platform.python_version(),
+        "machine": f"{platform.system()} {platform.machine()} ({os.cpu_count()} cpus)",
+        "benchmarks": suite.run(names, rounds, min_time, report=_print_result),
+    }
+
+def compare(baseline: dict, current: dict, threshold: float = DEFAULT_THRESHOLD) -> list:
+    """
+    Compares medians benchmark by benchmark.
+
+    Returns:
+        list: (name, baseline_median, current_median, change, status) with
+              status "regression", "improvement", "ok", "new" or "missing".
+    """
+    rows = []
+    base, curr = baseline["benchmarks"], current["benchmarks"]
+    for name in sorted(set(base) | set(curr)):
+        if name not in curr:
+            rows.append((name, base[name]["median"], None, None, "missing"))
+            continue
+        if name not in base:
+            rows.append((name, None, curr[name]["median"], None, "new"))
+            continue
+        before, after = base[name]["median"], curr[name]["median"]
+        change = after / before - 1 if before else 0.0
+        if change > threshold:
+            status = "regression"
+        elif change < -threshold:
+            status = "improvement"
+        else:
+            status = "ok"
+        rows.append((name, before, after, change, status))
+    return rows
+
+def _ms(value):
+    return f"{value * 1e3:10.3f}" if value is not None else f"{'-':>10s}"
+
+def print_comparison(rows):
+    print(f"{'benchmark':40s} {'base ms':>10s} {'now ms':>10s} {'change':>8s}")
+    for name, before, after, change, status in rows:
+        change_text = f"{change:+8.1%}" if change is not None else f"{'':8s}"
+        flag = "" if status == "ok" else f"  {status.upper()}"
+        print(f"{name:40s} {_ms(before)} {_ms(after)} {change_text}{flag}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", nargs="?", default="run", choices=["run", "compare", "list"])
+    parser.add_argument("names", nargs="*", help="compare: BASELINE [CURRENT]")
+    parser.add_argument("-k", dest="patterns", action="append", help="Only benchmarks matching (repeatable)")
+    parser.add_argument("--save", help="Store the results under this name")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.05, help="Seconds per round")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    if args.command == "list":
+        for name in select(args.patterns):
+            print(name)
+        return 0
+
+    if args.command == "compare":
+        if not args.names:
+            parser.error("compare needs a BASELINE")
+        baseline = load(args.names[0])
+        if args.patterns:
+            selected = set(select(args.patterns))
+            baseline["benchmarks"] = {k: v for k, v in baseline["benchmarks"].items() if k in selected}
+        if len(args.names) > 1:
+            current = load(args.names[1])
+        else:
+            names = [n for n in select(args.patterns) if n in baseline["benchmarks"]]
+            current = measure(names, args.rounds, args.min_time)
+            print()
+        if args.save:
+            print(f"Saved {save(args.save, current)}")
+        rows = compare(baseline, current, args.threshold)
+        print_comparison(rows)
+        return 1 if any(row[4] == "regression" for row in rows) else 0
+
+    results = measure(select(args.patterns), args.rounds, args.min_time)
+    if args.save:
+        print(f"Saved {save(args.save, results)}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+"""
+Local stand-ins for the external services, so benchmarks measure our code
+rather than the network.
+"""
+import sys
+import os
+import io
+import json
+import tempfile
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from PIL import Image
+from services import http_client, email_service, cep_service
+from services.cache import SQLiteCache, TTLCache
+from services.documents import cpf_check_digits
+from services.sqlite_backend import SQLiteClient, SEED_COMPANY_ID as COMPANY_ID
+from services.supabase_client import SupabaseService
+
+
+def _make_image() -> bytes:
+    out = io.BytesIO()
+    Image.new("RGB", (1200, 900), (30, 60, 200)).save(out, "PNG")
+    return out.getvalue()
+
+
+class BrasilAPIHandler(BaseHTTPRequestHandler):
+    """
+    Answers /cep/v2/<cep> and /cnpj/v1/<cnpj> like BrasilAPI does, and
+    serves a product photo on /images/<name>.png.
+    """
+    protocol_version = "HTTP/1.1"  # keep-alive, as the real API
+    disable_nagle_algorithm = True  # headers and body go out in separate writes
+    image = _make_image()
+
+    def do_GET(self):
+        parts = self.path.strip("/").split("/")
+        if parts[-2:-1] == ["images"]:
+            self.send_response(200)
+            self.send_header("Content-Type", "image/png")
+            self.send_header("Content-Length", str(len(self.image)))
+            self.end_headers()
+            self.wfile.write(self.image)
+            return
+
+        if parts[-3:-1] == ["cep", "v2"]:
+            body = {
+                "cep": parts[-1], "state": "SP", "city": "São Paulo",
+                "neighborhood": "Sé", "street": "Praça da Sé", "service": "stub"
+            }
+        elif parts[-3:-1] == ["cnpj", "v1"]:
+            body = {
+                "cnpj": parts[-1], "razao_social": "EMPRESA EXEMPLO LTDA", "nome_fantasia": "EXEMPLO",
+                "logradouro": "RUA EXEMPLO", "numero": "123", "complemento": "",
+                "bairro": "CENTRO", "municipio": "SAO PAULO", "uf": "SP", "cep": "01001000"
+            }
+        else:
+            body = None
+
+        data = json.dumps(body or {"message": "not found"}).encode("utf-8")
+        self.send_response(200 if body else 404)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@contextmanager
+def brasilapi_stub():
+    """
+    Serves BrasilAPI on localhost and points http_client at it.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), BrasilAPIHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    previous = http_client.BRASILAPI_URL
+    http_client.BRASILAPI_URL = f"http://127.0.0.1:{server.server_address[1]}"
+    http_client.reset_session()
+    try:
+        yield http_client.BRASILAPI_URL
+    finally:
+        http_client.BRASILAPI_URL = previous
+        http_client.reset_session()
+        server.shutdown()
+        server.server_close()
+
+
+@contextmanager
+def isolated_cep_cache():
+    """
+    Empty, temporary CEP caches, so stand-in addresses never reach the real
+    on-disk cache.
+    """
+    previous = cep_service._memory_cache, cep_service._disk_cache
+    with tempfile.TemporaryDirectory() as tmp:
+        cep_service._memory_cache = TTLCache(maxsize=2048, ttl=3600)
+        cep_service._disk_cache = SQLiteCache(os.path.join(tmp, "cep.sqlite3"), table="cep")
+        try:
+            yield
+        finally:
+            cep_service._disk_cache.close()
+            cep_service._memory_cache, cep_service._disk_cache = previous
+
+
+@contextmanager
+def email_sink():
+    """
+    Replaces SMTP delivery: every email "succeeds" and is counted in the
+    yielded list.
+    """
+    sent = []
+    previous = email_service.send_many
+
+    def send_many(emails):
+        emails = list(emails)
+        sent.extend(emails)
+        return [True] * len(emails)
+
+    email_service.send_many = send_many
+    try:
+        yield sent
+    finally:
+        email_service.send_many = previous
+
+
+def make_cpf(n: int) -> str:
+    base = f"{n + 10**8:09d}"  # clear of the seed.sql CPFs
+    return base + cpf_check_digits(base)
+
+
+@contextmanager
+def sqlite_database(employees: int = 0):
+    """
+    Installs a seeded in-memory SQLiteClient as the app's database, with
+    `employees` extra user profiles (CPFs make_cpf(0..n-1), born
+    1990-01-01).
+    """
+    client = SQLiteClient(seed=True)
+    if employees:
+        client.table("user_profiles").insert([
+            {"company_id": COMPANY_ID, "name": f"Funcionário {i}", "cpf": make_cpf(i),
+             "birth_date": "1990-01-01", "role": "employee", "active": True}
+            for i in range(employees)
+        ], returning="minimal").execute()
+
+    service = SupabaseService()
+    previous = service._client
+    service._client = client
+    try:
+        yield client
+    finally:
+        service._client = previous
+        client.close()
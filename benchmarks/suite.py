@@ -0,0 +1,215 @@
+"""
+Benchmarks of the hot service functions.
+
+Each benchmark is a context manager that prepares its inputs (and any
+stand-in service), yields the callable to time, and cleans up afterwards.
+Run them with `python benchmarks/run.py` or, when pytest-benchmark is
+installed, `python -m pytest benchmarks`.
+"""
+import sys
+import os
+import itertools
+import logging
+import statistics
+import time
+from contextlib import contextmanager
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from services import auth_service, cep_service, pdf_service
+from services.consult_service import consult_cnpj
+from services.documents import only_digits, cnpj_check_digits
+from services.pricing import calculate_contract_totals
+from services.storage import MemoryStorage, get_storage, set_storage
+from streamlit.logger import get_logger
+import bench_documents
+import bench_pdf
+import stubs
+
+# login_by_cpf writes st.session_state outside a Streamlit run
+# (a filter, since Streamlit resets its loggers' levels when it reads its config)
+get_logger("streamlit.runtime.scriptrunner_utils.script_run_context").addFilter(
+    lambda record: record.levelno >= logging.ERROR
+)
+
+# Workload sizes
+PDF_BATCH = 50
+CATALOG_SIZE = 10000
+ROSTER_SIZE = 10000
+EMPLOYEES = 5000
+
+BENCHMARKS = {}
+
+def benchmark(name: str):
+    """
+    Registers a benchmark: a generator that yields the callable to time.
+    """
+    def decorator(fn):
+        BENCHMARKS[name] = contextmanager(fn)
+        return fn
+    return decorator
+
+def measure(fn, rounds: int = 5, min_time: float = 0.05) -> dict:
+    """
+    Times `fn` in `rounds` rounds of enough calls to last about `min_time`
+    seconds each.
+
+    Returns:
+        dict: Per-call seconds (min, median, mean, stdev) plus rounds and
+              calls per round.
+    """
+    start = time.perf_counter()
+    fn()  # warm-up, also calibrates the calls per round
+    single = time.perf_counter() - start
+    calls = max(1, min(10000, int(min_time / single) if single > 0 else 10000))
+
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        timings.append((time.perf_counter() - start) / calls)
+    return {
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.fmean(timings),
+        "stdev": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        "rounds": rounds,
+        "calls": calls,
+    }
+
+def run(names=None, rounds: int = 5, min_time: float = 0.05, report=None) -> dict:
+    """
+    Runs the selected benchmarks (all by default).
+
+    Returns:
+        dict: name -> measure() result.
+    """
+    results = {}
+    for name in names or sorted(BENCHMARKS):
+        with BENCHMARKS[name]() as fn:
+            results[name] = measure(fn, rounds, min_time)
+        if report:
+            report(name, results[name])
+    return results
+
+# --- PDF ---
+
+@contextmanager
+def _memory_storage():
+    previous = get_storage()
+    set_storage(MemoryStorage())
+    try:
+        yield
+    finally:
+        set_storage(previous)
+
+@benchmark("pdf.generate.single")
+def bench_generate_single():
+    """Render + store one new contract."""
+    items = bench_pdf.make_items(1)
+    pdf_service.get_template()
+    with _memory_storage():
+        def run_once():
+            set_storage(MemoryStorage())
+            return pdf_service.generate_contract_pdf(*items[0])
+        yield run_once
+
+@benchmark("pdf.generate.batch")
+def bench_generate_batch():
+    """Render + store PDF_BATCH new contracts."""
+    items = bench_pdf.make_items(PDF_BATCH)
+    pdf_service.get_template()
+    with _memory_storage():
+        def run_once():
+            set_storage(MemoryStorage())
+            return pdf_service.generate_contract_pdfs(items)
+        yield run_once
+
+@benchmark("pdf.generate.stored")
+def bench_generate_stored():
+    """Contract already rendered: fingerprint + storage lookup only."""
+    items = bench_pdf.make_items(1)
+    with _memory_storage():
+        pdf_service.generate_contract_pdf(*items[0])
+        yield lambda: pdf_service.generate_contract_pdf(*items[0])
+
+@benchmark("pdf.render.batch")
+def bench_render_batch():
+    items = bench_pdf.make_items(PDF_BATCH)
+    pdf_service.get_template()
+    yield lambda: bench_pdf.run_batch(items)
+
+# --- Pricing ---
+
+@benchmark("pricing.contract_totals.catalog")
+def bench_contract_totals():
+    """calculate_contract_totals over a CATALOG_SIZE catalog with gaps."""
+    catalog = [
+        {"monthly_price": 100 + i % 50, "insurance_price": None if i % 7 == 0 else 9.9,
+         "residual_value": "" if i % 11 == 0 else 300.0}
+        for i in range(CATALOG_SIZE)
+    ]
+    yield lambda: [calculate_contract_totals(p) for p in catalog]
+
+# --- Document normalization ---
+
+@benchmark("documents.cpf.scalar")
+def bench_cpf_scalar():
+    values = bench_documents.make_roster(ROSTER_SIZE)
+    yield lambda: bench_documents.run_scalar(values)
+
+@benchmark("documents.cpf.vectorized")
+def bench_cpf_vectorized():
+    values = bench_documents.make_roster(ROSTER_SIZE)
+    yield lambda: bench_documents.run_vectorized(values)
+
+@benchmark("documents.cep.normalize")
+def bench_cep_normalize():
+    values = [f"{i % 100000:05d}-{i % 1000:03d}" for i in range(ROSTER_SIZE)]
+    yield lambda: [only_digits(v) for v in values]
+
+# --- Login ---
+
+@benchmark("auth.login_by_cpf.cold")
+def bench_login_cold():
+    """Profile + company fetched from the database on every call."""
+    with stubs.sqlite_database(EMPLOYEES):
+        cpf = stubs.make_cpf(EMPLOYEES // 2)
+        def run_once():
+            auth_service._profile_cache.clear()
+            auth_service._company_cache.clear()
+            return auth_service.login_by_cpf(cpf, "1990-01-01")
+        yield run_once
+
+@benchmark("auth.login_by_cpf.cached")
+def bench_login_cached():
+    with stubs.sqlite_database(EMPLOYEES):
+        cpf = stubs.make_cpf(EMPLOYEES // 2)
+        try:
+            yield lambda: auth_service.login_by_cpf(cpf, "1990-01-01")
+        finally:
+            auth_service._profile_cache.clear()
+            auth_service._company_cache.clear()
+
+# --- External API clients ---
+
+@benchmark("clients.cep.miss")
+def bench_cep_miss():
+    """Unseen CEP: both cache tiers miss, HTTP round trip, cache writes."""
+    with stubs.brasilapi_stub(), stubs.isolated_cep_cache():
+        ceps = (f"{n:08d}" for n in itertools.count(10000000))
+        yield lambda: cep_service.get_address_from_cep(next(ceps))
+
+@benchmark("clients.cep.hit")
+def bench_cep_hit():
+    with stubs.brasilapi_stub(), stubs.isolated_cep_cache():
+        cep_service.get_address_from_cep("01001-000")
+        yield lambda: cep_service.get_address_from_cep("01001-000")
+
+@benchmark("clients.cnpj")
+def bench_cnpj():
+    with stubs.brasilapi_stub():
+        base = "112223330001"
+        cnpj = base + cnpj_check_digits(base)
+        yield lambda: consult_cnpj(cnpj)
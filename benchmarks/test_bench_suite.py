@@ -0,0 +1,20 @@
+"""
+The suite under pytest-benchmark:
+
+    python -m pytest benchmarks --benchmark-only --benchmark-autosave
+    python -m pytest benchmarks --benchmark-only --benchmark-compare --benchmark-compare-fail=median:10%
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from suite import BENCHMARKS
+
+@pytest.mark.parametrize("name", sorted(BENCHMARKS))
+def test_benchmark(benchmark, name):
+    with BENCHMARKS[name]() as fn:
+        benchmark(fn)
@@ -1,13 +1,19 @@
 import streamlit as st
 from services.auth_service import require_auth
-from services.supabase_client import get_supabase
+from services import repositories
 from services.consult_service import consult_cnpj, consult_cpf
-from services.pdf_service import generate_contract_pdf
-import datetime
-from dateutil.relativedelta import relativedelta
+from services.documents import is_valid_cnpj, normalize_cnpj
+from services.company_import import read_company_csv, enrich_companies, build_company_row, insert_companies
+from services.contract_service import regenerate_contract_pdfs, contract_pdfs_for_orders
+from services import order_service
+from services.order_queue import fetch_order_page
+from services.catalog_service import create_product, set_product_active
+from services.image_service import image_source, LOGO_WIDTH
+from services import tracing
 
 # Page config
 st.set_page_config(page_title="Trek - Admin", page_icon="🔒")
+tracing.begin_rerun("Admin")
 
 # Check Auth
 require_auth()
@@ -18,7 +24,9 @@ if st.session_state.get("role") != "admin":
 
 st.title("Painel Admin (IBUG)")
 
-tab1, tab2, tab3 = st.tabs(["Minhas Empresas", "Produtos (Celulares)", "Pedidos (Expedição)"])
+ORDER_STATUSES = ["created", "contract_signed", "imei_linked", "dispatched", "cancelled", "returned"]
+
+tab1, tab2, tab3, tab4 = st.tabs(["Minhas Empresas", "Produtos (Celulares)", "Pedidos (Expedição)", "Desempenho"])
 
 # Function to search CNPJ
 def handle_cnpj_search():
@@ -93,12 +101,16 @@ with tab1:
         if submitted:
             if not (name and cnpj and resp_cpf and resp_name):
                  st.error("Preencha os campos obrigatórios.")
+            elif not is_valid_cnpj(cnpj):
+                 st.error("CNPJ inválido.")
+            elif repositories.companies.existing_cnpjs([cnpj]):
+                 st.error("CNPJ já cadastrado.")
             else:
-                supabase = get_supabase()
                 try:
                     data = {
                         "name": name,
-                        "cnpj": cnpj,
+                        # Digits only, like the CSV import
+                        "cnpj": normalize_cnpj(cnpj),
                         "address": address,
                         "logo_url": logo_url,
                         "responsible_cpf": resp_cpf,
@@ -107,19 +119,49 @@ with tab1:
                         "responsible_phone": resp_phone,
                         "responsible_birth_date": str(resp_dob) if resp_dob else None
                     }
-                    supabase.table("companies").insert(data).execute()
+                    repositories.companies.create(data)
                     st.success("Empresa cadastrada com sucesso!")
                     # Clear form (optional)
                 except Exception as e:
                     st.error(f"Erro ao cadastrar: {e}")
 
+    # Bulk import from CSV
+    with st.expander("Importar Empresas (CSV)", expanded=False):
+        st.markdown("Arquivo CSV com a coluna `CNPJ` (opcionais: `logo_url`, `responsible_name`, `responsible_cpf`, `responsible_email`, `responsible_phone`).")
+        companies_file = st.file_uploader("Arquivo de Empresas", type=["csv"], key="companies_csv")
+        if companies_file and st.button("Consultar e Cadastrar"):
+            try:
+                rows = read_company_csv(companies_file)
+            except Exception as e:
+                rows = []
+                st.error(f"Erro ao ler arquivo: {e}")
+
+            if rows:
+                progress = st.progress(0.0, text="Consultando CNPJs...")
+                valid, failed = [], []
+                for done, (row, data) in enumerate(enrich_companies(rows), start=1):
+                    if data and data.get("name"):
+                        valid.append(build_company_row(row, data))
+                    else:
+                        failed.append(row["cnpj"])
+                    progress.progress(done / len(rows), text=f"Consultando CNPJs... {done}/{len(rows)}")
+
+                try:
+                    inserted = insert_companies(valid)
+                    st.success(f"{len(inserted)} empresas cadastradas ({len(valid) - len(inserted)} já existentes).")
+                except Exception as e:
+                    st.error(f"Erro ao cadastrar: {e}")
+
+                if failed:
+                    st.warning(f"{len(failed)} CNPJs não encontrados ou inválidos:")
+                    st.dataframe({"CNPJ": failed})
+
     # List companies
     try:
-        supabase = get_supabase()
-        res = supabase.table("companies").select("*").execute()
-        if res.data:
+        companies = repositories.companies.list()
+        if companies:
             st.markdown("### Empresas Cadastradas")
-            for comp in res.data:
+            for comp in companies:
                 with st.container():
                     st.markdown(f"**{comp['name']}**")
                     st.caption(f"CNPJ: {comp['cnpj']} | Resp: {comp.get('responsible_name', 'N/A')}")
@@ -151,7 +193,6 @@ with tab2:
                 if not (p_brand and p_model and p_price):
                     st.error("Preencha Marca, Modelo e Valor.")
                 else:
-                    supabase = get_supabase()
                     try:
                         p_data = {
                             "brand": p_brand,
@@ -163,24 +204,23 @@ with tab2:
                             "residual_value": p_resid,
                             "active": True
                         }
-                        supabase.table("products").insert(p_data).execute()
+                        create_product(p_data)
                         st.success(f"📱 {p_brand} {p_model} cadastrado!")
                     except Exception as e:
                         st.error(f"Erro ao cadastrar: {e}")
 
     # List products
     try:
-        supabase = get_supabase()
-        res_prod = supabase.table("products").select("*").order("created_at", desc=True).execute()
+        products = repositories.products.list_all()
         
-        if res_prod.data:
+        if products:
             st.markdown("### Catálogo Atual")
-            for prod in res_prod.data:
+            for prod in products:
                 with st.container():
                     c_img, c_info, c_actions = st.columns([1, 3, 1])
                     with c_img:
                         if prod.get("image_url"):
-                            st.image(prod["image_url"], width=80)
+                            st.image(image_source(prod["image_url"], LOGO_WIDTH), width=80)
                         else:
                             st.write("🖼️")
                     
@@ -192,7 +232,7 @@ with tab2:
                         # Simple toggle active
                         if st.button(f"{'Desativar' if prod['active'] else 'Ativar'}", key=f"toggle_{prod['id']}"):
                             new_status = not prod['active']
-                            supabase.table("products").update({"active": new_status}).eq("id", prod['id']).execute()
+                            set_product_active(prod['id'], new_status)
                             st.rerun()
                         
                     st.divider()
@@ -205,16 +245,67 @@ with tab3:
     st.header("Fila de Pedidos")
     
     try:
-        supabase = get_supabase()
-        # Join query
-        res_orders = supabase.table("orders").select(
-            "*, user_profiles(name, cpf, email, phone), products(*)"
-        ).order("created_at", desc=True).execute()
-        
-        orders = res_orders.data
+        # Server-side filters
+        companies = repositories.companies.list_names()
+        company_names = {c["id"]: c["name"] for c in companies}
+        col_status, col_company, col_dates = st.columns(3)
+        with col_status:
+            status_filter = st.multiselect("Status", ORDER_STATUSES, key="orders_status")
+        with col_company:
+            company_filter = st.selectbox(
+                "Empresa", [None] + list(company_names),
+                format_func=lambda c: "Todas" if c is None else company_names[c], key="orders_company"
+            )
+        with col_dates:
+            date_range = st.date_input("Período", value=(), format="DD/MM/YYYY", key="orders_dates")
+        date_from = date_range[0] if len(date_range) > 0 else None
+        date_to = date_range[1] if len(date_range) > 1 else date_from
+
+        # Cursor of every page visited so far; restart when the filters change
+        filters = (tuple(status_filter), company_filter, date_from, date_to)
+        if st.session_state.get("orders_filters") != filters:
+            st.session_state["orders_filters"] = filters
+            st.session_state["orders_cursors"] = [None]
+        cursors = st.session_state["orders_cursors"]
+
+        orders, next_cursor = fetch_order_page(
+            cursors[-1], status=status_filter, company_id=company_filter,
+            date_from=date_from, date_to=date_to
+        )
+
+        col_prev, col_page, col_next = st.columns([1, 2, 1])
+        with col_prev:
+            if st.button("◀ Anteriores", disabled=len(cursors) == 1):
+                cursors.pop()
+                st.rerun()
+        with col_page:
+            st.caption(f"Página {len(cursors)}")
+        with col_next:
+            if st.button("Próximos ▶", disabled=next_cursor is None):
+                cursors.append(next_cursor)
+                st.rerun()
+
         if not orders:
             st.info("Nenhum pedido encontrado.")
         else:
+            # Batch regeneration of addenda (e.g. after a shipment of IMEIs was linked)
+            with st.expander("Regenerar PDFs em lote"):
+                signed_orders = [o for o in orders if o.get('signed_at')]
+                regen_options = {
+                    str(o['id']): f"#{str(o['id'])[:8]} - {(o.get('user_profiles') or {}).get('name', 'N/A')} ({o.get('status')})"
+                    for o in signed_orders
+                }
+                regen_ids = st.multiselect(
+                    "Pedidos", list(regen_options), format_func=regen_options.get,
+                    default=[str(o['id']) for o in signed_orders if o.get('imei')]
+                )
+                if st.button("Regenerar PDFs", disabled=not regen_ids):
+                    with st.spinner(f"Gerando {len(regen_ids)} PDFs..."):
+                        manifest = regenerate_contract_pdfs(regen_ids)
+                    failed = [i for i, f in manifest.items() if not f]
+                    st.success(f"{len(manifest) - len(failed)} PDFs regenerados.")
+                    st.dataframe({"Pedido": list(manifest), "Arquivo": list(manifest.values())})
+
             for order in orders:
                 user_info = order.get("user_profiles", {}) or {}
                 prod_info = order.get("products", {}) or {}
@@ -235,62 +326,79 @@ with tab3:
                         if status == "contract_signed":
                             imei_input = st.text_input(f"IMEI", key=f"imei_{order['id']}")
                             if st.button("Expedir", key=f"btn_{order['id']}"):
-                                if imei_input:
-                                    # Update Order
-                                    supabase.table("orders").update({
-                                        "status": "dispatched",
-                                        "imei": imei_input
-                                    }).eq("id", order['id']).execute()
-                                    
-                                    # Regenerate PDF with IMEI
-                                    # Calculate dates
-                                    signed_at_dt = datetime.datetime.fromisoformat(order['signed_at'])
-                                    start_date = signed_at_dt.strftime("%d/%m/%Y")
-                                    end_date_dt = signed_at_dt + relativedelta(months=21)
-                                    end_date = end_date_dt.strftime("%d/%m/%Y")
-                                    
-                                    # Address
-                                    deliv = order.get('delivery_address', {})
-                                    address_str = ""
-                                    if isinstance(deliv, dict):
-                                        address_str = deliv.get('full', "")
-                                    else:
-                                        address_str = str(deliv)
-                                    
-                                    total_monthly = float(prod_info.get('monthly_price', 0)) + float(prod_info.get('insurance_price', 0))
-                                    
-                                    contract_data = {
-                                        "name": user_info.get("name"),
-                                        "cpf": user_info.get("cpf"),
-                                        "email": user_info.get("email"),
-                                        "phone": user_info.get("phone"),
-                                        "address": address_str,
-                                        "start_date": start_date,
-                                        "end_date": end_date,
-                                        "months": 21,
-                                        "value_monthly_total": total_monthly,
-                                        "residual_value": prod_info.get('residual_value'),
-                                        "acceptance_date": order.get("signed_at")
-                                    }
-                                    
-                                    # Inject IMEI into product data copy
-                                    prod_with_imei = prod_info.copy()
-                                    prod_with_imei["imei"] = imei_input
-                                    
-                                    # Company fetch (generic)
-                                    company_res = supabase.table("companies").select("*").eq("id", order["company_id"]).execute()
-                                    company_data = company_res.data[0] if company_res.data else {}
-                                    
-                                    new_pdf = generate_contract_pdf(contract_data, prod_with_imei, company_data)
-                                    
+                                try:
+                                    # Links the IMEI and dispatches in one call; the
+                                    # returned order carries everything the PDF needs
+                                    updated = order_service.dispatch(order['id'], imei=imei_input)
+                                    new_pdf = contract_pdfs_for_orders([updated]).get(updated['id'])
                                     st.success(f"Pedido expedido! PDF atualizado: {new_pdf}")
                                     st.rerun()
-                                else:
-                                    st.error("Informe o IMEI.")
+                                except ValueError as e:
+                                    st.error(str(e))
                         elif status == "dispatched":
                             st.write("✅ Concluído")
+
+                        if "cancel" in order_service.allowed(status):
+                            if st.button("Cancelar pedido", key=f"btn_cancel_{order['id']}"):
+                                try:
+                                    order_service.cancel(order['id'])
+                                    st.rerun()
+                                except ValueError as e:
+                                    st.error(str(e))
+                        elif "return" in order_service.allowed(status):
+                            if st.button("Registrar devolução", key=f"btn_return_{order['id']}"):
+                                try:
+                                    order_service.return_order(order['id'])
+                                    st.rerun()
+                                except ValueError as e:
+                                    st.error(str(e))
                             
                     st.divider()
                     
     except Exception as e:
         st.error(f"Erro ao carregar pedidos: {e}")
+
+with tab4:
+    st.header("Reruns mais lentos")
+    st.caption(f"Últimos {tracing.TRACE_BUFFER_SIZE} traces deste servidor, detalhados por etapa.")
+    slowest = tracing.slowest_traces(20, kind="rerun")
+    if not slowest:
+        st.info("Nenhum rerun registrado ainda.")
+    else:
+        st.dataframe([
+            {
+                "Página": t.name,
+                "Início (UTC)": f"{t.started_at:%H:%M:%S}",
+                "Duração (ms)": round(t.duration * 1e3, 1),
+                "Interrompido": "sim" if t.attrs.get("stopped") else "",
+            }
+            for t in slowest
+        ])
+
+        st.subheader("Tempo por etapa")
+        st.dataframe([
+            {
+                "Etapa": r["name"],
+                "Chamadas": r["count"],
+                "Total (ms)": round(r["total"] * 1e3, 1),
+                "Máx (ms)": round(r["max"] * 1e3, 1),
+                "Erros": r["errors"],
+            }
+            for r in tracing.summarize(slowest)
+        ])
+
+        selected = st.selectbox(
+            "Detalhar rerun", range(len(slowest)),
+            format_func=lambda i: f"{slowest[i].name} às {slowest[i].started_at:%H:%M:%S} ({slowest[i].duration * 1e3:.0f} ms)"
+        )
+        st.dataframe([
+            {
+                "Etapa": "\u2003" * r["depth"] + r["name"],
+                "Duração (ms)": round(r["duration"] * 1e3, 1),
+                "Própria (ms)": round(r["self_time"] * 1e3, 1),
+                "Erro": r["error"] or "",
+            }
+            for r in tracing.breakdown(slowest[selected])
+        ])
+
+tracing.end_rerun()
@@ -1,9 +1,14 @@
 import streamlit as st
 import pandas as pd
+import datetime
 from services.auth_service import require_auth
-from services.supabase_client import get_supabase
+from services.employee_import import import_employees
+from services.upload_reader import read_preview, iter_batches
+from services.report_service import build_payroll_report
+from services import tracing
 
 st.set_page_config(page_title="Trek - RH", page_icon="👥")
+tracing.begin_rerun("HR")
 
 require_auth()
 if st.session_state.get("role") not in ["admin", "hr"]:
@@ -22,21 +27,19 @@ with tab1:
     
     if uploaded_file:
         try:
-            if uploaded_file.name.endswith('.csv'):
-                df = pd.read_csv(uploaded_file)
-            else:
-                df = pd.read_excel(uploaded_file)
-            
-            st.dataframe(df.head())
+            st.dataframe(read_preview(uploaded_file, uploaded_file.name))
             
             if st.button("Processar Upload"):
-                # Mock processing logic
-                st.info("Processando...")
-                # Iterate and upsert to Supabase
-                # supabase = get_supabase()
-                # for index, row in df.iterrows():
-                #    ... upsert user_profiles ...
-                st.success("Funcionários importados com sucesso! (Simulação)")
+                company_id = st.session_state["user"].get("company_id")
+                with st.spinner("Processando..."):
+                    report = import_employees(
+                        iter_batches(uploaded_file, uploaded_file.name), company_id, uploaded_file.name
+                    )
+
+                st.success(f"{report['imported']} de {report['total']} funcionários importados.")
+                if report["errors"]:
+                    st.warning(f"{len(report['errors'])} linhas com erro:")
+                    st.dataframe(pd.DataFrame(report["errors"]))
                 
         except Exception as e:
             st.error(f"Erro ao ler arquivo: {e}")
@@ -44,5 +47,24 @@ with tab1:
 with tab2:
     st.header("Relatórios Financeiros")
     st.write("Baixar arquivo de descontos em folha.")
-    if st.button("Gerar Relatório de Descontos"):
-        st.success("Relatório gerado! (Simulação de Download)")
+
+    col_month, col_fmt = st.columns(2)
+    with col_month:
+        ref_month = st.date_input("Mês de Referência", value=datetime.date.today().replace(day=1), format="DD/MM/YYYY")
+    with col_fmt:
+        report_fmt = st.radio("Formato", ["csv", "xlsx"], horizontal=True)
+
+    company_id = st.session_state["user"].get("company_id")
+    mimes = {
+        "csv": "text/csv",
+        "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    }
+    # The callable defers generation until the button is clicked
+    st.download_button(
+        "Gerar Relatório de Descontos",
+        data=lambda: build_payroll_report(company_id, ref_month, report_fmt),
+        file_name=f"descontos_{ref_month:%Y_%m}.{report_fmt}",
+        mime=mimes[report_fmt]
+    )
+
+tracing.end_rerun()
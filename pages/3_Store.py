@@ -1,8 +1,11 @@
 import streamlit as st
 from services.auth_service import require_auth
-from services.supabase_client import get_supabase
+from services.catalog_service import get_active_products
+from services.image_service import image_source, LOGO_WIDTH, CARD_WIDTH
+from services import tracing
 
 st.set_page_config(page_title="Trek - Loja", page_icon="🛍️")
+tracing.begin_rerun("Store")
 
 require_auth()
 
@@ -22,7 +25,7 @@ if user and "companies" in user:
     col_logo, col_name = st.columns([1, 4])
     with col_logo:
         if logo_url:
-            st.image(logo_url, width=80)
+            st.image(image_source(logo_url, LOGO_WIDTH), width=80)
     with col_name:
         st.subheader(company_name)
 
@@ -30,12 +33,10 @@ st.divider()
 
 st.header("Aparelhos Disponíveis")
 
-# Fetch products
-supabase = get_supabase()
+# Fetch products (process-wide cache, reloaded after catalog changes)
 products = []
 try:
-    res = supabase.table("products").select("*").eq("active", True).execute()
-    products = res.data
+    products = get_active_products()
 except:
     st.warning("Não foi possível carregar os produtos.")
 
@@ -69,7 +70,7 @@ cols = st.columns(3)
 for idx, prod in enumerate(products):
     col = cols[idx % 3]
     with col:
-        st.image(prod.get("image_url") or "https://via.placeholder.com/150", use_container_width=True)
+        st.image(image_source(prod.get("image_url"), CARD_WIDTH, "https://via.placeholder.com/150"), use_container_width=True)
         st.subheader(f"{prod['brand']} {prod['model']}")
         st.write(prod.get("description", ""))
         st.write(f"**Mensalidade:** R$ {prod['monthly_price']}")
@@ -77,3 +78,5 @@ for idx, prod in enumerate(products):
         if st.button("Escolher este", key=prod['id']):
             st.session_state["selected_product"] = prod
             st.switch_page("pages/5_Contract.py") # Or similar
+
+tracing.end_rerun()
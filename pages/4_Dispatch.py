@@ -1,8 +1,16 @@
 import streamlit as st
+import pandas as pd
+import time
 from services.auth_service import require_auth
-from services.supabase_client import get_supabase
+from services import order_service
+from services.order_queue import DispatchQueue
+from services.outbox import enqueue_email
+from services.imei_import import parse_scanned, read_links, link_imei_batch
+from services.upload_reader import iter_batches
+from services import tracing
 
 st.set_page_config(page_title="Trek - Expedição", page_icon="📦")
+tracing.begin_rerun("Dispatch")
 
 require_auth()
 if st.session_state.get("role") not in ["admin", "dispatch"]:
@@ -11,15 +19,46 @@ if st.session_state.get("role") not in ["admin", "dispatch"]:
 
 st.title("Expedição de Pedidos")
 
-supabase = get_supabase()
-
 # Fetch orders ready for dispatch
 # Status: contract_signed (waiting for IMEI) or imei_linked (waiting for dispatch)
+# The queue is kept per session; reruns fetch only the orders changed since
+# the previous refresh, with a full reload every few minutes
+queue = st.session_state.setdefault("dispatch_queue", DispatchQueue())
 try:
-    res = supabase.table("orders").select("*, products(brand, model), user_profiles(name, cpf)").in_("status", ["contract_signed", "imei_linked"]).execute()
-    orders = res.data
+    orders = queue.refresh()
 except:
-    orders = []
+    orders = queue.snapshot()
+
+# Bulk linking: a shipment's `order_id, IMEI` pairs in one database call
+report = st.session_state.pop("imei_batch_report", None)
+if report:
+    st.success(f"{report['linked']} de {report['total']} IMEIs vinculados, {report['notified']} clientes avisados.")
+    if report["errors"]:
+        st.warning(f"{len(report['errors'])} linhas com erro:")
+        st.dataframe(pd.DataFrame(report["errors"]))
+
+with st.expander("Vincular IMEIs em lote"):
+    st.markdown(
+        "Envie um CSV ou Excel com as colunas `order_id` e `IMEI`, ou use o leitor de código de barras: "
+        "um `pedido, IMEI` por linha (o pedido pode ser o código curto, ex. `1a2b3c4d`)."
+    )
+    tab_file, tab_scan = st.tabs(["Arquivo", "Leitor"])
+    with tab_file:
+        batch_file = st.file_uploader("Arquivo de IMEIs", type=["csv", "xlsx"])
+    with tab_scan:
+        scanned = st.text_area("Leituras", key="imei_scan", height=200, placeholder="1a2b3c4d, 356938035643809")
+
+    if st.button("Vincular IMEIs", type="primary", disabled=not (batch_file or scanned.strip())):
+        pending = [o for o in orders if o["status"] == "contract_signed"]
+        try:
+            with st.spinner("Vinculando IMEIs..."):
+                pairs = read_links(iter_batches(batch_file, batch_file.name)) if batch_file else parse_scanned(scanned)
+                st.session_state["imei_batch_report"] = link_imei_batch(pairs, pending)
+        except Exception as e:
+            st.error(f"Erro ao processar lote: {e}")
+        else:
+            st.session_state.pop("imei_scan", None)
+            st.rerun()
 
 if not orders:
     st.info("Nenhum pedido pendente de expedição.")
@@ -33,36 +72,40 @@ else:
             if order['status'] == 'contract_signed':
                 new_imei = st.text_input("Inserir IMEI", key=f"imei_{order['id']}")
                 if st.button("Vincular IMEI", key=f"btn_imei_{order['id']}"):
-                    # Update order
-                    supabase.table("orders").update({"imei": new_imei, "status": "imei_linked"}).eq("id", order['id']).execute()
-                    
-                    # Notify User via Email (Mock)
-                    from services.email_service import send_email
-                    user_email = order['user_profiles'].get('email')
-                    send_email(user_email, "Trek - Aparelho Preparado", f"Seu aparelho foi vinculado ao IMEI: {new_imei}. Em breve será expedido.")
+                    try:
+                        updated = order_service.link_imei(order['id'], new_imei)
+                    except ValueError as e:
+                        st.error(str(e))
+                    else:
+                        # Notify User via Email (delivered in the background)
+                        user_email = updated['user_profiles'].get('email')
+                        enqueue_email(user_email, "Trek - Aparelho Preparado", f"Seu aparelho foi vinculado ao IMEI: {updated['imei']}. Em breve será expedido.")
 
-                    st.success("IMEI vinculado!")
-                    st.rerun()
+                        st.success("IMEI vinculado!")
+                        st.rerun()
 
             # Action: Dispatch
             elif order['status'] == 'imei_linked':
                 st.write(f"**IMEI:** {order['imei']}")
                 if st.button("Marcar como Expedido", key=f"btn_disp_{order['id']}"):
-                    # Update order
-                    supabase.table("orders").update({"status": "dispatched"}).eq("id", order['id']).execute()
-                    
-                    # Notify User
-                    from services.email_service import send_email
-                    user_email = order['user_profiles'].get('email')
-                    send_email(user_email, "Trek - Aparelho Expedido", f"Seu aparelho foi expedido! Aguarde a entrega.")
-                    
-                    # WhatsApp Link for Dispatcher to notify manually if needed
-                    import urllib.parse
-                    msg_text = f"Olá {order['user_profiles']['name']}, seu aparelho (IMEI {order['imei']}) saiu para entrega!"
-                    encoded_text = urllib.parse.quote(msg_text)
-                    wa_link = f"https://wa.me/?text={encoded_text}"
-                    st.markdown(f"[📲 Abrir WhatsApp para avisar funcionário]({wa_link})")
+                    try:
+                        updated = order_service.dispatch(order['id'])
+                    except ValueError as e:
+                        st.error(str(e))
+                    else:
+                        # Notify User
+                        user_email = updated['user_profiles'].get('email')
+                        enqueue_email(user_email, "Trek - Aparelho Expedido", f"Seu aparelho foi expedido! Aguarde a entrega.")
+
+                        # WhatsApp Link for Dispatcher to notify manually if needed
+                        import urllib.parse
+                        msg_text = f"Olá {updated['user_profiles']['name']}, seu aparelho (IMEI {updated['imei']}) saiu para entrega!"
+                        encoded_text = urllib.parse.quote(msg_text)
+                        wa_link = f"https://wa.me/?text={encoded_text}"
+                        st.markdown(f"[📲 Abrir WhatsApp para avisar funcionário]({wa_link})")
+
+                        st.success("Pedido expedido!")
+                        time.sleep(3)
+                        st.rerun()
 
-                    st.success("Pedido expedido!")
-                    time.sleep(3)
-                    st.rerun()
+tracing.end_rerun()
@@ -1,15 +1,22 @@
 import streamlit as st
-from services.auth_service import require_auth
-from services.supabase_client import get_supabase
+from services.auth_service import require_auth, get_current_user, invalidate_profile
+from services import repositories
 from services.pdf_service import generate_contract_pdf
+from services.catalog_service import get_product
+from services.image_service import image_source, DETAIL_WIDTH
+from services.assets import get_asset
 from services.cep_service import get_address_from_cep
-from services.email_service import send_email
+from services.outbox import enqueue_email
+from services import tracing
 import time
 import datetime
 import urllib.parse
-import os
+
+VIDEO_ASSET = "video residual.mp4"
+CONTRACT_ASSET = "Contrato MÃE de assinatura de celular .docx"
 
 st.set_page_config(page_title="Trek - Detalhes e Contrato", page_icon="📝")
+tracing.begin_rerun("Contract")
 
 require_auth()
 
@@ -20,7 +27,16 @@ if "selected_product" not in st.session_state:
     st.stop()
 
 product = st.session_state["selected_product"]
-user = st.session_state["user"]
+if not str(product.get("id", "")).startswith("mock"):
+    # Current catalog data rather than the copy taken when it was chosen
+    product = get_product(product["id"])
+    if not product:
+        st.warning("Este aparelho não está mais disponível. Escolha outro na loja.")
+        if st.button("Ir para Loja"):
+            st.switch_page("pages/3_Store.py")
+        st.stop()
+
+user = get_current_user()
 
 # --- TELA 2: Detalhe do Aparelho / Aceite ---
 
@@ -29,7 +45,7 @@ st.title("Detalhes da Assinatura")
 # Device Info
 col_img, col_info = st.columns([1, 2])
 with col_img:
-    st.image(product.get("image_url", "https://via.placeholder.com/300"), use_container_width=True)
+    st.image(image_source(product.get("image_url"), DETAIL_WIDTH, "https://via.placeholder.com/300"), use_container_width=True)
 
 with col_info:
     st.header(f"{product['brand']} {product['model']}")
@@ -51,13 +67,10 @@ with col_info:
     with c_vid_label:
         st.write("❓ O que é o Valor Residual?")
     
-    # Video Logic
-    # Assuming video is in root. Streamlit usually runs from root.
-    video_path = "video residual.mp4"
-    if os.path.exists(video_path):
-        with open(video_path, 'rb') as v:
-            video_bytes = v.read()
-            st.video(video_bytes)
+    # Video Logic (one shared copy per process, see services/assets.py)
+    video_bytes = get_asset(VIDEO_ASSET)
+    if video_bytes is not None:
+        st.video(video_bytes)
     else:
         st.warning("Vídeo explicativo não encontrado.")
 
@@ -68,15 +81,14 @@ with st.expander("📄 Ler Contrato-Mãe (Termos Gerais)"):
     st.markdown("### Contrato de Locação de Equipamentos Móveis")
     st.write("Clique abaixo para baixar o contrato completo.")
     
-    contract_path = "Contrato MÃE de assinatura de celular .docx"
-    if os.path.exists(contract_path):
-        with open(contract_path, "rb") as f:
-            st.download_button(
-                label="Baixar Contrato-Mãe (.docx)",
-                data=f,
-                file_name="Contrato_Mae_Celular.docx",
-                mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-            )
+    contract_bytes = get_asset(CONTRACT_ASSET)
+    if contract_bytes is not None:
+        st.download_button(
+            label="Baixar Contrato-Mãe (.docx)",
+            data=contract_bytes,
+            file_name="Contrato_Mae_Celular.docx",
+            mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+        )
     else:
         st.error("Arquivo de contrato não encontrado.")
 
@@ -195,7 +207,6 @@ if st.session_state["terms_accepted"]:
                         pdf_path = generate_contract_pdf(contract_data, product, user.get("companies"))
                         
                         # 2. Save Order
-                        supabase = get_supabase()
                         order_payload = {
                             "user_id": user["id"],
                             "product_id": product["id"],
@@ -214,16 +225,23 @@ if st.session_state["terms_accepted"]:
                             "imei": None # Started empty
                         }
                         
-                        supabase.table("orders").insert(order_payload).execute()
+                        repositories.orders.create(order_payload)
                         
                         # Update user contact info
                         try:
-                            supabase.table("user_profiles").update({
-                                "phone": cell_val, 
-                                "email": email_val
-                            }).eq("id", user["id"]).execute()
+                            repositories.user_profiles.update_contact(user["id"], phone=cell_val, email=email_val)
+                            invalidate_profile(user["cpf"])
                         except:
                             pass
+
+                        # Confirmation email (delivered in the background)
+                        enqueue_email(
+                            email_val,
+                            "Trek - Aditivo assinado",
+                            f"Olá {user['name']}, recebemos o aditivo assinado do {product['brand']} {product['model']}. "
+                            "Avisaremos quando o aparelho for expedido.",
+                            attachment_path=pdf_path
+                        )
                         
                         st.success("Aditivo gerado e pedido realizado!")
                         st.toast("Pedido enviado para expedição.", icon="🚀")
@@ -238,3 +256,5 @@ if st.session_state["terms_accepted"]:
                         
                     except Exception as e:
                         st.error(f"Erro ao finalizar: {e}")
+
+tracing.end_rerun()
@@ -19,8 +19,9 @@ CREATE TABLE IF NOT EXISTS user_profiles (
     name TEXT NOT NULL,
     cpf TEXT UNIQUE NOT NULL,
     birth_date DATE,
-    role TEXT CHECK (role IN ('admin', 'hr', 'employee', 'dispatch')),
+    role TEXT CHECK (role IN ('admin', 'hr', 'employee', 'dispatch')) DEFAULT 'employee',
     email TEXT,
+    phone TEXT,
     active BOOLEAN DEFAULT TRUE,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT timezone('utc'::text, now())
 );
@@ -59,8 +60,38 @@ CREATE TABLE IF NOT EXISTS orders (
     signed_at TIMESTAMP WITH TIME ZONE,
     imei TEXT,
     delivery_address JSONB,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT timezone('utc'::text, now()),
+    -- Maintained by the orders_set_updated_at trigger (schema_updates.sql)
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT timezone('utc'::text, now())
+);
+
+-- Admin order queue: keyset pagination on (created_at, id), optionally
+-- filtered by status or company (services/order_queue.py)
+CREATE INDEX IF NOT EXISTS orders_created_idx ON orders (created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS orders_status_created_idx ON orders (status, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS orders_company_created_idx ON orders (company_id, created_at DESC, id DESC);
+-- Dispatch queue delta refresh (services/order_queue.DispatchQueue)
+CREATE INDEX IF NOT EXISTS orders_updated_idx ON orders (updated_at, id);
+-- A device is on one active order at a time (cancelled/returned orders free it)
+CREATE UNIQUE INDEX IF NOT EXISTS orders_active_imei_key ON orders (imei)
+    WHERE imei IS NOT NULL AND status NOT IN ('cancelled', 'returned');
+
+-- 6. EMAIL OUTBOX (notifications delivered by services/outbox.py)
+CREATE TABLE IF NOT EXISTS email_outbox (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    to_email TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    body TEXT NOT NULL,
+    attachment_path TEXT,
+    status TEXT CHECK (status IN ('pending', 'sending', 'sent', 'dead')) DEFAULT 'pending',
+    attempts INTEGER DEFAULT 0,
+    last_error TEXT,
+    next_attempt_at TIMESTAMP WITH TIME ZONE DEFAULT timezone('utc'::text, now()),
+    locked_until TIMESTAMP WITH TIME ZONE,
+    sent_at TIMESTAMP WITH TIME ZONE,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT timezone('utc'::text, now())
 );
+CREATE INDEX IF NOT EXISTS email_outbox_due_idx ON email_outbox (status, next_attempt_at);
 
 -- RLS Policies (Optional for MVP if using Service Key, but good practice)
 -- Enabling RLS
@@ -69,6 +100,7 @@ ALTER TABLE user_profiles ENABLE ROW LEVEL SECURITY;
 ALTER TABLE products ENABLE ROW LEVEL SECURITY;
 ALTER TABLE movements ENABLE ROW LEVEL SECURITY;
 ALTER TABLE orders ENABLE ROW LEVEL SECURITY;
+ALTER TABLE email_outbox ENABLE ROW LEVEL SECURITY;
 
 -- For MVP simplicity, we might allow public read/write if using Service Role in backend, 
 -- or specific policies if using Anon Key. 
@@ -78,3 +110,4 @@ CREATE POLICY "Enable all access for service role" ON user_profiles FOR ALL USIN
 CREATE POLICY "Enable all access for service role" ON products FOR ALL USING (true);
 CREATE POLICY "Enable all access for service role" ON movements FOR ALL USING (true);
 CREATE POLICY "Enable all access for service role" ON orders FOR ALL USING (true);
+CREATE POLICY "Enable all access for service role" ON email_outbox FOR ALL USING (true);
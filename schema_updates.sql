@@ -25,3 +25,255 @@ BEGIN
         ALTER TABLE orders ADD COLUMN contract_url TEXT;
     END IF;
 END $$;
+
+-- Employees created by the HR bulk import get the employee role by default
+ALTER TABLE user_profiles ALTER COLUMN role SET DEFAULT 'employee';
+
+-- Payroll deduction report: one row per employee with active contracts,
+-- aggregated in the database. Contracts signed during the month are
+-- pro-rated from the signing day (see services/pricing.prorate_factor).
+CREATE INDEX IF NOT EXISTS orders_company_status_idx ON orders (company_id, status);
+
+CREATE OR REPLACE FUNCTION payroll_deductions(p_company_id UUID, p_month DATE)
+RETURNS TABLE (
+    user_id UUID,
+    name TEXT,
+    cpf TEXT,
+    contracts INTEGER,
+    monthly_total NUMERIC,
+    deduction NUMERIC
+)
+LANGUAGE sql STABLE AS $$
+    WITH bounds AS (
+        SELECT date_trunc('month', p_month)::date AS month_start,
+               (date_trunc('month', p_month) + interval '1 month')::date AS month_end
+    )
+    SELECT u.id,
+           u.name,
+           u.cpf,
+           count(*)::int,
+           sum(coalesce(p.monthly_price, 0) + coalesce(p.insurance_price, 0)),
+           round(sum(
+               (coalesce(p.monthly_price, 0) + coalesce(p.insurance_price, 0)) *
+               CASE WHEN o.signed_at::date < b.month_start THEN 1
+                    ELSE (b.month_end - o.signed_at::date)::numeric / (b.month_end - b.month_start)
+               END
+           ), 2)
+    FROM orders o
+    JOIN user_profiles u ON u.id = o.user_id
+    JOIN products p ON p.id = o.product_id
+    CROSS JOIN bounds b
+    WHERE o.company_id = p_company_id
+      AND o.status IN ('contract_signed', 'imei_linked', 'dispatched')
+      AND o.signed_at < b.month_end
+    GROUP BY u.id, u.name, u.cpf
+    ORDER BY u.name, u.id;
+$$;
+
+-- Email outbox: pages enqueue notifications, services/outbox.py delivers them.
+CREATE TABLE IF NOT EXISTS email_outbox (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    to_email TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    body TEXT NOT NULL,
+    attachment_path TEXT,
+    status TEXT CHECK (status IN ('pending', 'sending', 'sent', 'dead')) DEFAULT 'pending',
+    attempts INTEGER DEFAULT 0,
+    last_error TEXT,
+    next_attempt_at TIMESTAMP WITH TIME ZONE DEFAULT timezone('utc'::text, now()),
+    locked_until TIMESTAMP WITH TIME ZONE,
+    sent_at TIMESTAMP WITH TIME ZONE,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT timezone('utc'::text, now())
+);
+CREATE INDEX IF NOT EXISTS email_outbox_due_idx ON email_outbox (status, next_attempt_at);
+ALTER TABLE email_outbox ENABLE ROW LEVEL SECURITY;
+DROP POLICY IF EXISTS "Enable all access for service role" ON email_outbox;
+CREATE POLICY "Enable all access for service role" ON email_outbox FOR ALL USING (true);
+
+-- Claims up to p_limit due messages for one worker. SKIP LOCKED lets several
+-- workers drain the outbox concurrently; the lease makes messages claimed by
+-- a worker that died (e.g. during a restart) due again once it expires.
+CREATE OR REPLACE FUNCTION claim_email_outbox(p_limit INTEGER, p_lease_seconds INTEGER DEFAULT 300)
+RETURNS SETOF email_outbox
+LANGUAGE sql AS $$
+    UPDATE email_outbox e
+    SET status = 'sending',
+        attempts = e.attempts + 1,
+        locked_until = now() + make_interval(secs => p_lease_seconds)
+    WHERE e.id IN (
+        SELECT id FROM email_outbox
+        WHERE (status = 'pending' AND next_attempt_at <= now())
+           OR (status = 'sending' AND locked_until < now())
+        ORDER BY next_attempt_at
+        LIMIT p_limit
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING e.*;
+$$;
+
+-- Admin order queue: keyset pagination on (created_at, id), optionally
+-- filtered by status or company (services/order_queue.py)
+CREATE INDEX IF NOT EXISTS orders_created_idx ON orders (created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS orders_status_created_idx ON orders (status, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS orders_company_created_idx ON orders (company_id, created_at DESC, id DESC);
+
+-- Bulk IMEI linking (Dispatch batch mode, services/imei_import.py). A device
+-- is on one active order at a time; cancelled and returned orders free it.
+-- Fix duplicated orders.imei values before creating the index.
+DROP INDEX IF EXISTS orders_imei_key;
+CREATE UNIQUE INDEX IF NOT EXISTS orders_active_imei_key ON orders (imei)
+    WHERE imei IS NOT NULL AND status NOT IN ('cancelled', 'returned');
+
+-- Links each {"order_id", "imei"} pair in one call. Orders that left
+-- contract_signed meanwhile and IMEIs already used by another active order
+-- are skipped; the linked orders come back with what the notifications need.
+-- Pairs are applied one at a time, in order-id order (so concurrent batches
+-- lock rows in the same order), each in its own subtransaction: a conflict
+-- on orders_active_imei_key, including one with a batch that committed
+-- while this one waited on the index, skips that pair only. Within a batch
+-- the first pair (by order id) of a repeated IMEI wins.
+CREATE OR REPLACE FUNCTION link_imeis(p_links JSONB)
+RETURNS TABLE (
+    id UUID,
+    imei TEXT,
+    name TEXT,
+    email TEXT,
+    brand TEXT,
+    model TEXT
+)
+LANGUAGE plpgsql AS $$
+#variable_conflict use_column
+DECLARE
+    link RECORD;
+    linked_id UUID;
+    linked UUID[] := '{}';
+BEGIN
+    FOR link IN
+        SELECT (l->>'order_id')::uuid AS order_id, l->>'imei' AS imei
+        FROM jsonb_array_elements(p_links) WITH ORDINALITY AS t(l, n)
+        ORDER BY 1, n
+    LOOP
+        BEGIN
+            UPDATE orders o
+            SET imei = link.imei, status = 'imei_linked'
+            WHERE o.id = link.order_id AND o.status = 'contract_signed'
+            RETURNING o.id INTO linked_id;
+            IF FOUND THEN
+                linked := linked || linked_id;
+            END IF;
+        EXCEPTION WHEN unique_violation THEN
+            NULL;
+        END;
+    END LOOP;
+
+    RETURN QUERY
+    SELECT o.id, o.imei, u.name, u.email, p.brand, p.model
+    FROM orders o
+    JOIN user_profiles u ON u.id = o.user_id
+    JOIN products p ON p.id = o.product_id
+    WHERE o.id = ANY(linked);
+END;
+$$;
+
+-- Points orders at their regenerated addendum (services/contract_service.py).
+-- p_urls is an array of {order_id, contract_url}; unchanged rows are left
+-- alone so their updated_at does not move.
+CREATE OR REPLACE FUNCTION set_contract_urls(p_urls JSONB)
+RETURNS VOID
+LANGUAGE sql AS $$
+    UPDATE orders o
+    SET contract_url = u->>'contract_url'
+    FROM jsonb_array_elements(p_urls) AS u
+    WHERE o.id = (u->>'order_id')::uuid
+      AND o.contract_url IS DISTINCT FROM u->>'contract_url';
+$$;
+
+-- Order state machine (services/order_service.py):
+--   contract_signed -> imei_linked -> dispatched -> returned
+--   created / contract_signed / imei_linked -> cancelled
+-- Each transition is one call that locks the order, checks its current
+-- status, updates it and returns the order joined with what PDFs and
+-- notifications need. A disallowed transition raises SQLSTATE 55000, an
+-- unknown order P0002.
+CREATE OR REPLACE FUNCTION order_payload(p_order_id UUID)
+RETURNS JSONB
+LANGUAGE sql STABLE AS $$
+    SELECT to_jsonb(o) || jsonb_build_object(
+        'user_profiles', (SELECT jsonb_build_object('name', u.name, 'cpf', u.cpf, 'email', u.email, 'phone', u.phone)
+                          FROM user_profiles u WHERE u.id = o.user_id),
+        'products', (SELECT to_jsonb(p) FROM products p WHERE p.id = o.product_id),
+        'companies', (SELECT to_jsonb(c) FROM companies c WHERE c.id = o.company_id)
+    )
+    FROM orders o
+    WHERE o.id = p_order_id;
+$$;
+
+CREATE OR REPLACE FUNCTION order_transition(p_order_id UUID, p_from TEXT[], p_to TEXT, p_imei TEXT DEFAULT NULL)
+RETURNS JSONB
+LANGUAGE plpgsql AS $$
+DECLARE
+    v_status TEXT;
+BEGIN
+    SELECT status INTO v_status FROM orders WHERE id = p_order_id FOR UPDATE;
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'order % not found', p_order_id USING ERRCODE = 'P0002';
+    END IF;
+    IF NOT v_status = ANY(p_from) THEN
+        RAISE EXCEPTION 'order % is %, cannot become %', p_order_id, v_status, p_to USING ERRCODE = '55000';
+    END IF;
+    UPDATE orders SET status = p_to, imei = coalesce(p_imei, imei) WHERE id = p_order_id;
+    RETURN order_payload(p_order_id);
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION order_link_imei(p_order_id UUID, p_imei TEXT)
+RETURNS JSONB
+LANGUAGE sql AS $$
+    SELECT order_transition(p_order_id, ARRAY['contract_signed'], 'imei_linked', p_imei);
+$$;
+
+-- With p_imei, an order still waiting for its IMEI is linked and dispatched at once
+CREATE OR REPLACE FUNCTION order_dispatch(p_order_id UUID, p_imei TEXT DEFAULT NULL)
+RETURNS JSONB
+LANGUAGE sql AS $$
+    SELECT order_transition(
+        p_order_id,
+        CASE WHEN p_imei IS NULL THEN ARRAY['imei_linked'] ELSE ARRAY['contract_signed', 'imei_linked'] END,
+        'dispatched', p_imei
+    );
+$$;
+
+CREATE OR REPLACE FUNCTION order_cancel(p_order_id UUID)
+RETURNS JSONB
+LANGUAGE sql AS $$
+    SELECT order_transition(p_order_id, ARRAY['created', 'contract_signed', 'imei_linked'], 'cancelled');
+$$;
+
+CREATE OR REPLACE FUNCTION order_return(p_order_id UUID)
+RETURNS JSONB
+LANGUAGE sql AS $$
+    SELECT order_transition(p_order_id, ARRAY['dispatched'], 'returned');
+$$;
+
+-- Dispatch queue delta refresh (services/order_queue.DispatchQueue): every
+-- change to an order bumps updated_at, so the page fetches only the orders
+-- changed since its last refresh. clock_timestamp() rather than now(): a
+-- long transaction must not stamp rows with its (earlier) start time.
+ALTER TABLE orders ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE;
+UPDATE orders SET updated_at = coalesce(signed_at, created_at) WHERE updated_at IS NULL;
+ALTER TABLE orders ALTER COLUMN updated_at SET DEFAULT timezone('utc'::text, now());
+CREATE INDEX IF NOT EXISTS orders_updated_idx ON orders (updated_at, id);
+
+CREATE OR REPLACE FUNCTION set_updated_at()
+RETURNS TRIGGER
+LANGUAGE plpgsql AS $$
+BEGIN
+    NEW.updated_at = clock_timestamp();
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS orders_set_updated_at ON orders;
+CREATE TRIGGER orders_set_updated_at
+    BEFORE UPDATE ON orders
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
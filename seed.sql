@@ -9,7 +9,7 @@ VALUES
 -- Admin (IBUG)
 ('00000000-0000-0000-0000-000000000001', 'Admin Trek', '00000000000', '1990-01-01', 'admin'),
 -- Functionário (Employee)
-('00000000-0000-0000-0000-000000000001', 'João Silva', '11122233344', '1995-05-20', 'employee'),
+('00000000-0000-0000-0000-000000000001', 'João Silva', '11122233396', '1995-05-20', 'employee'),
 -- Expedição (Dispatch)
 ('00000000-0000-0000-0000-000000000001', 'Expedição', '99988877766', '1985-10-10', 'dispatch');
 
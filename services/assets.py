@@ -0,0 +1,112 @@
+import hashlib
+import os
+import threading
+import time
+
+ASSET_ROOT = os.path.dirname(os.path.dirname(__file__))
+# Seconds between stat() calls on an asset; changes show up within this window.
+CHECK_INTERVAL = 2.0
+
+
+class _Asset:
+    __slots__ = ("data", "checksum", "signature", "checked_at", "loads")
+
+    def __init__(self):
+        self.data = None
+        self.checksum = None
+        self.signature = None
+        self.checked_at = float("-inf")
+        self.loads = 0
+
+
+class AssetRegistry:
+    """
+    Static files (videos, documents) loaded once per process.
+
+    Every session gets the same immutable `bytes` object, so 200 viewers of
+    the same video share one buffer (Streamlit's media storage keeps a
+    reference to it rather than a copy). Files are re-checked at most every
+    `check_interval` seconds; when size or mtime change the content is
+    re-hashed and swapped in only if the SHA-256 actually differs.
+    """
+
+    def __init__(self, root: str = ASSET_ROOT, check_interval: float = CHECK_INTERVAL):
+        self.root = root
+        self.check_interval = check_interval
+        self._assets = {}
+        self._lock = threading.Lock()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.root, name)
+
+    def _refresh(self, name: str, asset: _Asset):
+        try:
+            stat = os.stat(self._path(name))
+        except FileNotFoundError:
+            asset.data = asset.checksum = asset.signature = None
+            return
+        signature = (stat.st_size, stat.st_mtime_ns)
+        if signature == asset.signature:
+            return
+
+        with open(self._path(name), "rb") as f:
+            data = f.read()
+        checksum = hashlib.sha256(data).hexdigest()
+        asset.signature = signature
+        if checksum != asset.checksum:
+            asset.data = data
+            asset.checksum = checksum
+            asset.loads += 1
+
+    def get(self, name: str):
+        """
+        Returns the asset's shared bytes, or None if the file does not exist.
+        """
+        now = time.monotonic()
+        asset = self._assets.get(name)
+        if asset is not None and now - asset.checked_at < self.check_interval:
+            return asset.data
+
+        with self._lock:
+            asset = self._assets.setdefault(name, _Asset())
+            if now - asset.checked_at >= self.check_interval:
+                self._refresh(name, asset)
+                asset.checked_at = now
+            return asset.data
+
+    def view(self, name: str):
+        """
+        Zero-copy memoryview of the asset (for slicing), or None.
+        """
+        data = self.get(name)
+        return memoryview(data) if data is not None else None
+
+    def checksum(self, name: str):
+        self.get(name)
+        asset = self._assets.get(name)
+        return asset.checksum if asset else None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                name: {"size": len(a.data) if a.data else 0, "checksum": a.checksum, "loads": a.loads}
+                for name, a in self._assets.items()
+            }
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+def get_registry() -> AssetRegistry:
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = AssetRegistry()
+    return _registry
+
+def get_asset(name: str):
+    """
+    Shared bytes of a file in the app directory, or None if it is missing.
+    """
+    return get_registry().get(name)
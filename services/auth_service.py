@@ -1,5 +1,61 @@
 import streamlit as st
 from services.supabase_client import get_supabase
+from services.documents import only_digits
+from services.cache import TTLCache, MISSING
+from services import outbox, repositories
+
+# Only the profile fields the app reads
+PROFILE_COLUMNS = "id, company_id, name, cpf, birth_date, role, email, phone, active"
+COMPANY_COLUMNS = "id, name, logo_url"
+
+# Profiles change rarely (phone/email on the contract page, which
+# invalidates explicitly); the TTL bounds staleness from other writers.
+PROFILE_TTL = 60
+COMPANY_TTL = 600
+
+_profile_cache = TTLCache(maxsize=10000, ttl=PROFILE_TTL)
+_company_cache = TTLCache(maxsize=1000, ttl=COMPANY_TTL)
+
+def load_company(company_id):
+    """
+    Returns the company's name and logo, shared by every session.
+    """
+    if not company_id:
+        return None
+    company = _company_cache.get(company_id)
+    if company is not MISSING:
+        return company
+
+    company = repositories.companies.get(company_id, COMPANY_COLUMNS)
+    _company_cache.set(company_id, company)
+    return company
+
+def load_profile(cpf: str):
+    """
+    Returns the user profile for a CPF (with its company under "companies"),
+    memoized for PROFILE_TTL seconds. Returns None if the CPF is unknown.
+    """
+    clean_cpf = only_digits(cpf)
+    profile = _profile_cache.get(clean_cpf)
+    if profile is MISSING:
+        profile = repositories.user_profiles.get_by_cpf(clean_cpf, PROFILE_COLUMNS)
+        if profile is None:
+            # Not cached: a freshly imported employee can log in right away
+            return None
+        _profile_cache.set(clean_cpf, profile)
+
+    user = dict(profile)
+    user["companies"] = load_company(user.get("company_id")) or {}
+    return user
+
+def invalidate_profile(cpf: str):
+    """
+    Drops the cached profile, e.g. after updating phone or email.
+    """
+    _profile_cache.delete(only_digits(cpf))
+
+def invalidate_company(company_id):
+    _company_cache.delete(company_id)
 
 def login_by_cpf(cpf: str, birth_date: str = None):
     """
@@ -9,26 +65,18 @@ def login_by_cpf(cpf: str, birth_date: str = None):
     if not supabase:
         return False, "Database connection error."
 
-    # Normalize CPF (strip non-digits)
-    clean_cpf = "".join(filter(str.isdigit, cpf))
-    
     try:
-        # Query user
-        query = supabase.table("user_profiles").select("*, companies(name, logo_url)").eq("cpf", clean_cpf)
-        
-        # If birth_date provided, check it (assuming format YYYY-MM-DD or similar in DB)
-        # Note: In real production, handle date formats carefully.
-        # For this MVP, we compare string if passed.
-        if birth_date:
-             query = query.eq("birth_date", str(birth_date))
-        
-        data = query.execute()
-        
-        if data.data and len(data.data) > 0:
-            user = data.data[0]
+        user = load_profile(cpf)
+
+        # The birth date is checked here rather than in the query, so every
+        # attempt for the same CPF shares one cached profile.
+        if user and birth_date and str(user.get("birth_date")) != str(birth_date):
+            user = None
+
+        if user:
             if not user.get("active"):
                 return False, "User is inactive."
-            
+
             # Set session state
             st.session_state["user"] = user
             st.session_state["logged_in"] = True
@@ -44,9 +92,19 @@ def logout():
     st.rerun()
 
 def get_current_user():
-    return st.session_state.get("user")
+    """
+    Returns the logged-in user, refreshed from the profile cache so pages
+    see updates made since login.
+    """
+    user = st.session_state.get("user")
+    if user and user.get("cpf"):
+        fresh = load_profile(user["cpf"])
+        if fresh:
+            st.session_state["user"] = user = fresh
+    return user
 
 def require_auth():
+    outbox.start_worker()
     if not st.session_state.get("logged_in"):
         st.warning("Please log in to continue.")
         st.stop()
@@ -0,0 +1,70 @@
+import threading
+import time
+from services import repositories
+
+CATALOG_COLUMNS = "id, brand, model, description, image_url, monthly_price, insurance_price, residual_value"
+# Other app replicas do not see this process's version bumps; reload at
+# least this often so their changes show up too.
+CATALOG_MAX_AGE = 300
+
+_lock = threading.Lock()
+_load_lock = threading.Lock()
+_version = 0
+_cache = None  # (version, loaded_at, products)
+
+def catalog_version() -> int:
+    return _version
+
+def bump_catalog_version():
+    """
+    Marks the cached catalog as stale. Called after every product write.
+    """
+    global _version
+    with _lock:
+        _version += 1
+
+def _fresh(cache) -> bool:
+    return (
+        cache is not None
+        and cache[0] == _version
+        and time.monotonic() - cache[1] < CATALOG_MAX_AGE
+    )
+
+def get_active_products() -> list:
+    """
+    Returns the active products, shared by every session of the process.
+    The database is only queried after a catalog change (or CATALOG_MAX_AGE).
+
+    The product dicts are shared: treat them as read-only.
+    """
+    global _cache
+    cache = _cache
+    if _fresh(cache):
+        return list(cache[2])
+
+    # One session reloads; the others wait for its result
+    with _load_lock:
+        cache = _cache
+        if _fresh(cache):
+            return list(cache[2])
+        version = _version
+        products = tuple(repositories.products.list_active(CATALOG_COLUMNS))
+        _cache = (version, time.monotonic(), products)
+        return list(products)
+
+def get_product(product_id):
+    """
+    Returns an active product by ID from the cached catalog, or None.
+    """
+    for product in get_active_products():
+        if str(product["id"]) == str(product_id):
+            return product
+    return None
+
+def create_product(data: dict):
+    repositories.products.create(data)
+    bump_catalog_version()
+
+def set_product_active(product_id, active: bool):
+    repositories.products.set_active(product_id, active)
+    bump_catalog_version()
@@ -1,26 +1,37 @@
-import requests
+import os
+from services import http_client
+from services.documents import only_digits
+from services.tracing import traced
+from services.cache import TTLCache, SQLiteCache, MISSING, CACHE_DIR
 
-def get_address_from_cep(cep: str) -> dict:
+# Addresses barely change, so found CEPs live long; unknown CEPs are
+# re-checked sooner in case they were just created.
+CEP_TTL = 30 * 24 * 3600
+CEP_NEGATIVE_TTL = 24 * 3600
+
+_memory_cache = TTLCache(maxsize=2048, ttl=6 * 3600)
+_disk_cache = SQLiteCache(os.path.join(CACHE_DIR, "cep_cache.sqlite3"), table="cep", ttl=CEP_TTL)
+
+def get_cache_stats() -> dict:
     """
-    Fetches address information from BrasilAPI for a given CEP.
-    
-    Args:
-        cep (str): The postal code to search (can include format symbols).
-        
-    Returns:
-        dict: Address details (street, city, state, etc.) or None if not found/error.
+    Returns hit/miss counters for both cache tiers.
+    """
+    return {"memory": _memory_cache.stats(), "disk": _disk_cache.stats()}
+
+def _fetch_address(clean_cep: str):
+    """
+    Queries BrasilAPI. Returns (address, cacheable): `cacheable` is False
+    for transient failures, which must not be stored as negative entries.
     """
-    # Remove non-numeric characters
-    clean_cep = "".join(filter(str.isdigit, cep))
-    
-    if len(clean_cep) != 8:
-        return None
-        
     try:
-        response = requests.get(f"https://brasilapi.com.br/api/cep/v2/{clean_cep}", timeout=5)
+        response = http_client.get(
+            f"{http_client.BRASILAPI_URL}/cep/v2/{clean_cep}",
+            endpoint="brasilapi.cep",
+            timeout=(3.05, 5)
+        )
         if response.status_code == 200:
             data = response.json()
-            # Normalize keys to match our app usage if necessary, 
+            # Normalize keys to match our app usage if necessary,
             # but BrasilAPI v2 returns: street, city, state, neighborhood, etc.
             return {
                 "street": data.get("street"),
@@ -28,9 +39,46 @@ def get_address_from_cep(cep: str) -> dict:
                 "city": data.get("city"),
                 "state": data.get("state"),
                 "cep": clean_cep
-            }
+            }, True
+        if response.status_code == 404:
+            return None, True
     except Exception as e:
         print(f"Error fetching CEP: {e}")
+
+    return None, False
+
+@traced("brasilapi.cep")
+def get_address_from_cep(cep: str) -> dict:
+    """
+    Fetches address information from BrasilAPI for a given CEP.
+    Lookups go through an in-process LRU and a persistent SQLite cache
+    before hitting the API; unknown CEPs are cached as negative entries.
+
+    Args:
+        cep (str): The postal code to search (can include format symbols).
+
+    Returns:
+        dict: Address details (street, city, state, etc.) or None if not found/error.
+    """
+    # Remove non-numeric characters
+    clean_cep = only_digits(cep)
+
+    if len(clean_cep) != 8:
         return None
-    
-    return None
+
+    address = _memory_cache.get(clean_cep)
+    if address is not MISSING:
+        return address
+
+    address = _disk_cache.get(clean_cep)
+    if address is not MISSING:
+        _memory_cache.set(clean_cep, address)
+        return address
+
+    address, cacheable = _fetch_address(clean_cep)
+    if cacheable:
+        ttl = CEP_TTL if address else CEP_NEGATIVE_TTL
+        _disk_cache.set(clean_cep, address, ttl=ttl)
+        _memory_cache.set(clean_cep, address, ttl=min(ttl, _memory_cache.ttl))
+
+    return address
@@ -0,0 +1,84 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import pandas as pd
+from services import repositories
+from services.consult_service import consult_cnpj
+from services.http_client import RateLimiter
+from services.documents import normalize_cnpj, normalize_cnpj_series
+
+MAX_WORKERS = 8
+# BrasilAPI throttles aggressive clients; stay well under its limits.
+RATE_PER_SECOND = 5
+
+# Optional CSV columns copied to the company row as-is.
+OPTIONAL_COLUMNS = [
+    "logo_url", "responsible_cpf", "responsible_name",
+    "responsible_email", "responsible_phone"
+]
+
+def read_company_csv(file) -> list:
+    """
+    Reads a CSV with a `CNPJ` column (plus optional company columns).
+
+    Returns:
+        list: One dict per unique CNPJ, with digits-only `cnpj`.
+    """
+    df = pd.read_csv(file, dtype=str).fillna("")
+    df.columns = [c.strip().lower() for c in df.columns]
+    if "cnpj" not in df.columns:
+        raise ValueError("O arquivo precisa de uma coluna CNPJ.")
+
+    df["cnpj"] = normalize_cnpj_series(df["cnpj"])
+    df = df[df["cnpj"].notna()].drop_duplicates(subset="cnpj", keep="first")
+
+    columns = ["cnpj"] + [c for c in OPTIONAL_COLUMNS if c in df.columns]
+    return df[columns].to_dict("records")
+
+def enrich_companies(rows: list, max_workers: int = MAX_WORKERS, rate_per_second: float = RATE_PER_SECOND):
+    """
+    Looks up every CNPJ concurrently through `consult_cnpj`.
+
+    A bounded thread pool keeps at most `max_workers` lookups in flight and a
+    shared limiter caps the request rate. Results are yielded as they arrive.
+
+    Yields:
+        tuple: (row, data) where `data` is the consult_cnpj result or None.
+    """
+    limiter = RateLimiter(rate_per_second)
+
+    def lookup(row):
+        limiter.acquire()
+        return consult_cnpj(row["cnpj"])
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(lookup, row): row for row in rows}
+        for future in as_completed(futures):
+            row = futures[future]
+            try:
+                yield row, future.result()
+            except Exception as e:
+                print(f"Error enriching CNPJ {row['cnpj']}: {e}")
+                yield row, None
+
+def build_company_row(row: dict, data: dict) -> dict:
+    company = {k: v for k, v in row.items() if v}
+    company["cnpj"] = data["cnpj"]
+    company["name"] = data.get("name")
+    company["address"] = data.get("address")
+    return company
+
+def insert_companies(companies: list) -> list:
+    """
+    Inserts all companies in a single request, skipping CNPJs that are
+    already registered (in any format) or taken by a concurrent insert.
+
+    Returns:
+        list: The inserted rows.
+    """
+    if not companies:
+        return []
+
+    known = repositories.companies.existing_cnpjs(c["cnpj"] for c in companies)
+    new_rows = [c for c in companies if normalize_cnpj(c["cnpj"]) not in known]
+    if not new_rows:
+        return []
+    return repositories.companies.create_many(new_rows)
@@ -1,6 +1,9 @@
-import requests
 import datetime
+from services import http_client
+from services.documents import only_digits, is_valid_cnpj
+from services.tracing import traced
 
+@traced("brasilapi.cnpj")
 def consult_cnpj(cnpj: str) -> dict:
     """
     Fetches company data from BrasilAPI.
@@ -9,12 +12,16 @@ def consult_cnpj(cnpj: str) -> dict:
     Returns:
         dict: Company details (name, address, etc.) or None.
     """
-    clean_cnpj = "".join(filter(str.isdigit, cnpj))
-    if len(clean_cnpj) != 14:
+    clean_cnpj = only_digits(cnpj)
+    # Skip the round trip for numbers whose check digits cannot match
+    if len(clean_cnpj) != 14 or not is_valid_cnpj(clean_cnpj):
         return None
         
     try:
-        response = requests.get(f"https://brasilapi.com.br/api/cnpj/v1/{clean_cnpj}", timeout=10)
+        response = http_client.get(
+            f"{http_client.BRASILAPI_URL}/cnpj/v1/{clean_cnpj}",
+            endpoint="brasilapi.cnpj"
+        )
         if response.status_code == 200:
             data = response.json()
             address_parts = [
@@ -47,7 +54,7 @@ def consult_cpf(cpf: str) -> dict:
     Returns:
         dict: Person details (name, birth_date) or None.
     """
-    clean_cpf = "".join(filter(str.isdigit, cpf))
+    clean_cpf = only_digits(cpf)
     if len(clean_cpf) != 11:
         return None
     
@@ -0,0 +1,162 @@
+import datetime
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dateutil.relativedelta import relativedelta
+from services import repositories
+from services.pricing import calculate_contract_totals
+from services.pdf_service import render_contract_pdfs, save_contract_pdf, find_contract_pdf
+
+CONTRACT_MONTHS = 21
+
+# Everything needed to rebuild an addendum, fetched in a single query.
+ORDER_CONTRACT_SELECT = (
+    "id, company_id, signed_at, imei, delivery_address, contract_url, "
+    "user_profiles(name, cpf, email, phone), "
+    "products(brand, model, description, monthly_price, insurance_price, residual_value), "
+    "companies(*)"
+)
+
+# Below this many orders, the process pool costs more than it saves.
+PARALLEL_THRESHOLD = 20
+CHUNK_SIZE = 25
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def build_contract_data(order: dict, imei: str = None):
+    """
+    Builds the generate_contract_pdf arguments from an order joined with
+    user_profiles, products and companies.
+
+    Args:
+        order (dict): Row selected with ORDER_CONTRACT_SELECT.
+        imei (str): Overrides the order's IMEI (e.g. while linking it).
+
+    Returns:
+        tuple: (contract_data, product_data, company_data)
+    """
+    user_info = order.get("user_profiles") or {}
+    prod_info = order.get("products") or {}
+
+    # Calculate dates
+    signed_at_dt = datetime.datetime.fromisoformat(order["signed_at"])
+    start_date = signed_at_dt.strftime("%d/%m/%Y")
+    end_date = (signed_at_dt + relativedelta(months=CONTRACT_MONTHS)).strftime("%d/%m/%Y")
+
+    # Address
+    deliv = order.get("delivery_address") or {}
+    if isinstance(deliv, dict):
+        address_str = deliv.get("full", "")
+    else:
+        address_str = str(deliv)
+
+    total_monthly, residual = calculate_contract_totals(prod_info)
+
+    contract_data = {
+        "name": user_info.get("name"),
+        "cpf": user_info.get("cpf"),
+        "email": user_info.get("email"),
+        "phone": user_info.get("phone"),
+        "address": address_str,
+        "start_date": start_date,
+        "end_date": end_date,
+        "months": CONTRACT_MONTHS,
+        "value_monthly_total": total_monthly,
+        "residual_value": residual,
+        "acceptance_date": order.get("signed_at")
+    }
+
+    product_data = dict(prod_info)
+    product_data["imei"] = imei or order.get("imei")
+
+    return contract_data, product_data, order.get("companies") or {}
+
+def fetch_contract_orders(order_ids: list) -> list:
+    """
+    Fetches the joined contract data of many orders in one request.
+    """
+    if not order_ids:
+        return []
+    return repositories.orders.get_many(order_ids, ORDER_CONTRACT_SELECT)
+
+def _get_executor() -> ProcessPoolExecutor:
+    """
+    Process pool shared by every session. Workers are spawned (not forked)
+    so they never inherit the Streamlit server's threads and locks, and each
+    keeps its own PDF template warm across batches.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ProcessPoolExecutor(
+                    max_workers=os.cpu_count(),
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+    return _executor
+
+def render_orders(items: list, parallel: bool = None) -> list:
+    """
+    Renders (contract_data, product_data, company_data) items to PDF bytes,
+    across the process pool for large batches.
+    """
+    if parallel is None:
+        parallel = len(items) >= PARALLEL_THRESHOLD
+    if not parallel:
+        return render_contract_pdfs(items)
+
+    chunks = [items[i:i + CHUNK_SIZE] for i in range(0, len(items), CHUNK_SIZE)]
+    results = []
+    for pdfs in _get_executor().map(render_contract_pdfs, chunks):
+        results.extend(pdfs)
+    return results
+
+def regenerate_contract_pdfs(order_ids: list, parallel: bool = None) -> dict:
+    """
+    Regenerates the addendum of every order (e.g. after IMEIs were linked).
+    Orders whose inputs did not change reuse the PDF already in storage.
+
+    Returns:
+        dict: Manifest of order ID -> storage location. Orders that could not
+              be rendered map to None.
+    """
+    manifest = {order_id: None for order_id in order_ids}
+    manifest.update(contract_pdfs_for_orders(fetch_contract_orders(order_ids), parallel))
+    return manifest
+
+def contract_pdfs_for_orders(orders: list, parallel: bool = None) -> dict:
+    """
+    Same as regenerate_contract_pdfs, for orders already joined like
+    ORDER_CONTRACT_SELECT (e.g. the payload of an order_service transition).
+
+    PDFs are stored under a fingerprint of their inputs, so a changed
+    addendum gets a new location; it is written back to `orders.contract_url`.
+    """
+    manifest = {}
+    ids, items = [], []
+    for order in orders:
+        try:
+            item = build_contract_data(order)
+        except Exception as e:
+            print(f"[Contracts] Skipping order {order.get('id')}: {e}")
+            manifest[order.get("id")] = None
+            continue
+        existing = find_contract_pdf(item[0], item[1])
+        if existing:
+            manifest[order["id"]] = existing
+        else:
+            items.append(item)
+            ids.append(order["id"])
+
+    pdfs = render_orders(items, parallel)
+    for order_id, (contract_data, product_data, _), data in zip(ids, items, pdfs):
+        manifest[order_id] = save_contract_pdf(data, contract_data, product_data)
+
+    stored = {order.get("id"): order.get("contract_url") for order in orders}
+    repositories.orders.set_contract_urls({
+        order_id: location for order_id, location in manifest.items()
+        if location and stored.get(order_id) != location
+    })
+    return manifest
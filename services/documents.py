@@ -0,0 +1,177 @@
+import re
+import numpy as np
+import pandas as pd
+
+CPF_LENGTH = 11
+CNPJ_LENGTH = 14
+IMEI_LENGTH = 15
+
+# Mod-11 weights for the first and second check digits
+CPF_WEIGHTS = (np.arange(10, 1, -1), np.arange(11, 1, -1))
+CNPJ_WEIGHTS = (
+    np.array([5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2]),
+    np.array([6, 5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2]),
+)
+
+_NON_DIGITS = re.compile(r"\D")
+
+def only_digits(value) -> str:
+    """
+    Strips every non-digit character (dots, dashes, slashes, spaces).
+    """
+    if value is None:
+        return ""
+    return _NON_DIGITS.sub("", str(value))
+
+def _normalize(value, length: int):
+    digits = only_digits(value)
+    if not digits or len(digits) > length:
+        return None
+    return digits.zfill(length)
+
+def normalize_cpf(value):
+    """
+    Returns the CPF as 11 digits (restoring leading zeros), or None when it
+    cannot be one.
+    """
+    return _normalize(value, CPF_LENGTH)
+
+def normalize_cnpj(value):
+    """
+    Returns the CNPJ as 14 digits (restoring leading zeros), or None when it
+    cannot be one.
+    """
+    return _normalize(value, CNPJ_LENGTH)
+
+def format_cnpj(value):
+    """
+    Returns the CNPJ as 00.000.000/0000-00, or None when it cannot be one.
+    """
+    digits = normalize_cnpj(value)
+    if digits is None:
+        return None
+    return f"{digits[:2]}.{digits[2:5]}.{digits[5:8]}/{digits[8:12]}-{digits[12:]}"
+
+def _check_digit(digits, weights) -> int:
+    remainder = sum(int(d) * w for d, w in zip(digits, weights)) % 11
+    return 0 if remainder < 2 else 11 - remainder
+
+def cpf_check_digits(base: str) -> str:
+    """
+    Computes the two check digits for the first 9 digits of a CPF.
+    """
+    first = _check_digit(base, CPF_WEIGHTS[0])
+    second = _check_digit(base + str(first), CPF_WEIGHTS[1])
+    return f"{first}{second}"
+
+def cnpj_check_digits(base: str) -> str:
+    """
+    Computes the two check digits for the first 12 digits of a CNPJ.
+    """
+    first = _check_digit(base, CNPJ_WEIGHTS[0])
+    second = _check_digit(base + str(first), CNPJ_WEIGHTS[1])
+    return f"{first}{second}"
+
+def is_valid_cpf(value) -> bool:
+    cpf = normalize_cpf(value)
+    if cpf is None or len(set(cpf)) == 1:
+        return False
+    return cpf[-2:] == cpf_check_digits(cpf[:9])
+
+def is_valid_cnpj(value) -> bool:
+    cnpj = normalize_cnpj(value)
+    if cnpj is None or len(set(cnpj)) == 1:
+        return False
+    return cnpj[-2:] == cnpj_check_digits(cnpj[:12])
+
+def luhn_check_digit(base: str) -> str:
+    """
+    Computes the Luhn check digit for `base` (the first 14 digits of an IMEI).
+    """
+    total = 0
+    for i, ch in enumerate(reversed(base)):
+        digit = int(ch) * (2 if i % 2 == 0 else 1)
+        total += digit - 9 if digit > 9 else digit
+    return str((10 - total % 10) % 10)
+
+def imei_for_serial(serial: int) -> str:
+    """
+    A valid 15-digit IMEI for `serial` (demo and test data).
+    """
+    body = f"35{serial:012d}"
+    return body + luhn_check_digit(body)
+
+def normalize_imei(value):
+    """
+    Returns the IMEI as 15 digits, or None when it cannot be one.
+    """
+    digits = only_digits(value)
+    return digits if len(digits) == IMEI_LENGTH else None
+
+def is_valid_imei(value) -> bool:
+    imei = normalize_imei(value)
+    if imei is None or len(set(imei)) == 1:
+        return False
+    return imei[-1] == luhn_check_digit(imei[:-1])
+
+# --- Vectorized versions (whole columns at once) ---
+
+def _normalize_series(values: pd.Series, length: int) -> pd.Series:
+    digits = values.fillna("").astype(str).str.replace(r"\D", "", regex=True)
+    ok = (digits != "") & (digits.str.len() <= length)
+    return digits.str.zfill(length).where(ok, None)
+
+def normalize_cpf_series(values: pd.Series) -> pd.Series:
+    """
+    Vectorized normalize_cpf: None where the value cannot be a CPF.
+    """
+    return _normalize_series(values, CPF_LENGTH)
+
+def normalize_cnpj_series(values: pd.Series) -> pd.Series:
+    """
+    Vectorized normalize_cnpj: None where the value cannot be a CNPJ.
+    """
+    return _normalize_series(values, CNPJ_LENGTH)
+
+def _digit_matrix(values: pd.Series, length: int):
+    """
+    Packs fixed-length digit strings into an (n, length) uint8 matrix.
+    Returns (matrix, mask) where `mask` marks rows that are well formed.
+    """
+    strs = values.fillna("").astype(str)
+    mask = (strs.str.len() == length) & strs.str.isdigit() & strs.str.isascii()
+    packed = "".join(strs[mask].tolist()).encode("ascii")
+    matrix = np.frombuffer(packed, dtype=np.uint8).reshape(-1, length) - ord("0")
+    return matrix, mask.to_numpy()
+
+def _valid_mask(values: pd.Series, length: int, weights) -> np.ndarray:
+    matrix, mask = _digit_matrix(values, length)
+    base = length - 2
+
+    valid = ~(matrix == matrix[:, :1]).all(axis=1)
+    for i, w in enumerate(weights):
+        remainder = (matrix[:, :base + i].astype(np.int64) @ w) % 11
+        expected = np.where(remainder < 2, 0, 11 - remainder)
+        valid &= matrix[:, base + i] == expected
+
+    result = np.zeros(len(values), dtype=bool)
+    result[mask] = valid
+    return result
+
+def valid_cpf_mask(values: pd.Series) -> np.ndarray:
+    """
+    Vectorized is_valid_cpf over already normalized values.
+
+    Returns:
+        np.ndarray: Boolean array, True where the CPF check digits match.
+    """
+    return _valid_mask(values, CPF_LENGTH, CPF_WEIGHTS)
+
+def valid_cnpj_mask(values: pd.Series) -> np.ndarray:
+    """
+    Vectorized is_valid_cnpj over already normalized values.
+
+    Returns:
+        np.ndarray: Boolean array, True where the CNPJ check digits match.
+    """
+    return _valid_mask(values, CNPJ_LENGTH, CNPJ_WEIGHTS)
@@ -1,51 +1,253 @@
 import smtplib
+import threading
+import time
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from email.mime.application import MIMEApplication
 import streamlit as st
 import os
+from services.storage import read_location
+from services.tracing import traced
+
+# Connections kept open between sends (per process)
+POOL_SIZE = 2
+# Most servers drop sessions idle for a minute or more; reconnect before that.
+IDLE_TIMEOUT = 50
+SMTP_TIMEOUT = 15
+
+class Delivery:
+    """
+    Outcome of one message: truthy when the server accepted it, otherwise
+    `error` says why (stored with the outbox row).
+    """
+    __slots__ = ("error",)
+
+    def __init__(self, error: str = None):
+        self.error = error
+
+    def __bool__(self):
+        return self.error is None
+
+    def __repr__(self):
+        return "Delivery(ok)" if self.error is None else f"Delivery({self.error!r})"
+
+    @classmethod
+    def failed(cls, exc) -> "Delivery":
+        return cls(f"{type(exc).__name__}: {exc}")
+
+
+def build_message(sender: str, to_email: str, subject: str, body: str, attachment_path: str = None):
+    msg = MIMEMultipart()
+    msg['From'] = sender
+    msg['To'] = to_email
+    msg['Subject'] = subject
+    msg.attach(MIMEText(body, 'plain'))
+
+    if attachment_path:
+        # A contract location: a local path or a storage URL (see storage.read_location)
+        name = os.path.basename(attachment_path)
+        part = MIMEApplication(read_location(attachment_path), Name=name)
+        part['Content-Disposition'] = f'attachment; filename="{name}"'
+        msg.attach(part)
+    return msg
+
+
+class SMTPPool:
+    """
+    Keeps authenticated SMTP sessions open across messages.
+
+    A session is checked out for a whole batch, so `send_many` pays the
+    connect/STARTTLS/login handshake once. Sessions idle for longer than
+    `idle_timeout` are replaced, and a session the server dropped anyway is
+    reconnected once before the message is reported as failed.
+    """
+
+    def __init__(self, config: dict, size: int = POOL_SIZE, idle_timeout: float = IDLE_TIMEOUT,
+                 factory=smtplib.SMTP):
+        self.config = dict(config)
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.factory = factory
+        self._idle = []  # (connection, last_used)
+        self._lock = threading.Lock()
+        self.connects = 0
+
+    def _connect(self):
+        server = self.factory(self.config["server"], self.config["port"], timeout=SMTP_TIMEOUT)
+        try:
+            if self.config.get("starttls", True):
+                server.starttls()
+            if self.config.get("username"):
+                server.login(self.config["username"], self.config["password"])
+        except Exception:
+            self._discard(server)
+            raise
+        with self._lock:
+            self.connects += 1
+        return server
+
+    @staticmethod
+    def _discard(server):
+        if server is None:
+            return
+        try:
+            server.quit()
+        except Exception:
+            try:
+                server.close()
+            except Exception:
+                pass
+
+    def _acquire(self):
+        now = time.monotonic()
+        with self._lock:
+            while self._idle:
+                server, last_used = self._idle.pop()
+                if now - last_used < self.idle_timeout:
+                    return server
+                self._discard(server)
+        return self._connect()
+
+    def _release(self, server):
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append((server, time.monotonic()))
+                return
+        self._discard(server)
+
+    def send_many(self, messages) -> list:
+        """
+        Sends every message over one session. If no session can be opened
+        (server down, bad credentials), the rest of the batch is failed
+        without trying to connect again for each message.
+
+        Returns:
+            list: One Delivery per message, truthy when the server accepted it.
+        """
+        messages = list(messages)
+        results = []
+        server = None
+        try:
+            for msg in messages:
+                ok, error = False, None
+                for _ in range(2):
+                    if server is None:
+                        try:
+                            server = self._acquire()
+                        except Exception as e:
+                            print(f"[Email] Cannot connect to SMTP server: {e}")
+                            return results + [Delivery.failed(e)] * (len(messages) - len(results))
+                    try:
+                        server.send_message(msg)
+                        ok = True
+                        break
+                    except smtplib.SMTPServerDisconnected as e:
+                        # Dropped while idle or mid-batch: retry on a new session
+                        error = e
+                    except smtplib.SMTPResponseException as e:
+                        error = e
+                        if e.smtp_code != 421:
+                            # Message rejected; smtplib already reset the session
+                            break
+                    except smtplib.SMTPRecipientsRefused as e:
+                        error = e
+                        break
+                    except Exception as e:
+                        error = e
+                        self._discard(server)
+                        server = None
+                        break
+                    self._discard(server)
+                    server = None
+                if not ok:
+                    print(f"[Email] Error sending to {msg['To']}: {error}")
+                results.append(Delivery() if ok else Delivery.failed(error))
+        finally:
+            if server is not None:
+                self._release(server)
+        return results
+
+    def send(self, msg) -> bool:
+        return bool(self.send_many([msg])[0])
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for server, _ in idle:
+            self._discard(server)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool(smtp_config) -> SMTPPool:
+    """
+    Returns the process-wide pool, rebuilding it if the SMTP settings changed.
+    """
+    global _pool
+    config = dict(smtp_config)
+    with _pool_lock:
+        if _pool is None or _pool.config != config:
+            if _pool is not None:
+                _pool.close()
+            _pool = SMTPPool(config)
+        return _pool
+
+def _mock_send(to_email, subject, body, attachment_path=None):
+    print(f"--- [MOCK EMAIL] ---")
+    print(f"To: {to_email}")
+    print(f"Subject: {subject}")
+    print(f"Body: {body}")
+    if attachment_path:
+        print(f"Attachment: {attachment_path}")
+    print(f"--------------------")
+    return True
+
+@traced("email.send")
+def send_many(emails) -> list:
+    """
+    Sends a batch of emails over a single pooled SMTP session.
+
+    Args:
+        emails: Iterable of dicts with to_email, subject, body and optionally
+                attachment_path.
+
+    Returns:
+        list: One Delivery per email, in order (truthy when sent).
+    """
+    emails = list(emails)
+    smtp_config = st.secrets.get("smtp")
+
+    results = [None] * len(emails)
+    messages, positions = [], []
+    for i, email in enumerate(emails):
+        if not email.get("to_email"):
+            print(f"[Email] Skipped: No recipient.")
+            results[i] = Delivery("No recipient")
+        elif not smtp_config:
+            _mock_send(email["to_email"], email["subject"], email["body"], email.get("attachment_path"))
+            results[i] = Delivery()
+        else:
+            try:
+                messages.append(build_message(
+                    smtp_config.get("sender_email", "noreply@trek.com.br"),
+                    email["to_email"], email["subject"], email["body"], email.get("attachment_path")
+                ))
+                positions.append(i)
+            except Exception as e:
+                print(f"[Email] Error: {e}")
+                results[i] = Delivery.failed(e)
+
+    if messages:
+        for i, ok in zip(positions, get_pool(smtp_config).send_many(messages)):
+            results[i] = ok
+    return results
 
 def send_email(to_email: str, subject: str, body: str, attachment_path: str = None):
     """
     Sends an email. For MVP, we will simulate this by logging to console
     if no SMTP secrets are configured.
     """
-    if not to_email:
-        print(f"[Email] Skipped: No recipient.")
-        return False
-
-    smtp_config = st.secrets.get("smtp")
-    
-    # If no SMTP config, mock it
-    if not smtp_config:
-        print(f"--- [MOCK EMAIL] ---")
-        print(f"To: {to_email}")
-        print(f"Subject: {subject}")
-        print(f"Body: {body}")
-        if attachment_path:
-            print(f"Attachment: {attachment_path}")
-        print(f"--------------------")
-        return True
-
-    try:
-        msg = MIMEMultipart()
-        msg['From'] = smtp_config.get("sender_email", "noreply@trek.com.br")
-        msg['To'] = to_email
-        msg['Subject'] = subject
-        msg.attach(MIMEText(body, 'plain'))
-
-        if attachment_path and os.path.exists(attachment_path):
-            with open(attachment_path, "rb") as f:
-                part = MIMEApplication(f.read(), Name=os.path.basename(attachment_path))
-            part['Content-Disposition'] = f'attachment; filename="{os.path.basename(attachment_path)}"'
-            msg.attach(part)
-
-        server = smtplib.SMTP(smtp_config["server"], smtp_config["port"])
-        server.starttls()
-        server.login(smtp_config["username"], smtp_config["password"])
-        server.send_message(msg)
-        server.quit()
-        return True
-    except Exception as e:
-        print(f"[Email] Error: {e}")
-        return False
+    return bool(send_many([{
+        "to_email": to_email, "subject": subject, "body": body, "attachment_path": attachment_path
+    }])[0])
@@ -0,0 +1,176 @@
+import pandas as pd
+from services import repositories
+from services.documents import normalize_cpf_series, valid_cpf_mask
+
+REQUIRED_COLUMNS = ["Nome", "CPF", "Email"]
+CHUNK_SIZE = 500
+EMAIL_PATTERN = r"^[^@\s]+@[^@\s]+\.[^@\s]+$"
+
+def _match_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Renames columns to the canonical `Nome`, `CPF`, `Email` regardless of
+    case or surrounding whitespace.
+    """
+    lookup = {c.strip().lower(): c for c in df.columns}
+    missing = [c for c in REQUIRED_COLUMNS if c.lower() not in lookup]
+    if missing:
+        raise ValueError(f"Colunas obrigatórias ausentes: {', '.join(missing)}")
+    return df.rename(columns={lookup[c.lower()]: c for c in REQUIRED_COLUMNS})
+
+def prepare_employees(df: pd.DataFrame, row_offset: int = 0):
+    """
+    Normalizes and validates an employee roster using column-wise operations.
+
+    Args:
+        df (pd.DataFrame): Raw roster with `Nome`, `CPF`, `Email` columns.
+        row_offset (int): Rows already consumed before this frame, so error
+                          reports point at the spreadsheet line.
+
+    Returns:
+        tuple: (valid, errors) where `valid` is a DataFrame with `name`, `cpf`,
+               `email` and `row` columns, and `errors` a list of dicts with
+               `row`, `cpf` and `error`.
+    """
+    df = _match_columns(df)
+
+    out = pd.DataFrame({
+        # +2: header line plus 1-based numbering
+        "row": range(row_offset + 2, row_offset + 2 + len(df)),
+        "name": df["Nome"].fillna("").astype(str).str.strip(),
+        # Pads the leading zeros spreadsheets drop from numeric CPFs
+        "cpf": normalize_cpf_series(df["CPF"]).fillna(""),
+        "email": df["Email"].fillna("").astype(str).str.strip().str.lower(),
+    })
+
+    error = pd.Series("", index=out.index)
+    bad_email = (out["email"] != "") & ~out["email"].str.match(EMAIL_PATTERN)
+    error = error.mask(bad_email, "E-mail inválido")
+    error = error.mask(~valid_cpf_mask(out["cpf"]), "CPF inválido")
+    error = error.mask(out["name"] == "", "Nome vazio")
+
+    # Within the file, the last occurrence of a CPF wins.
+    ok = error == ""
+    duplicated = out.loc[ok, "cpf"].duplicated(keep="last")
+    error[duplicated[duplicated].index] = "CPF duplicado no arquivo"
+
+    is_error = error != ""
+    errors = [
+        {"row": int(r), "cpf": c, "error": e}
+        for r, c, e in zip(out.loc[is_error, "row"], out.loc[is_error, "cpf"], error[is_error])
+    ]
+    valid = out[~is_error].copy()
+    valid["email"] = valid["email"].replace("", None)
+    return valid, errors
+
+def _foreign_profiles(cpfs, company_id: str) -> dict:
+    """
+    CPFs of `cpfs` whose existing profile the upload must not touch: one of
+    another company, or an admin/HR/dispatch account.
+
+    Returns:
+        dict: CPF -> error message.
+    """
+    foreign = {}
+    for profile in repositories.user_profiles.by_cpfs(cpfs, "cpf, company_id, role"):
+        if profile.get("role") != "employee":
+            foreign[profile["cpf"]] = "CPF pertence a um usuário que não é funcionário"
+        elif profile.get("company_id") != company_id:
+            foreign[profile["cpf"]] = "CPF pertence a funcionário de outra empresa"
+    return foreign
+
+def _write_errors(rows: pd.DataFrame, exc: Exception) -> list:
+    return [{"row": int(r), "cpf": c, "error": f"Falha ao gravar: {exc}"} for r, c in zip(rows["row"], rows["cpf"])]
+
+def upsert_employees(valid: pd.DataFrame, company_id: str, chunk_size: int = CHUNK_SIZE):
+    """
+    Upserts prepared employees into `user_profiles` keyed on CPF, one
+    request per chunk. A failing chunk is reported and the rest proceed.
+
+    CPFs already registered to another company or to a non-employee account
+    are reported and left untouched. An empty e-mail keeps the stored one.
+
+    Returns:
+        tuple: (written, errors) where `written` holds the rows of `valid`
+               that were stored.
+    """
+    written = []
+    errors = []
+
+    records = valid.assign(company_id=company_id, active=True)
+    columns = ["name", "cpf", "email", "company_id", "active"]
+
+    for start in range(0, len(records), chunk_size):
+        chunk = records.iloc[start:start + chunk_size]
+        try:
+            foreign = _foreign_profiles(chunk["cpf"], company_id)
+        except Exception as e:
+            errors.extend(_write_errors(chunk, e))
+            continue
+        rejected = chunk["cpf"].isin(list(foreign))
+        errors.extend(
+            {"row": int(r), "cpf": c, "error": foreign[c]}
+            for r, c in zip(chunk.loc[rejected, "row"], chunk.loc[rejected, "cpf"])
+        )
+        chunk = chunk[~rejected]
+
+        # Every row of an upsert sends the same columns, and a column sent
+        # as null overwrites the stored value, so rows without an e-mail go
+        # in a request that leaves `email` out.
+        has_email = chunk["email"].notna()
+        for part, cols in ((chunk[has_email], columns), (chunk[~has_email], [c for c in columns if c != "email"])):
+            if part.empty:
+                continue
+            try:
+                # New rows pick up column defaults (role); existing rows keep
+                # the columns we do not send.
+                repositories.user_profiles.upsert_by_cpf(part[cols].to_dict("records"))
+                written.append(part)
+            except Exception as e:
+                errors.extend(_write_errors(part, e))
+
+    if not written:
+        return valid.iloc[:0], errors
+    return pd.concat(written), errors
+
+def import_employees(batches, company_id: str, filename: str, chunk_size: int = CHUNK_SIZE) -> dict:
+    """
+    Validates a roster, upserts it in chunks and records the upload in
+    `movements`.
+
+    Args:
+        batches: Iterable of DataFrames (see upload_reader.iter_batches), so
+                 the roster never needs to be fully in memory.
+
+    Returns:
+        dict: {"total", "imported", "errors"} where `errors` is the per-row report.
+    """
+    total = 0
+    errors = []
+    # CPF -> spreadsheet row of its latest stored occurrence across batches
+    stored = {}
+
+    for df in batches:
+        valid, batch_errors = prepare_employees(df, row_offset=total)
+        total += len(df)
+        errors.extend(batch_errors)
+
+        written, write_errors = upsert_employees(valid, company_id, chunk_size)
+        errors.extend(write_errors)
+
+        # A CPF repeated in a later batch overwrites the earlier upsert, so
+        # the earlier row is the one reported as duplicate.
+        for cpf, row in zip(written["cpf"], written["row"]):
+            previous = stored.get(cpf)
+            if previous is not None:
+                errors.append({"row": previous, "cpf": cpf, "error": "CPF duplicado no arquivo"})
+            stored[cpf] = int(row)
+
+    imported = len(stored)
+    if imported:
+        repositories.movements.record(company_id, filename, "admissao")
+
+    return {
+        "total": total,
+        "imported": imported,
+        "errors": sorted(errors, key=lambda e: e["row"])
+    }
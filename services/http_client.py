@@ -0,0 +1,144 @@
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from services.tracing import span
+
+BRASILAPI_URL = "https://brasilapi.com.br/api"
+
+# (connect, read) timeouts in seconds. Connecting should be fast; BrasilAPI
+# itself can take a few seconds to answer when upstream sources are slow.
+DEFAULT_TIMEOUT = (3.05, 10)
+
+POOL_CONNECTIONS = 4    # Number of distinct hosts kept in the pool
+POOL_MAXSIZE = 10       # Keep-alive connections per host
+MAX_RETRIES = 3
+BACKOFF_FACTOR = 0.3    # Sleeps 0.3s, 0.6s, 1.2s (+ jitter) between retries
+BACKOFF_JITTER = 0.2
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_session = None
+_session_lock = threading.Lock()
+_metrics = {}
+_metrics_lock = threading.Lock()
+
+def _build_session() -> requests.Session:
+    retry = Retry(
+        total=MAX_RETRIES,
+        connect=MAX_RETRIES,
+        read=MAX_RETRIES,
+        status=MAX_RETRIES,
+        backoff_factor=BACKOFF_FACTOR,
+        backoff_jitter=BACKOFF_JITTER,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(["GET", "HEAD"]),
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(
+        pool_connections=POOL_CONNECTIONS,
+        pool_maxsize=POOL_MAXSIZE,
+        pool_block=True,
+        max_retries=retry
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"User-Agent": "trek-mvp/1.0"})
+    return session
+
+def get_session() -> requests.Session:
+    """
+    Returns the process-wide pooled session, creating it on first use.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+def reset_session():
+    """
+    Closes pooled connections and discards the shared session.
+    """
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+
+def _record(endpoint: str, elapsed: float, ok: bool):
+    with _metrics_lock:
+        m = _metrics.setdefault(endpoint, {
+            "count": 0, "errors": 0, "total_time": 0.0, "max_time": 0.0
+        })
+        m["count"] += 1
+        m["total_time"] += elapsed
+        m["max_time"] = max(m["max_time"], elapsed)
+        if not ok:
+            m["errors"] += 1
+
+def get(url: str, endpoint: str = None, timeout=DEFAULT_TIMEOUT, **kwargs) -> requests.Response:
+    """
+    Performs a GET through the shared session, retrying 429/5xx and
+    connection errors with exponential backoff.
+
+    Args:
+        url (str): Full URL to fetch.
+        endpoint (str): Metrics label (e.g. "brasilapi.cep"). Defaults to the URL.
+        timeout: Either a single value or a (connect, read) tuple.
+
+    Returns:
+        requests.Response: The final response after retries.
+        Raises requests exceptions when every attempt fails.
+    """
+    endpoint = endpoint or url
+    start = time.perf_counter()
+    ok = False
+    try:
+        with span(f"http.{endpoint}"):
+            response = get_session().get(url, timeout=timeout, **kwargs)
+        ok = response.status_code < 500
+        return response
+    finally:
+        _record(endpoint, time.perf_counter() - start, ok)
+
+class RateLimiter:
+    """
+    Thread-safe limiter spacing calls at most `rate` per second across
+    all threads that share it.
+    """
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+def get_metrics() -> dict:
+    """
+    Returns per-endpoint latency metrics: count, errors, avg/max seconds.
+    """
+    with _metrics_lock:
+        return {
+            name: {
+                "count": m["count"],
+                "errors": m["errors"],
+                "avg_time": m["total_time"] / m["count"] if m["count"] else 0.0,
+                "max_time": m["max_time"]
+            }
+            for name, m in _metrics.items()
+        }
+
+def reset_metrics():
+    with _metrics_lock:
+        _metrics.clear()
@@ -0,0 +1,241 @@
+import hashlib
+import io
+import os
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from PIL import Image, ImageOps, features
+from services import http_client
+from services.cache import CACHE_DIR, TTLCache, MISSING
+
+THUMB_DIR = os.path.join(CACHE_DIR, "thumbnails")
+
+# Widths the app displays, doubled for high-density phone screens
+LOGO_WIDTH = 160      # logos and Admin catalog (80px)
+CARD_WIDTH = 480      # Store grid cards
+DETAIL_WIDTH = 720    # Contract page product image
+THUMB_WIDTHS = (LOGO_WIDTH, CARD_WIDTH, DETAIL_WIDTH)
+
+MAX_CACHE_BYTES = 100 * 1024 * 1024
+MAX_SOURCE_BYTES = 15 * 1024 * 1024
+# Broken image URLs are retried after this many seconds, not on every rerun
+NEGATIVE_TTL = 300
+QUALITY = 80
+FORMAT, EXTENSION = ("WEBP", "webp") if features.check("webp") else ("JPEG", "jpg")
+
+# Hot thumbnails, so reruns do not touch the disk
+_memory_cache = TTLCache(maxsize=512, ttl=3600)
+# Striped locks: one download per URL even when many sessions miss at once
+_locks = [threading.Lock() for _ in range(16)]
+# Background downloads for image_source() misses
+WARM_WORKERS = 4
+_executor = None
+_executor_lock = threading.Lock()
+_warming = {}  # url -> Future
+_warming_lock = threading.Lock()
+# Bytes in each thumbnail directory, measured once then tracked on writes
+_cache_bytes = {}
+_size_lock = threading.Lock()
+
+def _key(url: str) -> str:
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+def _thumb_path(key: str, width: int) -> str:
+    return os.path.join(THUMB_DIR, key[:2], f"{key}-{width}.{EXTENSION}")
+
+def _fetch(url: str) -> bytes:
+    # Streamed responses hold their pooled connection until closed, and the
+    # pool blocks when full: close on every path, errors included
+    with http_client.get(url, endpoint="images", stream=True) as response:
+        response.raise_for_status()
+        data = bytearray()
+        for chunk in response.iter_content(64 * 1024):
+            data.extend(chunk)
+            if len(data) > MAX_SOURCE_BYTES:
+                raise ValueError(f"Image larger than {MAX_SOURCE_BYTES} bytes: {url}")
+    return bytes(data)
+
+def make_thumbnails(data: bytes, widths=THUMB_WIDTHS) -> dict:
+    """
+    Resizes image bytes to each width (never upscaling).
+
+    Returns:
+        dict: width -> encoded thumbnail bytes.
+    """
+    with Image.open(io.BytesIO(data)) as source:
+        image = ImageOps.exif_transpose(source)
+        if FORMAT == "JPEG":
+            image = image.convert("RGB")
+        elif image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA")
+        thumbs = {}
+        for width in widths:
+            thumb = image.copy()
+            if thumb.width > width:
+                thumb.thumbnail((width, round(thumb.height * width / thumb.width)), Image.LANCZOS)
+            out = io.BytesIO()
+            thumb.save(out, FORMAT, quality=QUALITY)
+            thumbs[width] = out.getvalue()
+        return thumbs
+
+def _write(path: str, data: bytes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".part")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+def _read(path: str):
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+    # mtime doubles as the last-use time for LRU eviction
+    os.utime(path)
+    return data
+
+def _entries():
+    """(mtime, size, path) of every cached thumbnail file."""
+    entries = []
+    for root, _, files in os.walk(THUMB_DIR):
+        for name in files:
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+    return entries
+
+def enforce_cache_limit(max_bytes: int = MAX_CACHE_BYTES):
+    """
+    Deletes the least recently used thumbnails until the cache is under 90%
+    of `max_bytes`. Walks the whole cache directory; get_thumbnail only
+    calls it when the tracked size goes over the limit.
+    """
+    entries = _entries()
+    total = sum(size for _, size, _ in entries)
+    if total > max_bytes:
+        target = max_bytes * 0.9
+        for _, size, path in sorted(entries):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            if total <= target:
+                break
+        _memory_cache.clear()
+    with _size_lock:
+        _cache_bytes[THUMB_DIR] = total
+
+def _account(nbytes: int):
+    """
+    Adds newly written bytes to the tracked cache size (measured once per
+    process, then kept incrementally) and evicts when over the limit.
+    Writes by other processes are picked up at the next eviction's walk.
+    """
+    with _size_lock:
+        total = _cache_bytes.get(THUMB_DIR)
+        if total is not None:
+            total = _cache_bytes[THUMB_DIR] = total + nbytes
+    if total is None:
+        with _size_lock:
+            total = _cache_bytes[THUMB_DIR] = sum(size for _, size, _ in _entries())
+    if total > MAX_CACHE_BYTES:
+        enforce_cache_limit(MAX_CACHE_BYTES)
+
+def cached_thumbnail(url: str, width: int = CARD_WIDTH):
+    """
+    The thumbnail if it is in memory or on disk, without downloading.
+
+    Returns:
+        bytes, None (the image recently failed) or MISSING (not produced yet).
+    """
+    key = _key(url)
+    cached = _memory_cache.get((key, width))
+    if cached is not MISSING:
+        return cached
+    data = _read(_thumb_path(key, width))
+    if data is None:
+        return MISSING
+    _memory_cache.set((key, width), data)
+    return data
+
+def get_thumbnail(url: str, width: int = CARD_WIDTH):
+    """
+    Returns a resized thumbnail of the image at `url`, downloading and
+    resizing it only the first time (all THUMB_WIDTHS are produced at once).
+
+    Returns:
+        bytes: Thumbnail, or None if the image could not be fetched/decoded.
+    """
+    if not url:
+        return None
+    data = cached_thumbnail(url, width)
+    if data is not MISSING:
+        return data
+
+    key = _key(url)
+    path = _thumb_path(key, width)
+    with _locks[int(key[:2], 16) % len(_locks)]:
+        data = _read(path)
+        if data is None:
+            try:
+                widths = sorted(set(THUMB_WIDTHS) | {width})
+                thumbs = make_thumbnails(_fetch(url), widths)
+            except Exception as e:
+                print(f"[Images] Could not thumbnail {url}: {e}")
+                _memory_cache.set((key, width), None, ttl=NEGATIVE_TTL)
+                return None
+            for w, thumb in thumbs.items():
+                _write(_thumb_path(key, w), thumb)
+            data = thumbs[width]
+            _account(sum(map(len, thumbs.values())))
+
+    _memory_cache.set((key, width), data)
+    return data
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=WARM_WORKERS, thread_name_prefix="thumbnails")
+    return _executor
+
+def _warm(url: str, width: int):
+    try:
+        return get_thumbnail(url, width)
+    finally:
+        with _warming_lock:
+            _warming.pop(url, None)
+
+def warm_thumbnail(url: str, width: int = CARD_WIDTH) -> Future:
+    """
+    Produces the thumbnails of `url` in the background (once per URL while
+    in flight).
+    """
+    with _warming_lock:
+        future = _warming.get(url)
+        if future is None:
+            future = _warming[url] = _get_executor().submit(_warm, url, width)
+    return future
+
+def image_source(url: str, width: int = CARD_WIDTH, fallback: str = None):
+    """
+    What to pass to `st.image`: the cached thumbnail, or the original URL
+    (or `fallback`) when no thumbnail can be produced.
+
+    Never downloads during the rerun: on a miss the browser loads the
+    original URL this time, and the thumbnail is produced in the background
+    for the next rerun.
+    """
+    if not url:
+        return fallback
+    data = cached_thumbnail(url, width)
+    if data is MISSING:
+        warm_thumbnail(url, width)
+        return url
+    return data or url
@@ -0,0 +1,166 @@
+import re
+import pandas as pd
+from services import repositories
+from services.documents import normalize_imei, is_valid_imei
+from services.outbox import enqueue_emails
+
+REQUIRED_COLUMNS = ["order_id", "imei"]
+COLUMN_ALIASES = {"pedido": "order_id", "order": "order_id"}
+# Shortest order reference accepted: the "#1a2b3c4d" shown on the Dispatch page
+MIN_REF_LENGTH = 8
+
+_SEPARATORS = re.compile(r"[,;\t ]+")
+
+def _match_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Renames columns to `order_id` and `imei` regardless of case, surrounding
+    whitespace or the Portuguese "Pedido".
+    """
+    lookup = {}
+    for c in df.columns:
+        key = str(c).strip().lower()
+        lookup.setdefault(COLUMN_ALIASES.get(key, key), c)
+    missing = [c for c in REQUIRED_COLUMNS if c not in lookup]
+    if missing:
+        raise ValueError(f"Colunas obrigatórias ausentes: {', '.join(missing)}")
+    return df.rename(columns={lookup[c]: c for c in REQUIRED_COLUMNS})
+
+def parse_scanned(text: str) -> pd.DataFrame:
+    """
+    Reads barcode-scanner (or pasted) input: one `order_id, IMEI` pair per
+    line, separated by comma, semicolon, tab or spaces. A header line is
+    ignored.
+
+    Returns:
+        pd.DataFrame: `row` (line number), `order_id` and `imei` columns.
+    """
+    rows = []
+    for number, line in enumerate((text or "").splitlines(), start=1):
+        parts = [p for p in _SEPARATORS.split(line.strip()) if p]
+        if not parts or (parts[-1].lower() == "imei" and not rows):
+            continue
+        order_id = parts[0] if len(parts) > 1 else ""
+        rows.append((number, order_id, parts[-1]))
+    return pd.DataFrame(rows, columns=["row", "order_id", "imei"])
+
+def read_links(batches) -> pd.DataFrame:
+    """
+    Collects an uploaded CSV/XLSX (see upload_reader.iter_batches) into one
+    frame with `row` (spreadsheet line), `order_id` and `imei` columns.
+    """
+    frames, total = [], 0
+    for df in batches:
+        df = _match_columns(df)
+        # +2: header line plus 1-based numbering
+        frames.append(pd.DataFrame({
+            "row": range(total + 2, total + 2 + len(df)),
+            "order_id": df["order_id"].to_numpy(),
+            "imei": df["imei"].to_numpy(),
+        }))
+        total += len(df)
+    if not frames:
+        return pd.DataFrame(columns=["row", "order_id", "imei"])
+    return pd.concat(frames, ignore_index=True)
+
+def _resolver(pending_orders):
+    by_id = {str(o["id"]).lower(): o for o in pending_orders}
+    by_prefix = {}
+    for order_id, order in by_id.items():
+        by_prefix.setdefault(order_id[:MIN_REF_LENGTH], []).append(order)
+
+    def resolve(ref: str):
+        ref = ref.strip().lstrip("#").lower()
+        if ref in by_id:
+            return by_id[ref]
+        if len(ref) < MIN_REF_LENGTH:
+            return None
+        matches = [o for o in by_prefix.get(ref[:MIN_REF_LENGTH], []) if str(o["id"]).lower().startswith(ref)]
+        return matches[0] if len(matches) == 1 else None
+    return resolve
+
+def prepare_links(df: pd.DataFrame, pending_orders):
+    """
+    Validates `order_id, IMEI` pairs before linking.
+
+    An order must be one of `pending_orders` (waiting for an IMEI), given by
+    its ID or an unambiguous prefix of at least MIN_REF_LENGTH characters.
+    An IMEI must pass the Luhn check, appear once in the batch, and not be
+    linked to any order yet (checked with one query for the whole batch).
+
+    Returns:
+        tuple: (valid, errors) where `valid` is a list of dicts with `row`,
+               `order_id`, `imei` and the resolved `order`, and `errors` a
+               list of dicts with `row`, `order_id`, `imei` and `error`.
+    """
+    resolve = _resolver(pending_orders)
+    candidates, errors = [], []
+    for row, ref, raw_imei in zip(df["row"], df["order_id"].fillna(""), df["imei"].fillna("")):
+        ref, raw_imei = str(ref), str(raw_imei)
+        order = resolve(ref)
+        if order is None:
+            error = "Pedido não encontrado ou não aguarda IMEI"
+        elif not is_valid_imei(raw_imei):
+            error = "IMEI inválido"
+        else:
+            candidates.append({"row": int(row), "order_id": str(order["id"]), "imei": normalize_imei(raw_imei), "order": order})
+            continue
+        errors.append({"row": int(row), "order_id": ref, "imei": raw_imei, "error": error})
+
+    # Repeated IMEIs or orders are ambiguous: every occurrence is rejected
+    imei_counts = pd.Series([c["imei"] for c in candidates], dtype=object).value_counts()
+    order_counts = pd.Series([c["order_id"] for c in candidates], dtype=object).value_counts()
+    in_use = {o["imei"]: o["id"] for o in repositories.orders.with_imeis(imei_counts.index)}
+
+    valid = []
+    for c in candidates:
+        if imei_counts[c["imei"]] > 1:
+            error = "IMEI duplicado no arquivo"
+        elif order_counts[c["order_id"]] > 1:
+            error = "Pedido duplicado no arquivo"
+        elif c["imei"] in in_use:
+            error = f"IMEI já vinculado ao pedido #{str(in_use[c['imei']])[:8]}"
+        else:
+            valid.append(c)
+            continue
+        errors.append({"row": c["row"], "order_id": c["order_id"], "imei": c["imei"], "error": error})
+
+    errors.sort(key=lambda e: e["row"])
+    return valid, errors
+
+def linked_email(order: dict) -> dict:
+    return {
+        "to_email": order.get("email"),
+        "subject": "Trek - Aparelho Preparado",
+        "body": f"Seu aparelho foi vinculado ao IMEI: {order['imei']}. Em breve será expedido.",
+    }
+
+def link_imei_batch(df: pd.DataFrame, pending_orders) -> dict:
+    """
+    Validates a batch of `order_id, IMEI` pairs, links the valid ones in a
+    single database call and queues the customers' notifications with a
+    single insert.
+
+    Args:
+        df (pd.DataFrame): Pairs from parse_scanned() or read_links().
+        pending_orders: Orders currently waiting for an IMEI.
+
+    Returns:
+        dict: {"total", "linked", "notified", "errors"} where `errors` is the
+              per-row report.
+    """
+    valid, errors = prepare_links(df, pending_orders)
+    linked = []
+    if valid:
+        linked = repositories.orders.link_imeis([{"order_id": v["order_id"], "imei": v["imei"]} for v in valid])
+
+    # Rows the database skipped changed since the queue was loaded
+    linked_ids = {str(o["id"]) for o in linked}
+    errors.extend(
+        {"row": v["row"], "order_id": v["order_id"], "imei": v["imei"],
+         "error": "Pedido ou IMEI alterado por outro usuário"}
+        for v in valid if v["order_id"] not in linked_ids
+    )
+    errors.sort(key=lambda e: e["row"])
+
+    notified = enqueue_emails(linked_email(o) for o in linked)
+    return {"total": len(df), "linked": len(linked), "notified": notified, "errors": errors}
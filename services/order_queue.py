@@ -0,0 +1,110 @@
+import datetime
+from services import repositories
+
+PAGE_SIZE = 25
+
+# Only what the Admin queue renders
+QUEUE_COLUMNS = (
+    "id, status, created_at, signed_at, imei, company_id, "
+    "user_profiles(name, cpf), products(brand, model)"
+)
+
+def fetch_order_page(cursor: tuple = None, page_size: int = PAGE_SIZE, status: list = None,
+                     company_id: str = None, date_from: datetime.date = None,
+                     date_to: datetime.date = None):
+    """
+    Returns one page of the order queue, newest first, using keyset
+    pagination on (created_at, id): each page is an index range scan that
+    costs the same regardless of how many orders exist.
+
+    Args:
+        cursor (tuple): (created_at, id) of the last order of the previous
+                        page, or None for the first page.
+        status (list): Only orders in these statuses.
+        company_id (str): Only orders of this company.
+        date_from, date_to (datetime.date): Inclusive creation date range.
+
+    Returns:
+        tuple: (orders, next_cursor). next_cursor is None on the last page.
+    """
+    # One extra row tells whether another page exists
+    orders = repositories.orders.page(
+        QUEUE_COLUMNS, page_size + 1, cursor=cursor, status=status,
+        company_id=company_id, date_from=date_from, date_to=date_to
+    )
+
+    next_cursor = None
+    if len(orders) > page_size:
+        orders = orders[:page_size]
+        next_cursor = (orders[-1]["created_at"], orders[-1]["id"])
+    return orders, next_cursor
+
+# --- Dispatch queue ---
+
+# Delta queries start this far before the watermark: a transaction that
+# commits late can carry an updated_at older than rows already seen.
+DELTA_OVERLAP = datetime.timedelta(seconds=5)
+# Renames and email changes in the joined tables do not touch
+# orders.updated_at; a periodic full reload picks them up.
+FULL_REFRESH_INTERVAL = datetime.timedelta(minutes=10)
+
+def _now() -> datetime.datetime:
+    return datetime.datetime.now(datetime.timezone.utc)
+
+class DispatchQueue:
+    """
+    The Dispatch page's orders (see repositories.DISPATCH_STATUSES), kept
+    between reruns: after the first load each refresh() fetches only the
+    orders whose updated_at is past the watermark (the newest change seen)
+    and merges them in, so a rerun costs the number of changes rather than
+    the size of the backlog.
+
+    Keep one per session (st.session_state); it is not thread-safe.
+    """
+
+    def __init__(self):
+        self.orders = {}
+        self.watermark = None
+        self.loaded_at = None
+
+    def refresh(self, full: bool = False) -> list:
+        """
+        Brings the snapshot up to date.
+
+        Args:
+            full (bool): Reload the whole queue instead of the changes.
+
+        Returns:
+            list: Orders waiting for an IMEI or for shipment, oldest first.
+        """
+        now = _now()
+        if full or self.watermark is None or now - self.loaded_at >= FULL_REFRESH_INTERVAL:
+            # Read the watermark first: a change landing between the two
+            # queries is then picked up by the next delta. It comes from all
+            # orders, not just the pending ones, so orders that left the
+            # queue do not hold it back.
+            self.watermark = repositories.orders.latest_update() or now.isoformat()
+            rows = repositories.orders.for_dispatch()
+            self.orders = {}
+            self.loaded_at = now
+        else:
+            since = _parse(self.watermark) - DELTA_OVERLAP
+            rows = repositories.orders.changed_since(since.isoformat())
+        self._merge(rows)
+        return self.snapshot()
+
+    def _merge(self, rows):
+        for order in rows:
+            if order["status"] in repositories.DISPATCH_STATUSES:
+                self.orders[order["id"]] = order
+            else:
+                self.orders.pop(order["id"], None)
+            stamp = order.get("updated_at")
+            if stamp and (self.watermark is None or _parse(stamp) > _parse(self.watermark)):
+                self.watermark = stamp
+
+    def snapshot(self) -> list:
+        return sorted(self.orders.values(), key=lambda o: (o["created_at"], o["id"]))
+
+def _parse(stamp: str) -> datetime.datetime:
+    return datetime.datetime.fromisoformat(stamp)
@@ -0,0 +1,73 @@
+"""
+Order state machine:
+
+    contract_signed -> imei_linked -> dispatched -> returned
+    created / contract_signed / imei_linked -> cancelled
+
+Each transition is a single database call (see schema_updates.sql) that
+checks the current status, updates the order and returns it joined with
+user_profiles, products and companies, so callers can regenerate the PDF
+and notify the customer without further queries. Two dispatchers acting
+on the same order cannot both succeed.
+"""
+from postgrest.exceptions import APIError
+from services import repositories
+from services.documents import normalize_imei, is_valid_imei
+
+# action -> (statuses it applies to, resulting status)
+TRANSITIONS = {
+    "link_imei": (("contract_signed",), "imei_linked"),
+    "dispatch": (("imei_linked",), "dispatched"),
+    "cancel": (("created", "contract_signed", "imei_linked"), "cancelled"),
+    "return": (("dispatched",), "returned"),
+}
+
+class TransitionError(ValueError):
+    """The order does not exist, or its status does not allow the change."""
+
+def allowed(status: str) -> list:
+    """
+    Actions available for an order in `status`.
+    """
+    return [action for action, (sources, _) in TRANSITIONS.items() if status in sources]
+
+def _clean_imei(imei) -> str:
+    """
+    The IMEI as 15 digits, checked like the batch import (imei_import).
+    """
+    if not str(imei or "").strip():
+        raise ValueError("Informe o IMEI.")
+    if not is_valid_imei(imei):
+        raise TransitionError("IMEI inválido")
+    return normalize_imei(imei)
+
+def _transition(function: str, **params) -> dict:
+    try:
+        return repositories.orders.transition(function, **params)
+    except APIError as e:
+        if e.code == "23505":
+            raise TransitionError("IMEI já vinculado a outro pedido.") from e
+        if e.code == "P0002":
+            raise TransitionError("Pedido não encontrado.") from e
+        if e.code == "55000":
+            raise TransitionError(f"Mudança de status não permitida: {e.message}") from e
+        raise
+
+def link_imei(order_id, imei: str) -> dict:
+    return _transition("order_link_imei", p_order_id=order_id, p_imei=_clean_imei(imei))
+
+def dispatch(order_id, imei: str = None) -> dict:
+    """
+    Ships an order. Given an IMEI, an order still waiting for one is linked
+    and dispatched in the same call.
+    """
+    params = {"p_order_id": order_id}
+    if imei is not None:
+        params["p_imei"] = _clean_imei(imei)
+    return _transition("order_dispatch", **params)
+
+def cancel(order_id) -> dict:
+    return _transition("order_cancel", p_order_id=order_id)
+
+def return_order(order_id) -> dict:
+    return _transition("order_return", p_order_id=order_id)
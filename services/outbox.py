@@ -0,0 +1,241 @@
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from services import email_service, repositories
+from services.tracing import traced
+
+BATCH_SIZE = 50
+POLL_INTERVAL = 5
+# Seconds a claimed batch stays reserved for a worker before other workers
+# may retry it (covers workers killed mid-batch).
+LEASE_SECONDS = 300
+MAX_ATTEMPTS = 5
+# Retry n waits RETRY_BACKOFF * 2 ** (n - 1) seconds
+RETRY_BACKOFF = 30
+LATENCY_SAMPLES = 1000
+
+_metrics_lock = threading.Lock()
+_metrics = {"sent": 0, "retried": 0, "dead": 0}
+_latencies = deque(maxlen=LATENCY_SAMPLES)
+
+def _now():
+    return datetime.now(timezone.utc)
+
+@traced("email.enqueue")
+def enqueue_email(to_email: str, subject: str, body: str, attachment_path: str = None) -> bool:
+    """
+    Queues an email for the background worker (a single insert, no SMTP).
+
+    Returns:
+        bool: True if the message was queued.
+    """
+    if not to_email:
+        print(f"[Outbox] Skipped: No recipient.")
+        return False
+    try:
+        repositories.email_outbox.add({
+            "to_email": to_email,
+            "subject": subject,
+            "body": body,
+            "attachment_path": attachment_path
+        })
+    except Exception as e:
+        print(f"[Outbox] Error queueing email to {to_email}: {e}")
+        return False
+    ensure_worker()
+    return True
+
+@traced("email.enqueue_many")
+def enqueue_emails(emails) -> int:
+    """
+    Queues many emails with one insert.
+
+    Args:
+        emails: Iterable of dicts with to_email, subject, body and optionally
+                attachment_path. Messages without a recipient are skipped.
+
+    Returns:
+        int: Number of messages queued.
+    """
+    rows = [
+        {"to_email": e["to_email"], "subject": e["subject"], "body": e["body"],
+         "attachment_path": e.get("attachment_path")}
+        for e in emails if e.get("to_email")
+    ]
+    if not rows:
+        return 0
+    try:
+        repositories.email_outbox.add(rows)
+    except Exception as e:
+        print(f"[Outbox] Error queueing {len(rows)} emails: {e}")
+        return 0
+    ensure_worker()
+    return len(rows)
+
+def claim_batch(limit: int = BATCH_SIZE) -> list:
+    return repositories.email_outbox.claim(limit, LEASE_SECONDS)
+
+def retry_delay(attempts: int) -> float:
+    return RETRY_BACKOFF * 2 ** (max(attempts, 1) - 1)
+
+def _record_latency(row, sent_at):
+    try:
+        created = datetime.fromisoformat(row["created_at"])
+    except (KeyError, TypeError, ValueError):
+        return
+    if created.tzinfo is None:
+        created = created.replace(tzinfo=timezone.utc)
+    _latencies.append((sent_at - created).total_seconds())
+
+def process_batch(limit: int = BATCH_SIZE) -> dict:
+    """
+    Claims due messages, sends them over one SMTP session and records the
+    outcome: sent, rescheduled with exponential backoff, or dead-lettered
+    after MAX_ATTEMPTS.
+
+    Returns:
+        dict: Counts of sent, retried and dead messages in this batch.
+    """
+    rows = claim_batch(limit)
+    counts = {"sent": 0, "retried": 0, "dead": 0}
+    if not rows:
+        return counts
+
+    results = email_service.send_many([
+        {"to_email": row["to_email"], "subject": row["subject"],
+         "body": row["body"], "attachment_path": row.get("attachment_path")}
+        for row in rows
+    ])
+
+    now = _now()
+    sent_ids = [row["id"] for row, ok in zip(rows, results) if ok]
+    if sent_ids:
+        repositories.email_outbox.mark_sent(sent_ids, now.isoformat())
+        counts["sent"] = len(sent_ids)
+
+    with _metrics_lock:
+        for row, ok in zip(rows, results):
+            if ok:
+                _record_latency(row, now)
+
+    for row, ok in zip(rows, results):
+        if ok:
+            continue
+        # send_many reports why each message failed
+        error = getattr(ok, "error", None) or "SMTP delivery failed"
+        attempts = row.get("attempts") or 1
+        if attempts >= MAX_ATTEMPTS:
+            update = {"status": "dead", "locked_until": None, "last_error": error}
+            counts["dead"] += 1
+        else:
+            update = {
+                "status": "pending", "locked_until": None, "last_error": error,
+                "next_attempt_at": (now + timedelta(seconds=retry_delay(attempts))).isoformat()
+            }
+            counts["retried"] += 1
+        repositories.email_outbox.update(row["id"], update)
+
+    with _metrics_lock:
+        for key, value in counts.items():
+            _metrics[key] += value
+    return counts
+
+def get_metrics() -> dict:
+    """
+    Delivery counters since start plus queue-to-delivery latency (seconds)
+    over the most recent messages.
+    """
+    with _metrics_lock:
+        metrics = dict(_metrics)
+        samples = sorted(_latencies)
+    if samples:
+        metrics["latency_p50"] = samples[len(samples) // 2]
+        metrics["latency_p95"] = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+        metrics["latency_max"] = samples[-1]
+    return metrics
+
+def reset_metrics():
+    with _metrics_lock:
+        for key in _metrics:
+            _metrics[key] = 0
+        _latencies.clear()
+
+
+class OutboxWorker(threading.Thread):
+    """
+    Daemon thread draining the outbox. Full batches are followed immediately
+    by the next one; otherwise it sleeps POLL_INTERVAL or until woken by a
+    new enqueue.
+    """
+
+    def __init__(self, batch_size: int = BATCH_SIZE, poll_interval: float = POLL_INTERVAL):
+        super().__init__(name="email-outbox", daemon=True)
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+
+    def wake(self):
+        self._wake.set()
+
+    def stop(self):
+        self._stopping.set()
+        self._wake.set()
+
+    def run(self):
+        while not self._stopping.is_set():
+            try:
+                counts = process_batch(self.batch_size)
+                busy = sum(counts.values()) >= self.batch_size
+            except Exception as e:
+                print(f"[Outbox] Worker error: {e}")
+                busy = False
+            if not busy:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+def start_worker() -> OutboxWorker:
+    """
+    Starts the process-wide worker if it is not running. Called when the app
+    serves a page, so messages left pending or leased by a previous process
+    are delivered after a restart without waiting for a new enqueue.
+    """
+    global _worker
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = OutboxWorker()
+            _worker.start()
+        return _worker
+
+def ensure_worker() -> OutboxWorker:
+    """
+    Starts the process-wide worker on first use and nudges it to run now.
+    """
+    worker = start_worker()
+    worker.wake()
+    return worker
+
+def stop_worker():
+    global _worker
+    with _worker_lock:
+        worker, _worker = _worker, None
+    if worker is not None:
+        worker.stop()
+        worker.join()
+
+
+if __name__ == "__main__":
+    # Standalone worker process: python -m services.outbox
+    worker = OutboxWorker()
+    worker.start()
+    try:
+        while worker.is_alive():
+            time.sleep(1)
+    except KeyboardInterrupt:
+        worker.stop()
+        worker.join()
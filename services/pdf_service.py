@@ -1,5 +1,19 @@
+import fpdf
 from fpdf import FPDF
-import os
+from datetime import datetime
+import hashlib
+import json
+import threading
+import zlib
+import re
+from services.storage import get_storage
+from services.tracing import span, traced
+
+# Bump whenever the layout below changes.
+TEMPLATE_VERSION = "1"
+# ContractTemplate reads this fpdf release's internals (page buffers, object
+# numbering, CreationDate layout); any other version renders with plain fpdf.
+TEMPLATE_FPDF_VERSION = "1.7.2"
 
 class ContractPDF(FPDF):
     def header(self):
@@ -12,27 +26,17 @@ class ContractPDF(FPDF):
         self.set_font('Arial', 'I', 8)
         self.cell(0, 10, f'Página {self.page_no()}', 0, 0, 'C')
 
-def generate_contract_pdf(contract_data, product_data, company_data):
+def _format_money(value):
+    try:
+        return f"R$ {float(value):.2f}"
+    except:
+        return str(value)
+
+def _contract_fields(contract_data, product_data):
     """
-    Generates the Aditivo PDF with specific closed scope fields.
-    
-    contract_data expects:
-    - name, cpf, address, email, phone
-    - start_date, end_date, months
-    - value_monthly_total, residual_value
-    
-    product_data expects:
-    - brand, model, description, imei (optional)
+    Returns the variable text of the addendum as three lists of
+    (label, value) pairs: subscriber, device and contract sections.
     """
-    pdf = ContractPDF()
-    pdf.add_page()
-    pdf.set_font("Arial", size=10)
-    
-    # 1. Dados do Assinante
-    pdf.set_font("Arial", 'B', 11)
-    pdf.cell(0, 8, "1. DADOS DO ASSINANTE", 0, 1)
-    pdf.set_font("Arial", size=10)
-    
     fields_subscriber = [
         ("Nome", contract_data.get('name')),
         ("CPF", contract_data.get('cpf')),
@@ -40,84 +44,334 @@ def generate_contract_pdf(contract_data, product_data, company_data):
         ("Celular", contract_data.get('phone')),
         ("E-mail", contract_data.get('email'))
     ]
-    
+    fields_device = [
+        ("Marca", product_data.get('brand')),
+        ("Modelo", product_data.get('model')),
+        ("Descrição", product_data.get('description')),
+        ("IMEI", product_data.get('imei') if product_data.get('imei') else "___________________________________")
+    ]
+    fields_contract = [
+        ("Data de Início", contract_data.get('start_date')),
+        ("Data Final", contract_data.get('end_date')),
+        ("Qtd. Meses", str(contract_data.get('months'))),
+        ("Valor (c/ Seg)", _format_money(contract_data.get('value_monthly_total'))),
+        ("Valor Residual", _format_money(contract_data.get('residual_value')))
+    ]
+    return (
+        [(label, f"{value if value else ''}") for label, value in fields_subscriber],
+        [(label, f"{value if value else ''}") for label, value in fields_device],
+        [(label, f"{value}") for label, value in fields_contract],
+    )
+
+def _draw_contract(pdf, sections):
+    """
+    Lays out the addendum on `pdf` from the sections built by _contract_fields.
+    """
+    fields_subscriber, fields_device, fields_contract = sections
+    pdf.add_page()
+    pdf.set_font("Arial", size=10)
+
+    # 1. Dados do Assinante
+    pdf.set_font("Arial", 'B', 11)
+    pdf.cell(0, 8, "1. DADOS DO ASSINANTE", 0, 1)
+    pdf.set_font("Arial", size=10)
+
     for label, value in fields_subscriber:
         pdf.set_font("Arial", 'B', 10)
         pdf.cell(30, 6, f"{label}:", 0, 0)
         pdf.set_font("Arial", size=10)
-        pdf.multi_cell(0, 6, f"{value if value else ''}")
-    
+        pdf.multi_cell(0, 6, value)
+
     pdf.ln(5)
-    
+
     # 2. Dados do Aparelho
     pdf.set_font("Arial", 'B', 11)
     pdf.cell(0, 8, "2. DADOS DO APARELHO", 0, 1)
-    
-    fields_device = [
-        ("Marca", product_data.get('brand')),
-        ("Modelo", product_data.get('model')),
-        ("Descrição", product_data.get('description')),
-        ("IMEI", product_data.get('imei') if product_data.get('imei') else "___________________________________")
-    ]
-    
+
     for label, value in fields_device:
         pdf.set_font("Arial", 'B', 10)
         pdf.cell(30, 6, f"{label}:", 0, 0)
         pdf.set_font("Arial", size=10)
-        pdf.multi_cell(0, 6, f"{value if value else ''}")
-        
+        pdf.multi_cell(0, 6, value)
+
     pdf.ln(5)
 
     # 3. Dados da Contratação
     pdf.set_font("Arial", 'B', 11)
     pdf.cell(0, 8, "3. DADOS DA CONTRATAÇÃO", 0, 1)
-    
-    val_monthly = contract_data.get('value_monthly_total')
-    try:
-        val_monthly_fmt = f"R$ {float(val_monthly):.2f}"
-    except:
-        val_monthly_fmt = str(val_monthly)
 
-    val_residual = contract_data.get('residual_value')
-    try:
-        val_residual_fmt = f"R$ {float(val_residual):.2f}"
-    except:
-        val_residual_fmt = str(val_residual)
-
-    fields_contract = [
-        ("Data de Início", contract_data.get('start_date')),
-        ("Data Final", contract_data.get('end_date')),
-        ("Qtd. Meses", str(contract_data.get('months'))),
-        ("Valor (c/ Seg)", val_monthly_fmt),
-        ("Valor Residual", val_residual_fmt)
-    ]
-    
     for label, value in fields_contract:
         pdf.set_font("Arial", 'B', 10)
         pdf.cell(40, 6, f"{label}:", 0, 0)
         pdf.set_font("Arial", size=10)
-        pdf.multi_cell(0, 6, f"{value}")
-        
+        pdf.multi_cell(0, 6, value)
+
     pdf.ln(10)
-    
+
     # Acceptance Text
     pdf.set_font("Arial", 'I', 9)
-    pdf.multi_cell(0, 5, 
+    pdf.multi_cell(0, 5,
         "Ao asssinar este documento, o Assinante declara que leu e concorda com todos os termos do Contrato-Mãe. "
         "Este documento foi gerado eletronicamente após validação de aceite digital.")
-        
+
     pdf.ln(10)
     pdf.cell(0, 5, "."*50, 0, 1, 'C')
     pdf.cell(0, 5, "Assinatura Digital - TREK", 0, 1, 'C')
 
-    # Save
-    filename = f"aditivo_{contract_data.get('cpf')}_{product_data.get('model')}.pdf"
-    filename = filename.replace(" ", "_").replace("/", "-")
-    
-    try:
-        pdf.output(filename)
-    except:
-        filename = "aditivo_temp.pdf"
-        pdf.output(filename)
-        
-    return filename
+def _render_with_fpdf(sections) -> bytes:
+    """
+    Full fpdf layout. Used to build the template and as the fallback for
+    values the template cannot stamp (e.g. text that wraps).
+    """
+    pdf = ContractPDF()
+    _draw_contract(pdf, sections)
+    out = pdf.output(dest='S')
+    # fpdf 1.x returns a latin-1 str, fpdf2 a bytearray
+    return out.encode("latin1") if isinstance(out, str) else bytes(out)
+
+
+class _SlotRecorder(ContractPDF):
+    """
+    Records, for every placeholder value, the usable line width so the
+    template knows when a real value would wrap.
+    """
+    def __init__(self):
+        super().__init__()
+        self.slot_widths = {}
+
+    def multi_cell(self, w, h, txt='', *args, **kwargs):
+        if txt.startswith("@") and txt.endswith("@"):
+            width = w or (self.w - self.r_margin - self.x)
+            self.slot_widths[txt] = (width - 2 * self.c_margin) * 1000.0 / self.font_size
+            self.slot_font = self.current_font['cw']
+        return super().multi_cell(w, h, txt, *args, **kwargs)
+
+
+class ContractTemplate:
+    """
+    Precomputed addendum layout.
+
+    The document is laid out once with placeholder values. Its page content
+    is split around the placeholders, and the surrounding PDF objects (fonts,
+    resources, catalog) are kept as ready-made bytes. Rendering a contract
+    then only escapes and stamps the variable fields, compresses the page
+    stream and rewrites the cross-reference table. Values that would wrap
+    onto a second line fall back to the full fpdf layout.
+    """
+
+    _DATE_RE = re.compile(rb"/CreationDate \(D:(\d{14})\)")
+
+    def __init__(self):
+        # Same labels as a real document, each value replaced by "@<slot>@"
+        sections, n = [], 0
+        for section in _contract_fields({}, {}):
+            sections.append([(label, f"@{n + i}@") for i, (label, _) in enumerate(section)])
+            n += len(section)
+
+        pdf = _SlotRecorder()
+        _draw_contract(pdf, sections)
+        pdf.close()
+        self.cw = pdf.slot_font
+        self.slot_widths = [pdf.slot_widths[f"@{i}@"] for i in range(n)]
+
+        # Page content: static text interleaved with one text operator per slot
+        # (consecutive static lines merged into a single string).
+        self.content_parts = []
+        static = []
+        for line in pdf.pages[1].split("\n"):
+            match = re.fullmatch(r"(BT .* Td \()@(\d+)@(\) Tj ET)", line)
+            if match:
+                self.content_parts.append("".join(static))
+                self.content_parts.append((int(match.group(2)), match.group(1), match.group(3) + "\n"))
+                static = []
+            else:
+                static.append(line + "\n")
+        # str.split leaves a trailing empty piece; drop its extra newline
+        self.content_parts.append("".join(static)[:-1])
+
+        buffer = pdf.buffer.encode("latin1")
+        offsets = pdf.offsets
+        # Object 4 is the page content stream; object 1 (pages root) follows it.
+        self.n = pdf.n
+        self.prefix = buffer[:offsets[4]]
+        xref_start = buffer.rindex(b"\nxref\n") + 1
+        self.body = buffer[offsets[1]:xref_start]
+        self.body_offsets = {i: off - offsets[1] for i, off in offsets.items() if off >= offsets[1]}
+        self.prefix_offsets = {i: off for i, off in offsets.items() if off < offsets[4]}
+        self.trailer = buffer[buffer.index(b"trailer\n", xref_start):buffer.rindex(b"startxref\n")]
+
+        date_match = self._DATE_RE.search(self.body)
+        self.date_span = (date_match.start(1), date_match.end(1))
+
+    def fits(self, sections) -> bool:
+        cw = self.cw
+        i = 0
+        for section in sections:
+            for _, value in section:
+                if "\n" in value or "\r" in value:
+                    return False
+                try:
+                    if sum(map(cw.__getitem__, value)) > self.slot_widths[i]:
+                        return False
+                except KeyError:
+                    # Outside the core font's charset: let fpdf handle it
+                    return False
+                i += 1
+        return True
+
+    def render(self, sections, creation_date: bytes) -> bytes:
+        values = [value for section in sections for _, value in section]
+        parts = []
+        for part in self.content_parts:
+            if isinstance(part, tuple):
+                value = values[part[0]]
+                if value:
+                    escaped = value.replace('\\', '\\\\').replace(')', '\\)').replace('(', '\\(')
+                    parts.append(part[1] + escaped + part[2])
+            else:
+                parts.append(part)
+        stream = zlib.compress("".join(parts).encode("latin1"))
+
+        content_obj = b"4 0 obj\n<</Filter /FlateDecode /Length %d>>\nstream\n%s\nendstream\nendobj\n" % (len(stream), stream)
+        body_start = len(self.prefix) + len(content_obj)
+        start, end = self.date_span
+        body = self.body[:start] + creation_date + self.body[end:]
+
+        offsets = dict(self.prefix_offsets)
+        offsets[4] = len(self.prefix)
+        for i, off in self.body_offsets.items():
+            offsets[i] = body_start + off
+
+        xref = [b"xref\n0 %d\n0000000000 65535 f \n" % (self.n + 1)]
+        xref.extend(b"%010d 00000 n \n" % offsets[i] for i in range(1, self.n + 1))
+        xref_pos = body_start + len(body)
+        return b"".join([
+            self.prefix, content_obj, body, *xref, self.trailer,
+            b"startxref\n%d\n%%%%EOF\n" % xref_pos
+        ])
+
+_template = None
+_template_lock = threading.Lock()
+
+def template_supported() -> bool:
+    return getattr(fpdf, "FPDF_VERSION", None) == TEMPLATE_FPDF_VERSION
+
+def get_template():
+    """
+    Returns the process-wide template, building it on first use, or None
+    when the installed fpdf is not the version the template was written for.
+    """
+    global _template
+    if not template_supported():
+        return None
+    if _template is None:
+        with _template_lock:
+            if _template is None:
+                _template = ContractTemplate()
+    return _template
+
+def _creation_date() -> bytes:
+    return datetime.now().strftime('%Y%m%d%H%M%S').encode("ascii")
+
+def render_contract_pdf(contract_data, product_data, company_data=None, creation_date: bytes = None) -> bytes:
+    """
+    Renders the Aditivo PDF and returns its bytes.
+
+    contract_data expects:
+    - name, cpf, address, email, phone
+    - start_date, end_date, months
+    - value_monthly_total, residual_value
+
+    product_data expects:
+    - brand, model, description, imei (optional)
+    """
+    sections = _contract_fields(contract_data, product_data)
+    template = get_template()
+    if template is not None and template.fits(sections):
+        return template.render(sections, creation_date or _creation_date())
+    return _render_with_fpdf(sections)
+
+def render_contract_pdfs(items) -> list:
+    """
+    Batch version of render_contract_pdf.
+
+    Args:
+        items: Iterable of (contract_data, product_data, company_data) tuples.
+
+    Returns:
+        list: PDF bytes, in the same order as `items`.
+    """
+    creation_date = _creation_date()
+    return [
+        render_contract_pdf(contract_data, product_data, company_data, creation_date)
+        for contract_data, product_data, company_data in items
+    ]
+
+def contract_fingerprint(contract_data, product_data) -> str:
+    """
+    Hash of everything that determines the document's content: the printed
+    fields (see _contract_fields) plus TEMPLATE_VERSION. Used as the storage
+    key, so unchanged inputs map to the PDF that was already rendered, however
+    many other columns the caller's dicts carry.
+    """
+    payload = json.dumps(
+        {"v": TEMPLATE_VERSION, "fields": _contract_fields(contract_data, product_data)},
+        separators=(",", ":"), ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def find_contract_pdf(contract_data, product_data):
+    """
+    Returns the location of an already stored PDF for these inputs, or None.
+    """
+    storage = get_storage()
+    key = contract_fingerprint(contract_data, product_data)
+    return storage.location(key) if storage.exists(key) else None
+
+def save_contract_pdf(data: bytes, contract_data, product_data) -> str:
+    """
+    Stores rendered PDF bytes in the configured contract storage, keyed by
+    the inputs' fingerprint, and returns their location (saved in
+    `orders.contract_url`).
+    """
+    return get_storage().put(data, key=contract_fingerprint(contract_data, product_data))
+
+@traced("pdf.generate")
+def generate_contract_pdf(contract_data, product_data, company_data):
+    """
+    Generates the Aditivo PDF with specific closed scope fields. Inputs that
+    were already rendered return the stored PDF without rendering again.
+
+    contract_data expects:
+    - name, cpf, address, email, phone
+    - start_date, end_date, months
+    - value_monthly_total, residual_value
+
+    product_data expects:
+    - brand, model, description, imei (optional)
+
+    Returns:
+        str: Storage location of the PDF.
+    """
+    with span("pdf.lookup"):
+        existing = find_contract_pdf(contract_data, product_data)
+    if existing:
+        return existing
+    with span("pdf.render"):
+        data = render_contract_pdf(contract_data, product_data, company_data)
+    with span("pdf.save"):
+        return save_contract_pdf(data, contract_data, product_data)
+
+@traced("pdf.generate_batch")
+def generate_contract_pdfs(items) -> list:
+    """
+    Batch version of generate_contract_pdf; returns the locations in order.
+    """
+    items = list(items)
+    locations = [find_contract_pdf(c, p) for c, p, _ in items]
+    missing = [i for i, location in enumerate(locations) if location is None]
+    pdfs = render_contract_pdfs([items[i] for i in missing])
+    for i, data in zip(missing, pdfs):
+        contract_data, product_data, _ = items[i]
+        locations[i] = save_contract_pdf(data, contract_data, product_data)
+    return locations
@@ -1,3 +1,6 @@
+import calendar
+import datetime
+
 def calculate_contract_totals(product: dict):
     """
     Calculates the total monthly value and residual value for a product,
@@ -18,3 +21,38 @@ def calculate_contract_totals(product: dict):
     residual = float(product.get('residual_value') or 0)
     
     return total_monthly, residual
+
+def prorate_factor(signed_at, reference_month) -> float:
+    """
+    Fraction of the reference month covered by a contract signed at
+    `signed_at`. Contracts signed before the month pay in full, contracts
+    signed during it pay from the signing day (inclusive), later ones pay
+    nothing. Mirrors the `payroll_deductions` SQL function; the SQLite
+    backend's copy of it is tested against this.
+
+    Args:
+        signed_at (datetime.date | datetime.datetime): Signature date.
+        reference_month (datetime.date): Any day of the payroll month.
+
+    Returns:
+        float: Factor between 0.0 and 1.0.
+    """
+    if isinstance(signed_at, datetime.datetime):
+        signed_at = signed_at.date()
+    month_start = reference_month.replace(day=1)
+    days_in_month = calendar.monthrange(month_start.year, month_start.month)[1]
+    month_end = month_start + datetime.timedelta(days=days_in_month)
+
+    if signed_at < month_start:
+        return 1.0
+    if signed_at >= month_end:
+        return 0.0
+    return (month_end - signed_at).days / days_in_month
+
+def calculate_monthly_deduction(product: dict, signed_at, reference_month) -> float:
+    """
+    Payroll deduction for one contract in the reference month:
+    (monthly_price + insurance_price) pro-rated by the signing date.
+    """
+    total_monthly, _ = calculate_contract_totals(product)
+    return round(total_monthly * prorate_factor(signed_at, reference_month), 2)
@@ -0,0 +1,84 @@
+import csv
+import io
+import tempfile
+from openpyxl import Workbook
+from services import repositories
+
+# PostgREST caps responses (1000 rows on Supabase by default), so the
+# report is paged through the RPC instead of fetched in one response.
+PAGE_SIZE = 1000
+# Reports are spooled in memory up to this size, then moved to disk.
+SPOOL_MAX_SIZE = 5 * 1024 * 1024
+
+REPORT_COLUMNS = [
+    ("name", "Nome"),
+    ("cpf", "CPF"),
+    ("contracts", "Contratos"),
+    ("monthly_total", "Mensalidade (R$)"),
+    ("deduction", "Desconto (R$)"),
+]
+
+def iter_payroll_deductions(company_id: str, month, page_size: int = PAGE_SIZE):
+    """
+    Yields one aggregated row per employee from the `payroll_deductions`
+    database function (grouping and pro-rating happen server-side).
+
+    Args:
+        company_id (str): Company of the HR user.
+        month (datetime.date): Any day of the payroll month.
+    """
+    month_start = month.replace(day=1).isoformat()
+    start = 0
+    while True:
+        rows = repositories.orders.payroll_deductions(company_id, month_start, start, start + page_size - 1)
+        yield from rows
+        if len(rows) < page_size:
+            break
+        start += page_size
+
+def write_csv(rows, target):
+    """
+    Writes report rows as CSV to a binary file object, row by row.
+    """
+    # utf-8-sig so Excel opens accents correctly
+    text = io.TextIOWrapper(target, encoding="utf-8-sig", newline="", write_through=True)
+    writer = csv.writer(text)
+    writer.writerow([label for _, label in REPORT_COLUMNS])
+    for row in rows:
+        writer.writerow([row.get(key) for key, _ in REPORT_COLUMNS])
+    text.detach()
+
+def write_xlsx(rows, target):
+    """
+    Writes report rows as XLSX using openpyxl's write-only mode, which
+    flushes rows as they are appended instead of keeping the sheet in memory.
+    """
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Descontos")
+    ws.append([label for _, label in REPORT_COLUMNS])
+    for row in rows:
+        ws.append([
+            float(row[key]) if key in ("monthly_total", "deduction") and row.get(key) is not None else row.get(key)
+            for key, _ in REPORT_COLUMNS
+        ])
+    wb.save(target)
+
+def build_payroll_report(company_id: str, month, fmt: str = "csv"):
+    """
+    Generates the payroll deduction report into a spooled temporary file.
+
+    Args:
+        fmt (str): "csv" or "xlsx".
+
+    Returns:
+        file: Binary file object positioned at the start, ready for
+              `st.download_button`.
+    """
+    target = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    rows = iter_payroll_deductions(company_id, month)
+    if fmt == "xlsx":
+        write_xlsx(rows, target)
+    else:
+        write_csv(rows, target)
+    target.seek(0)
+    return target
@@ -0,0 +1,298 @@
+"""
+Data access for the pages and services.
+
+Every query they run lives here, so select strings and filters are
+written (and tuned) in one place. Repositories use whatever backend
+`get_supabase()` returns: the Supabase client, or the embedded SQLite
+stand-in (services/sqlite_backend.py) when `TREK_DB_BACKEND=sqlite` or
+`[database] backend = "sqlite"` is configured.
+"""
+import datetime
+from services.documents import format_cnpj, normalize_cnpj
+from services.supabase_client import get_supabase
+
+COMPANY_LIST_COLUMNS = "id, name, cnpj, responsible_name"
+PRODUCT_ADMIN_COLUMNS = "id, brand, model, image_url, monthly_price, active, created_at"
+DISPATCH_COLUMNS = "id, status, imei, created_at, updated_at, products(brand, model), user_profiles(name, cpf, email)"
+DISPATCH_STATUSES = ["contract_signed", "imei_linked"]
+# Orders whose device is free to be linked again
+RELEASED_STATUSES = ["cancelled", "returned"]
+
+
+def _quote(value) -> str:
+    # Timestamps contain PostgREST-reserved characters (":", ".")
+    return '"' + str(value).replace('"', '\\"') + '"'
+
+
+class Repository:
+    table = None
+
+    def __init__(self, client=None):
+        self._client = client
+
+    @property
+    def client(self):
+        return self._client or get_supabase()
+
+    def query(self):
+        return self.client.table(self.table)
+
+
+class CompanyRepository(Repository):
+    table = "companies"
+
+    def list(self, columns: str = COMPANY_LIST_COLUMNS) -> list:
+        return self.query().select(columns).order("name").execute().data or []
+
+    def list_names(self) -> list:
+        return self.list("id, name")
+
+    def get(self, company_id, columns: str = "*"):
+        res = self.query().select(columns).eq("id", company_id).execute()
+        return res.data[0] if res.data else None
+
+    def create(self, data: dict) -> dict:
+        res = self.query().insert(data).execute()
+        return res.data[0] if res.data else None
+
+    def existing_cnpjs(self, cnpjs) -> set:
+        """
+        The CNPJs among `cnpjs` already registered, as 14 digits. Older rows
+        (seed.sql, the manual form) hold formatted CNPJs; both forms match.
+        """
+        digits = {normalize_cnpj(c) for c in cnpjs} - {None}
+        if not digits:
+            return set()
+        candidates = list(digits) + [format_cnpj(c) for c in digits]
+        res = self.query().select("cnpj").in_("cnpj", candidates).execute()
+        return {normalize_cnpj(r["cnpj"]) for r in res.data or []}
+
+    def create_many(self, rows: list) -> list:
+        """
+        Inserts companies in one request; rows whose CNPJ is already taken
+        (e.g. by a concurrent import) are skipped, not returned.
+        """
+        res = self.query().upsert(rows, on_conflict="cnpj", ignore_duplicates=True).execute()
+        return res.data or []
+
+
+class ProductRepository(Repository):
+    table = "products"
+
+    def list_all(self, columns: str = PRODUCT_ADMIN_COLUMNS) -> list:
+        return self.query().select(columns).order("created_at", desc=True).execute().data or []
+
+    def list_active(self, columns: str = "*") -> list:
+        return self.query().select(columns).eq("active", True).execute().data or []
+
+    def get(self, product_id):
+        res = self.query().select("*").eq("id", product_id).limit(1).execute()
+        return res.data[0] if res.data else None
+
+    def create(self, data: dict) -> dict:
+        res = self.query().insert(data).execute()
+        return res.data[0] if res.data else None
+
+    def set_active(self, product_id, active: bool):
+        self.query().update({"active": active}, returning="minimal").eq("id", product_id).execute()
+
+
+class UserProfileRepository(Repository):
+    table = "user_profiles"
+
+    def get_by_cpf(self, cpf: str, columns: str = "*"):
+        res = self.query().select(columns).eq("cpf", cpf).execute()
+        return res.data[0] if res.data else None
+
+    def by_cpfs(self, cpfs, columns: str = "cpf") -> list:
+        return self.query().select(columns).in_("cpf", list(cpfs)).execute().data or []
+
+    def upsert_by_cpf(self, rows: list):
+        """
+        Inserts or updates profiles keyed on CPF. Columns left out of `rows`
+        keep their stored value (or the column default for new profiles).
+        """
+        self.query().upsert(rows, on_conflict="cpf", default_to_null=False, returning="minimal").execute()
+
+    def update_contact(self, user_id, phone: str = None, email: str = None):
+        self.query().update({"phone": phone, "email": email}, returning="minimal").eq("id", user_id).execute()
+
+
+class OrderRepository(Repository):
+    table = "orders"
+
+    def create(self, data: dict) -> dict:
+        res = self.query().insert(data).execute()
+        return res.data[0] if res.data else None
+
+    def update(self, order_id, changes: dict) -> dict:
+        res = self.query().update(changes).eq("id", order_id).execute()
+        return res.data[0] if res.data else None
+
+    def get(self, order_id, columns: str = "*"):
+        res = self.query().select(columns).eq("id", order_id).limit(1).execute()
+        return res.data[0] if res.data else None
+
+    def get_many(self, order_ids, columns: str = "*") -> list:
+        return self.query().select(columns).in_("id", list(order_ids)).execute().data or []
+
+    def page(self, columns: str, limit: int, cursor: tuple = None, status: list = None,
+             company_id: str = None, date_from: datetime.date = None,
+             date_to: datetime.date = None) -> list:
+        """
+        Orders newest first, keyset-paginated on (created_at, id): `cursor` is
+        the (created_at, id) of the last order already shown.
+        """
+        query = self.query().select(columns)
+        if status:
+            query = query.in_("status", list(status))
+        if company_id:
+            query = query.eq("company_id", company_id)
+        if date_from:
+            query = query.gte("created_at", date_from.isoformat())
+        if date_to:
+            query = query.lt("created_at", (date_to + datetime.timedelta(days=1)).isoformat())
+        if cursor:
+            created_at, order_id = cursor
+            query = query.or_(
+                f"created_at.lt.{_quote(created_at)},"
+                f"and(created_at.eq.{_quote(created_at)},id.lt.{order_id})"
+            )
+        res = query.order("created_at", desc=True).order("id", desc=True).limit(limit).execute()
+        return res.data or []
+
+    def for_dispatch(self, columns: str = DISPATCH_COLUMNS) -> list:
+        """
+        Orders waiting for an IMEI or for shipment, oldest first.
+        """
+        res = (
+            self.query().select(columns)
+            .in_("status", DISPATCH_STATUSES)
+            .order("created_at").order("id")
+            .execute()
+        )
+        return res.data or []
+
+    def changed_since(self, since: str, columns: str = DISPATCH_COLUMNS) -> list:
+        """
+        Orders updated at or after `since` (any status), oldest change first.
+        """
+        res = (
+            self.query().select(columns)
+            .gte("updated_at", since)
+            .order("updated_at").order("id")
+            .execute()
+        )
+        return res.data or []
+
+    def latest_update(self):
+        """
+        The newest `updated_at` among all orders, or None when there are none.
+        """
+        res = self.query().select("updated_at").order("updated_at", desc=True).limit(1).execute()
+        return res.data[0]["updated_at"] if res.data else None
+
+    def with_imeis(self, imeis) -> list:
+        """
+        Active orders already holding any of `imeis` (id and imei only).
+        """
+        imeis = list(imeis)
+        if not imeis:
+            return []
+        res = self.query().select("id, imei, status").in_("imei", imeis).execute()
+        return [
+            {"id": o["id"], "imei": o["imei"]}
+            for o in res.data or [] if o["status"] not in RELEASED_STATUSES
+        ]
+
+    def link_imeis(self, links) -> list:
+        """
+        Links IMEIs to orders waiting for one, in a single `link_imeis` call.
+        Orders no longer in `contract_signed` and IMEIs already in use are
+        skipped by the database.
+
+        Args:
+            links: Iterable of {"order_id", "imei"} dicts.
+
+        Returns:
+            list: The linked orders with the customer's name and email.
+        """
+        res = self.client.rpc("link_imeis", {"p_links": list(links)}).execute()
+        return res.data or []
+
+    def set_contract_urls(self, urls: dict) -> None:
+        """
+        Stores each order's addendum location (order ID -> location) in
+        `orders.contract_url`, in a single `set_contract_urls` call.
+        """
+        if urls:
+            self.client.rpc("set_contract_urls", {
+                "p_urls": [{"order_id": k, "contract_url": v} for k, v in urls.items()]
+            }).execute()
+
+    def transition(self, function: str, **params) -> dict:
+        """
+        Runs one of the order state machine functions (order_link_imei,
+        order_dispatch, order_cancel, order_return).
+
+        Returns:
+            dict: The updated order joined with user_profiles, products and
+                  companies.
+        """
+        return self.client.rpc(function, params).execute().data
+
+    def payroll_deductions(self, company_id, month_start: str, start: int, end: int) -> list:
+        """
+        Rows start..end (inclusive) of the `payroll_deductions` aggregate.
+        """
+        params = {"p_company_id": company_id, "p_month": month_start}
+        return self.client.rpc("payroll_deductions", params).range(start, end).execute().data or []
+
+
+class MovementRepository(Repository):
+    table = "movements"
+
+    def record(self, company_id, filename: str, movement_type: str = "admissao"):
+        """
+        Records a roster upload ('admissao' or 'demissao').
+        """
+        data = {"company_id": company_id, "filename": filename, "type": movement_type}
+        self.query().insert(data, returning="minimal").execute()
+
+    def for_company(self, company_id) -> list:
+        res = self.query().select("*").eq("company_id", company_id).order("processed_at", desc=True).execute()
+        return res.data or []
+
+
+class EmailOutboxRepository(Repository):
+    table = "email_outbox"
+
+    def add(self, rows):
+        """
+        Queues one message (dict) or many (list of dicts) in one insert.
+        """
+        self.query().insert(rows, returning="minimal").execute()
+
+    def claim(self, limit: int, lease_seconds: int) -> list:
+        """
+        Reserves up to `limit` due messages for `lease_seconds` (the
+        `claim_email_outbox` function) and returns them.
+        """
+        params = {"p_limit": limit, "p_lease_seconds": lease_seconds}
+        return self.client.rpc("claim_email_outbox", params).execute().data or []
+
+    def mark_sent(self, ids: list, sent_at: str):
+        self.query().update({
+            "status": "sent", "sent_at": sent_at, "locked_until": None, "last_error": None
+        }).in_("id", ids).execute()
+
+    def update(self, message_id, changes: dict):
+        self.query().update(changes).eq("id", message_id).execute()
+
+
+companies = CompanyRepository()
+products = ProductRepository()
+user_profiles = UserProfileRepository()
+orders = OrderRepository()
+movements = MovementRepository()
+email_outbox = EmailOutboxRepository()
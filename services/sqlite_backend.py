@@ -0,0 +1,624 @@
+"""
+Embedded stand-in for the Supabase client, backed by SQLite.
+
+Implements the subset of the supabase-py / postgrest query builder the app
+uses (select with embedded relations, filters, ordering, paging, insert,
+update, upsert, delete and rpc) on top of the tables in schema.sql, so the
+whole flow, the tests and the benchmarks can run offline.
+
+Database functions from schema_updates.sql are reimplemented in Python and
+registered in RPC_FUNCTIONS.
+"""
+import json
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+from postgrest.exceptions import APIError
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+SCHEMA_PATH = os.path.join(ROOT, "schema.sql")
+SEED_PATH = os.path.join(ROOT, "seed.sql")
+# The company seed.sql creates
+SEED_COMPANY_ID = "00000000-0000-0000-0000-000000000001"
+
+# uuid_generate_v4() equivalent
+_UUID_SQL = (
+    "(lower(hex(randomblob(4))) || '-' || lower(hex(randomblob(2))) || '-4' || "
+    "substr(lower(hex(randomblob(2))), 2) || '-' || substr('89ab', 1 + (abs(random()) % 4), 1) || "
+    "substr(lower(hex(randomblob(2))), 2) || '-' || lower(hex(randomblob(6))))"
+)
+_NOW_SQL = "(strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'))"
+
+# Triggers of schema_updates.sql (translate_sql keeps tables and indexes only).
+# The inner UPDATE does not fire the trigger again: recursive_triggers is off.
+# Unlike Postgres' BEFORE trigger, an AFTER trigger's change is not in the
+# UPDATE's RETURNING rows; it shows on the next select.
+TRIGGERS = [
+    f"""CREATE TRIGGER IF NOT EXISTS orders_set_updated_at AFTER UPDATE ON orders FOR EACH ROW
+        BEGIN UPDATE orders SET updated_at = {_NOW_SQL} WHERE id = NEW.id; END""",
+]
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+def translate_sql(sql: str) -> list:
+    """
+    Converts the Postgres DDL/DML of schema.sql / seed.sql into SQLite
+    statements. Extensions, row level security and policies are dropped;
+    column types are kept as declared (SQLite accepts them and they drive
+    value conversion).
+    """
+    sql = re.sub(r"--[^\n]*", "", sql)
+    statements = []
+    for statement in sql.split(";"):
+        statement = statement.strip()
+        if not statement:
+            continue
+        head = statement.upper()
+        if not (head.startswith("CREATE TABLE") or head.startswith("CREATE INDEX")
+                or head.startswith("CREATE UNIQUE INDEX") or head.startswith("INSERT")):
+            continue
+        statement = statement.replace("uuid_generate_v4()", _UUID_SQL)
+        statement = re.sub(r"timezone\('utc'::text,\s*now\(\)\)", _NOW_SQL, statement)
+        statements.append(statement)
+    return statements
+
+
+class Result:
+    """Mimics postgrest's APIResponse."""
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+def _split_top_level(text: str) -> list:
+    parts, depth, current = [], 0, []
+    quoted = False
+    for ch in text:
+        if ch == '"':
+            quoted = not quoted
+        elif not quoted and ch == "(":
+            depth += 1
+        elif not quoted and ch == ")":
+            depth -= 1
+        if ch == "," and depth == 0 and not quoted:
+            parts.append("".join(current).strip())
+            current = []
+        else:
+            current.append(ch)
+    if "".join(current).strip():
+        parts.append("".join(current).strip())
+    return parts
+
+_OPERATORS = {"eq": "=", "neq": "<>", "gt": ">", "gte": ">=", "lt": "<", "lte": "<=",
+              "like": "LIKE", "ilike": "LIKE"}
+
+
+class TableQuery:
+    def __init__(self, client, table: str):
+        self.client = client
+        self.table = table
+        self.op = "select"
+        self.columns = "*"
+        self.payload = None
+        self.filters = []      # (sql, params)
+        self.orders = []
+        self.limit_n = None
+        self.offset_n = None
+        self.returning = "representation"
+        self.on_conflict = None
+        self.ignore_duplicates = False
+        self.count_mode = None
+
+    # --- operations ---
+
+    def select(self, *columns: str, count=None, head=None):
+        self.op = "select"
+        self.columns = ",".join(columns) or "*"
+        self.count_mode = count
+        return self
+
+    def insert(self, payload, count=None, returning="representation", upsert=False, default_to_null=True):
+        self.op = "upsert" if upsert else "insert"
+        self.payload = payload
+        self.returning = getattr(returning, "value", returning)
+        return self
+
+    def upsert(self, payload, count=None, returning="representation", ignore_duplicates=False,
+               on_conflict="", default_to_null=True):
+        self.op = "upsert"
+        self.payload = payload
+        self.returning = getattr(returning, "value", returning)
+        self.on_conflict = on_conflict or None
+        self.ignore_duplicates = ignore_duplicates
+        return self
+
+    def update(self, payload, count=None, returning="representation"):
+        self.op = "update"
+        self.payload = payload
+        self.returning = getattr(returning, "value", returning)
+        return self
+
+    def delete(self, count=None, returning="representation"):
+        self.op = "delete"
+        self.returning = getattr(returning, "value", returning)
+        return self
+
+    # --- filters ---
+
+    def _column(self, column: str) -> str:
+        if column not in self.client.columns(self.table):
+            raise APIError({"message": f"column {self.table}.{column} does not exist", "code": "42703"})
+        return f'"{column}"'
+
+    def _add(self, column, op, value):
+        self.filters.append(self._condition(column, op, value))
+        return self
+
+    def _condition(self, column, op, value):
+        col = self._column(column)
+        if op == "in":
+            values = [self.client.encode(self.table, column, v) for v in value]
+            if not values:
+                return "0", []
+            return f"{col} IN ({', '.join('?' * len(values))})", values
+        if op == "is":
+            if value is None or str(value).lower() == "null":
+                return f"{col} IS NULL", []
+            return f"{col} IS ?", [self.client.encode(self.table, column, value)]
+        if op == "ilike":
+            return f"lower({col}) LIKE lower(?)", [str(value).replace("*", "%")]
+        if op == "like":
+            return f"{col} LIKE ?", [str(value).replace("*", "%")]
+        return f"{col} {_OPERATORS[op]} ?", [self.client.encode(self.table, column, value)]
+
+    def eq(self, column, value): return self._add(column, "eq", value)
+    def neq(self, column, value): return self._add(column, "neq", value)
+    def gt(self, column, value): return self._add(column, "gt", value)
+    def gte(self, column, value): return self._add(column, "gte", value)
+    def lt(self, column, value): return self._add(column, "lt", value)
+    def lte(self, column, value): return self._add(column, "lte", value)
+    def like(self, column, value): return self._add(column, "like", value)
+    def ilike(self, column, value): return self._add(column, "ilike", value)
+    def is_(self, column, value): return self._add(column, "is", value)
+    def in_(self, column, values): return self._add(column, "in", list(values))
+
+    def _parse_logic(self, text: str, joiner: str):
+        clauses, params = [], []
+        for part in _split_top_level(text):
+            match = re.fullmatch(r"(and|or)\((.*)\)", part)
+            if match:
+                sql, p = self._parse_logic(match.group(2), match.group(1).upper())
+            else:
+                column, op, value = part.split(".", 2)
+                if value.startswith('"') and value.endswith('"'):
+                    value = value[1:-1].replace('\\"', '"')
+                if op == "in":
+                    value = [v.strip('"') for v in _split_top_level(value.strip("()"))]
+                sql, p = self._condition(column, op, value)
+            clauses.append(f"({sql})")
+            params.extend(p)
+        return f" {joiner} ".join(clauses), params
+
+    def or_(self, filters: str, reference_table=None):
+        self.filters.append(self._parse_logic(filters, "OR"))
+        return self
+
+    # --- modifiers ---
+
+    def order(self, column, desc=False, nullsfirst=None, foreign_table=None):
+        direction = "DESC" if desc else "ASC"
+        nulls = "" if nullsfirst is None else (" NULLS FIRST" if nullsfirst else " NULLS LAST")
+        self.orders.append(f"{self._column(column)} {direction}{nulls}")
+        return self
+
+    def limit(self, size, foreign_table=None):
+        self.limit_n = size
+        return self
+
+    def range(self, start, end, foreign_table=None):
+        self.offset_n = start
+        self.limit_n = end - start + 1
+        return self
+
+    # --- execution ---
+
+    def _where(self):
+        if not self.filters:
+            return "", []
+        sql = " AND ".join(f"({s})" for s, _ in self.filters)
+        return f" WHERE {sql}", [p for _, ps in self.filters for p in ps]
+
+    def execute(self) -> Result:
+        with self.client.lock:
+            try:
+                return getattr(self, f"_execute_{self.op}")()
+            except sqlite3.IntegrityError as e:
+                code = "23505" if "UNIQUE" in str(e) else "23503" if "FOREIGN KEY" in str(e) else "23514"
+                raise APIError({"message": str(e), "code": code}) from e
+
+    def _execute_select(self):
+        where, params = self._where()
+        sql = f'SELECT * FROM "{self.table}"{where}'
+        if self.orders:
+            sql += " ORDER BY " + ", ".join(self.orders)
+        if self.limit_n is not None:
+            sql += f" LIMIT {int(self.limit_n)}"
+            if self.offset_n:
+                sql += f" OFFSET {int(self.offset_n)}"
+        rows = self.client.fetch(self.table, sql, params)
+
+        count = None
+        if self.count_mode:
+            count = self.client.conn.execute(f'SELECT count(*) FROM "{self.table}"{where}', params).fetchone()[0]
+        return Result(self.client.project(self.table, rows, self.columns), count)
+
+    def _rows(self):
+        rows = self.payload if isinstance(self.payload, list) else [self.payload]
+        return [{k: self.client.encode(self.table, k, v) for k, v in row.items()} for row in rows]
+
+    def _result(self, rows):
+        return Result([] if self.returning == "minimal" else rows)
+
+    def _execute_insert(self):
+        inserted = []
+        for row in self._rows():
+            cols = ", ".join(self._column(c) for c in row)
+            sql = f'INSERT INTO "{self.table}" ({cols}) VALUES ({", ".join("?" * len(row))}) RETURNING *'
+            inserted.extend(self.client.fetch(self.table, sql, list(row.values())))
+        return self._result(inserted)
+
+    def _execute_upsert(self):
+        target = self.on_conflict or "id"
+        upserted = []
+        for row in self._rows():
+            cols = ", ".join(self._column(c) for c in row)
+            updates = ", ".join(f"{self._column(c)} = excluded.{self._column(c)}" for c in row)
+            action = "NOTHING" if self.ignore_duplicates else f"UPDATE SET {updates}"
+            sql = (
+                f'INSERT INTO "{self.table}" ({cols}) VALUES ({", ".join("?" * len(row))}) '
+                f"ON CONFLICT ({target}) DO {action} RETURNING *"
+            )
+            upserted.extend(self.client.fetch(self.table, sql, list(row.values())))
+        return self._result(upserted)
+
+    def _execute_update(self):
+        row = self._rows()[0]
+        where, params = self._where()
+        sets = ", ".join(f"{self._column(c)} = ?" for c in row)
+        sql = f'UPDATE "{self.table}" SET {sets}{where} RETURNING *'
+        return self._result(self.client.fetch(self.table, sql, list(row.values()) + params))
+
+    def _execute_delete(self):
+        where, params = self._where()
+        return self._result(self.client.fetch(self.table, f'DELETE FROM "{self.table}"{where} RETURNING *', params))
+
+
+class RpcQuery:
+    def __init__(self, client, name: str, params: dict):
+        self.client = client
+        self.name = name
+        self.params = params or {}
+        self.start = 0
+        self.stop = None
+
+    def range(self, start, end, foreign_table=None):
+        self.start, self.stop = start, end + 1
+        return self
+
+    def limit(self, size, foreign_table=None):
+        self.stop = self.start + size
+        return self
+
+    def execute(self) -> Result:
+        fn = self.client.rpc_functions.get(self.name)
+        if fn is None:
+            raise APIError({"message": f"function {self.name} does not exist", "code": "42883"})
+        with self.client.lock:
+            data = fn(self.client, **self.params)
+        if isinstance(data, list):
+            data = data[self.start:self.stop]
+        return Result(data)
+
+
+class SQLiteClient:
+    """
+    Drop-in for `supabase.Client` backed by an SQLite database (":memory:"
+    by default) created from schema.sql.
+    """
+
+    def __init__(self, path: str = ":memory:", schema_path: str = SCHEMA_PATH, seed: bool = False):
+        self.path = path
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        if path != ":memory:":
+            self.conn.execute("PRAGMA journal_mode = WAL")
+
+        with open(schema_path, encoding="utf-8") as f:
+            schema = translate_sql(f.read())
+        is_new = not self.conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table'").fetchone()
+        with self.lock:
+            for statement in schema:
+                if not statement.upper().startswith("INSERT"):
+                    self.conn.execute(statement)
+            for statement in TRIGGERS:
+                self.conn.execute(statement)
+            if seed and is_new:
+                self.load_sql(SEED_PATH)
+
+        self._columns = {}
+        self._foreign_keys = {}
+        self.rpc_functions = dict(RPC_FUNCTIONS)
+
+    def load_sql(self, path: str):
+        with open(path, encoding="utf-8") as f:
+            statements = translate_sql(f.read())
+        with self.lock:
+            self.conn.execute("BEGIN")
+            try:
+                for statement in statements:
+                    self.conn.execute(statement)
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def close(self):
+        self.conn.close()
+
+    # --- supabase.Client API ---
+
+    def table(self, name: str) -> TableQuery:
+        if not self.columns(name):
+            raise APIError({"message": f'relation "{name}" does not exist', "code": "42P01"})
+        return TableQuery(self, name)
+
+    from_ = table
+
+    def rpc(self, name: str, params: dict = None, **kwargs) -> RpcQuery:
+        return RpcQuery(self, name, params)
+
+    def register_rpc(self, name: str, fn):
+        """
+        Registers a Python implementation of a database function:
+        fn(client, **params) -> list of dicts (or a scalar).
+        """
+        self.rpc_functions[name] = fn
+
+    # --- schema introspection ---
+
+    def columns(self, table: str) -> dict:
+        if table not in self._columns:
+            info = self.conn.execute(f'PRAGMA table_info("{table}")').fetchall()
+            self._columns[table] = {row["name"]: (row["type"] or "").upper() for row in info}
+        return self._columns[table]
+
+    def foreign_keys(self, table: str) -> dict:
+        """referenced table -> (column, referenced column)"""
+        if table not in self._foreign_keys:
+            rows = self.conn.execute(f'PRAGMA foreign_key_list("{table}")').fetchall()
+            self._foreign_keys[table] = {row["table"]: (row["from"], row["to"] or "id") for row in rows}
+        return self._foreign_keys[table]
+
+    # --- value conversion ---
+
+    def encode(self, table: str, column: str, value):
+        kind = self.columns(table).get(column, "")
+        if value is None:
+            return None
+        if hasattr(value, "item") and not isinstance(value, (str, bytes)):
+            value = value.item()  # numpy scalars (rows built with pandas)
+        if kind.startswith("JSON"):
+            return json.dumps(value)
+        if isinstance(value, bool):
+            return int(value)
+        if isinstance(value, (dict, list)):
+            return json.dumps(value)
+        if hasattr(value, "isoformat"):
+            return value.isoformat()
+        return value
+
+    def decode_row(self, table: str, row) -> dict:
+        types = self.columns(table)
+        result = {}
+        for key in row.keys():
+            value = row[key]
+            kind = types.get(key, "")
+            if value is not None:
+                if kind == "BOOLEAN":
+                    value = bool(value)
+                elif kind.startswith("JSON") and isinstance(value, str):
+                    value = json.loads(value)
+                elif kind.startswith("NUMERIC"):
+                    value = float(value)
+            result[key] = value
+        return result
+
+    def fetch(self, table: str, sql: str, params=()) -> list:
+        return [self.decode_row(table, row) for row in self.conn.execute(sql, params).fetchall()]
+
+    # --- embedded relations ---
+
+    def project(self, table: str, rows: list, columns: str) -> list:
+        items = _split_top_level(columns or "*")
+        plain = [i for i in items if "(" not in i]
+        embeds = [i for i in items if "(" in i]
+
+        if "*" in plain:
+            projected = [dict(row) for row in rows]
+        else:
+            names = [c.split(":")[-1].strip() for c in plain]
+            for name in names:
+                if name not in self.columns(table):
+                    raise APIError({"message": f"column {table}.{name} does not exist", "code": "42703"})
+            projected = [{name: row[name] for name in names} for row in rows]
+
+        for embed in embeds:
+            match = re.fullmatch(r"(?:(\w+):)?(\w+)(?:!\w+)?\((.*)\)", embed, re.S)
+            alias, relation, sub_columns = match.group(1), match.group(2), match.group(3)
+            key = alias or relation
+            values = self._embed(table, rows, relation, sub_columns)
+            for target, value in zip(projected, values):
+                target[key] = value
+        return projected
+
+    def _embed(self, table, rows, relation, sub_columns):
+        fks = self.foreign_keys(table)
+        if relation in fks:
+            # Many-to-one: one object (or None) per row
+            column, ref = fks[relation]
+            keys = list({row[column] for row in rows if row[column] is not None})
+            related = {}
+            if keys:
+                sql = f'SELECT * FROM "{relation}" WHERE "{ref}" IN ({", ".join("?" * len(keys))})'
+                fetched = self.fetch(relation, sql, keys)
+                for raw, proj in zip(fetched, self.project(relation, fetched, sub_columns)):
+                    related[raw[ref]] = proj
+            return [related.get(row[column]) for row in rows]
+
+        back = self.foreign_keys(relation).get(table)
+        if back:
+            # One-to-many: list per row
+            column, ref = back
+            keys = list({row[ref] for row in rows})
+            grouped = {k: [] for k in keys}
+            if keys:
+                sql = f'SELECT * FROM "{relation}" WHERE "{column}" IN ({", ".join("?" * len(keys))})'
+                fetched = self.fetch(relation, sql, keys)
+                for raw, proj in zip(fetched, self.project(relation, fetched, sub_columns)):
+                    grouped[raw[column]].append(proj)
+            return [grouped.get(row[ref], []) for row in rows]
+
+        raise APIError({"message": f"no relationship between {table} and {relation}", "code": "PGRST200"})
+
+
+# --- Database functions (see schema_updates.sql) ---
+
+def _payroll_deductions(client, p_company_id, p_month):
+    month_start = datetime.fromisoformat(str(p_month)).date().replace(day=1)
+    month_end = (month_start + timedelta(days=32)).replace(day=1)
+    sql = """
+        SELECT u.id AS user_id, u.name, u.cpf, count(*) AS contracts,
+               sum(coalesce(p.monthly_price, 0) + coalesce(p.insurance_price, 0)) AS monthly_total,
+               round(sum(
+                   (coalesce(p.monthly_price, 0) + coalesce(p.insurance_price, 0)) *
+                   CASE WHEN date(o.signed_at) < :start THEN 1.0
+                        ELSE (julianday(:end) - julianday(date(o.signed_at))) / (julianday(:end) - julianday(:start))
+                   END
+               ), 2) AS deduction
+        FROM orders o
+        JOIN user_profiles u ON u.id = o.user_id
+        JOIN products p ON p.id = o.product_id
+        WHERE o.company_id = :company
+          AND o.status IN ('contract_signed', 'imei_linked', 'dispatched')
+          AND date(o.signed_at) < :end
+        GROUP BY u.id, u.name, u.cpf
+        ORDER BY u.name, u.id
+    """
+    params = {"start": month_start.isoformat(), "end": month_end.isoformat(), "company": p_company_id}
+    return [dict(row) for row in client.conn.execute(sql, params).fetchall()]
+
+def _claim_email_outbox(client, p_limit, p_lease_seconds=300):
+    now = datetime.now(timezone.utc)
+    lease = (now + timedelta(seconds=p_lease_seconds)).isoformat()
+    sql = """
+        UPDATE email_outbox
+        SET status = 'sending', attempts = attempts + 1, locked_until = :lease
+        WHERE id IN (
+            SELECT id FROM email_outbox
+            WHERE (status = 'pending' AND next_attempt_at <= :now)
+               OR (status = 'sending' AND locked_until < :now)
+            ORDER BY next_attempt_at
+            LIMIT :limit
+        )
+        RETURNING *
+    """
+    return client.fetch("email_outbox", sql, {"lease": lease, "now": now.isoformat(), "limit": p_limit})
+
+def _link_imeis(client, p_links):
+    # Same as the Postgres function: pairs in order-id order, each in a
+    # savepoint so an IMEI conflict skips only that pair
+    update = """
+        UPDATE orders SET imei = :imei, status = 'imei_linked'
+        WHERE id = :order_id AND status = 'contract_signed'
+        RETURNING id
+    """
+    linked = []
+    client.conn.execute("BEGIN")
+    try:
+        for link in sorted(p_links, key=lambda l: str(l["order_id"])):
+            client.conn.execute("SAVEPOINT link")
+            try:
+                linked.extend(row["id"] for row in client.conn.execute(update, link).fetchall())
+            except sqlite3.IntegrityError:
+                client.conn.execute("ROLLBACK TO link")
+            client.conn.execute("RELEASE link")
+        client.conn.execute("COMMIT")
+    except Exception:
+        client.conn.execute("ROLLBACK")
+        raise
+    if not linked:
+        return []
+    sql = f"""
+        SELECT o.id, o.imei, u.name, u.email, p.brand, p.model
+        FROM orders o
+        JOIN user_profiles u ON u.id = o.user_id
+        JOIN products p ON p.id = o.product_id
+        WHERE o.id IN ({", ".join("?" * len(linked))})
+    """
+    return [dict(row) for row in client.conn.execute(sql, linked).fetchall()]
+
+def _set_contract_urls(client, p_urls):
+    sql = """
+        UPDATE orders SET contract_url = :contract_url
+        WHERE id = :order_id AND contract_url IS NOT :contract_url
+    """
+    client.conn.executemany(sql, [
+        {"order_id": str(u["order_id"]), "contract_url": u["contract_url"]} for u in p_urls
+    ])
+    return None
+
+ORDER_PAYLOAD_SELECT = "*, user_profiles(name, cpf, email, phone), products(*), companies(*)"
+
+def _order_transition(client, order_id, allowed, to, imei=None):
+    # A conditional update: checking the status and changing it is one statement
+    changes = {"status": to}
+    if imei is not None:
+        changes["imei"] = imei
+    updated = TableQuery(client, "orders").update(changes).eq("id", order_id).in_("status", allowed).execute().data
+    if not updated:
+        current = TableQuery(client, "orders").select("status").eq("id", order_id).execute().data
+        if not current:
+            raise APIError({"message": f"order {order_id} not found", "code": "P0002"})
+        raise APIError({
+            "message": f"order {order_id} is {current[0]['status']}, cannot become {to}", "code": "55000"
+        })
+    return TableQuery(client, "orders").select(ORDER_PAYLOAD_SELECT).eq("id", order_id).execute().data[0]
+
+def _order_link_imei(client, p_order_id, p_imei):
+    return _order_transition(client, p_order_id, ["contract_signed"], "imei_linked", p_imei)
+
+def _order_dispatch(client, p_order_id, p_imei=None):
+    allowed = ["imei_linked"] if p_imei is None else ["contract_signed", "imei_linked"]
+    return _order_transition(client, p_order_id, allowed, "dispatched", p_imei)
+
+def _order_cancel(client, p_order_id):
+    return _order_transition(client, p_order_id, ["created", "contract_signed", "imei_linked"], "cancelled")
+
+def _order_return(client, p_order_id):
+    return _order_transition(client, p_order_id, ["dispatched"], "returned")
+
+RPC_FUNCTIONS = {
+    "payroll_deductions": _payroll_deductions,
+    "claim_email_outbox": _claim_email_outbox,
+    "link_imeis": _link_imeis,
+    "set_contract_urls": _set_contract_urls,
+    "order_link_imei": _order_link_imei,
+    "order_dispatch": _order_dispatch,
+    "order_cancel": _order_cancel,
+    "order_return": _order_return,
+}
@@ -0,0 +1,220 @@
+import hashlib
+import io
+import os
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+import streamlit as st
+
+CHUNK_SIZE = 64 * 1024
+DEFAULT_ROOT = os.path.join(os.path.dirname(os.path.dirname(__file__)), "storage", "contracts")
+
+def _iter_chunks(data):
+    """
+    Yields `data` (bytes or a binary file-like object) in CHUNK_SIZE pieces.
+    """
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        view = memoryview(data)
+        for start in range(0, len(view), CHUNK_SIZE):
+            yield view[start:start + CHUNK_SIZE]
+    else:
+        while True:
+            chunk = data.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
+
+class ContractStorage(ABC):
+    """
+    Interface for where rendered contracts live. `put` returns the location
+    stored in `orders.contract_url`.
+
+    Keys default to the SHA-256 of the content, so identical documents are
+    stored once.
+    """
+
+    @abstractmethod
+    def put(self, data, key: str = None) -> str:
+        ...
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        ...
+
+    @abstractmethod
+    def get(self, key: str) -> bytes:
+        ...
+
+    @abstractmethod
+    def location(self, key: str) -> str:
+        ...
+
+
+class LocalContentStore(ContractStorage):
+    """
+    Content-addressed directory: <root>/<key[:2]>/<key>.pdf.
+
+    Writes stream into a temporary file in the same directory and are
+    atomically renamed, so readers never see partial files and concurrent
+    writers of the same document simply converge on one file.
+    """
+
+    def __init__(self, root: str = DEFAULT_ROOT):
+        self.root = os.path.abspath(root)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], f"{key}.pdf")
+
+    def location(self, key: str) -> str:
+        return self._path(key)
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def get(self, key: str) -> bytes:
+        with open(self._path(key), "rb") as f:
+            return f.read()
+
+    def put(self, data, key: str = None) -> str:
+        os.makedirs(self.root, exist_ok=True)
+        digest = hashlib.sha256()
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in _iter_chunks(data):
+                    digest.update(chunk)
+                    f.write(chunk)
+            path = self._path(key or digest.hexdigest())
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp_path, path)
+            return path
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+
+class SupabaseStorage(ContractStorage):
+    """
+    Supabase Storage bucket backend, for deployments with several replicas.
+    """
+
+    def __init__(self, bucket: str = "contracts", client=None):
+        self.bucket = bucket
+        self._client = client
+
+    def _bucket(self):
+        client = self._client
+        if client is None:
+            from services.supabase_client import get_supabase
+            client = get_supabase()
+        return client.storage.from_(self.bucket)
+
+    @staticmethod
+    def _object_path(key: str) -> str:
+        return f"{key[:2]}/{key}.pdf"
+
+    def location(self, key: str) -> str:
+        return f"supabase://{self.bucket}/{self._object_path(key)}"
+
+    def exists(self, key: str) -> bool:
+        folder, name = self._object_path(key).split("/")
+        files = self._bucket().list(folder, {"search": name})
+        return any(f.get("name") == name for f in files or [])
+
+    def get(self, key: str) -> bytes:
+        return self._bucket().download(self._object_path(key))
+
+    def put(self, data, key: str = None) -> str:
+        if not isinstance(data, (bytes, bytearray)):
+            data = b"".join(_iter_chunks(data))
+        key = key or hashlib.sha256(data).hexdigest()
+        self._bucket().upload(
+            self._object_path(key), bytes(data),
+            {"content-type": "application/pdf", "upsert": "true"}
+        )
+        return self.location(key)
+
+
+class MemoryStorage(ContractStorage):
+    """
+    In-process stand-in used by tests and offline runs.
+    """
+
+    def __init__(self):
+        self.objects = {}
+        self._lock = threading.Lock()
+
+    def location(self, key: str) -> str:
+        return f"memory://{key}.pdf"
+
+    def exists(self, key: str) -> bool:
+        return key in self.objects
+
+    def get(self, key: str) -> bytes:
+        return self.objects[key]
+
+    def put(self, data, key: str = None) -> str:
+        buffer = io.BytesIO()
+        for chunk in _iter_chunks(data):
+            buffer.write(chunk)
+        content = buffer.getvalue()
+        key = key or hashlib.sha256(content).hexdigest()
+        with self._lock:
+            self.objects[key] = content
+        return self.location(key)
+
+
+_storage = None
+_storage_lock = threading.Lock()
+
+def _storage_from_config() -> ContractStorage:
+    config = {}
+    try:
+        config = st.secrets.get("storage") or {}
+    except Exception:
+        pass
+
+    backend = config.get("backend", "local")
+    if backend == "supabase":
+        return SupabaseStorage(config.get("bucket", "contracts"))
+    if backend == "memory":
+        return MemoryStorage()
+    return LocalContentStore(config.get("path", DEFAULT_ROOT))
+
+def get_storage() -> ContractStorage:
+    """
+    Returns the configured contract storage (`[storage]` in secrets:
+    backend = "local" | "supabase" | "memory"). Defaults to a local
+    content-addressed directory.
+    """
+    global _storage
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                _storage = _storage_from_config()
+    return _storage
+
+def set_storage(storage: ContractStorage):
+    """
+    Replaces the process-wide storage (tests, scripts).
+    """
+    global _storage
+    with _storage_lock:
+        _storage = storage
+
+def read_location(location: str) -> bytes:
+    """
+    Returns the bytes behind a location put() returned (a file path or a
+    supabase:// / memory:// URL), read through the configured storage.
+    Paths outside the storage (older contracts) are read from disk.
+    """
+    if "://" not in location and os.path.exists(location):
+        with open(location, "rb") as f:
+            return f.read()
+    # Every backend names objects "<key>.pdf"
+    key = os.path.basename(location)
+    if key.endswith(".pdf"):
+        key = key[:-len(".pdf")]
+    return get_storage().get(key)
@@ -1,5 +1,7 @@
+import os
 import streamlit as st
 from supabase import create_client, Client
+from services import tracing
 
 class SupabaseService:
     _instance = None
@@ -12,6 +14,19 @@ class SupabaseService:
         return cls._instance
 
     def _initialize(self):
+        # Embedded SQLite stand-in (offline development, tests, benchmarks)
+        database = {}
+        try:
+            if hasattr(st, "secrets") and "database" in st.secrets:
+                database = dict(st.secrets["database"])
+        except Exception:
+            pass
+        if os.environ.get("TREK_DB_BACKEND", database.get("backend")) == "sqlite":
+            from services.sqlite_backend import SQLiteClient
+            path = os.environ.get("TREK_SQLITE_PATH", database.get("path", ":memory:"))
+            self._client = SQLiteClient(path, seed=database.get("seed", True))
+            return
+
         url = None
         key = None
         # 1. Try Streamlit Secrets
@@ -24,7 +39,7 @@ class SupabaseService:
 
         # 2. Fallback to local secrets.toml (for tests)
         if not url:
-            import toml, os
+            import toml
             try:
                 secrets_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "secrets.toml")
                 if os.path.exists(secrets_path):
@@ -47,6 +62,15 @@ class SupabaseService:
     def client(self) -> Client:
         return self._client
 
+def set_client(client):
+    """
+    Replaces the process-wide client (e.g. with an SQLiteClient in tests).
+    """
+    SupabaseService()._client = client
+
 def get_supabase() -> Client:
     service = SupabaseService()
+    # Inside a trace, queries record "db.<table>.<operation>" spans
+    if service.client is not None and tracing.active():
+        return tracing.TracedClient(service.client)
     return service.client
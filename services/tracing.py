@@ -0,0 +1,287 @@
+import contextvars
+import functools
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+from datetime import datetime, timezone
+
+# Completed traces kept in memory (oldest dropped first)
+TRACE_BUFFER_SIZE = 200
+
+_traces = deque(maxlen=TRACE_BUFFER_SIZE)
+_traces_lock = threading.Lock()
+_current = contextvars.ContextVar("trace_span", default=None)
+_RERUN_KEY = "_trace_rerun"
+_NULL = nullcontext()
+
+class Span:
+    """
+    One timed operation; children are the spans opened while it was active.
+    """
+    __slots__ = ("name", "attrs", "start", "end", "children", "error", "parent", "started_at", "last")
+
+    def __init__(self, name: str, attrs: dict = None, parent=None):
+        self.name = name
+        self.attrs = attrs or {}
+        self.parent = parent
+        self.children = []
+        self.error = None
+        self.started_at = None
+        self.start = time.perf_counter()
+        self.end = None
+        self.last = self.start  # latest activity in the whole tree (roots only)
+
+    @property
+    def duration(self) -> float:
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+    @property
+    def self_time(self) -> float:
+        return max(0.0, self.duration - sum(child.duration for child in self.children))
+
+    def root(self):
+        span = self
+        while span.parent is not None:
+            span = span.parent
+        return span
+
+    def finish(self, exc_type=None):
+        self.end = time.perf_counter()
+        if exc_type is not None and self.error is None:
+            self.error = exc_type.__name__
+        root = self.root()
+        root.last = max(root.last, self.end)
+
+class _ActiveSpan:
+    """Context manager that makes a new span current for its duration."""
+    __slots__ = ("span", "token")
+
+    def __init__(self, span: Span):
+        self.span = span
+        self.token = None
+
+    def __enter__(self) -> Span:
+        self.token = _current.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        self.span.finish(exc_type)
+        _current.reset(self.token)
+        if self.span.parent is None:
+            _record(self.span)
+        return False
+
+def _record(root: Span):
+    with _traces_lock:
+        _traces.append(root)
+
+def current_span():
+    return _current.get()
+
+def active() -> bool:
+    """True while a trace is recording in this context."""
+    parent = _current.get()
+    return parent is not None and parent.end is None
+
+def span(name: str, **attrs):
+    """
+    Times a block as a child of the active span:
+
+        with span("pdf.render", pages=2):
+            ...
+
+    Outside a trace (no rerun or trace() active) this is a no-op, so
+    instrumented code costs next to nothing in scripts and workers.
+    """
+    parent = _current.get()
+    if parent is None or parent.end is not None:
+        return _NULL
+    child = Span(name, attrs, parent)
+    parent.children.append(child)
+    return _ActiveSpan(child)
+
+def traced(name: str = None):
+    """
+    Decorator form of span(); the span is named after the function by default.
+    """
+    def decorator(fn):
+        label = name or f"{fn.__module__}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not active():
+                return fn(*args, **kwargs)
+            with span(label):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def trace(name: str, **attrs):
+    """
+    Starts a new trace (a root span) that is stored in the ring buffer when
+    the block exits. Use it for work outside a page rerun, e.g. scripts.
+    """
+    root = Span(name, attrs)
+    root.started_at = datetime.now(timezone.utc)
+    return _ActiveSpan(root)
+
+# --- Streamlit reruns ---
+
+def _session_state():
+    import streamlit as st
+    return st.session_state
+
+def begin_rerun(page: str):
+    """
+    Starts the trace of a page rerun. Call it at the top of the page and
+    end_rerun() at the bottom.
+
+    Streamlit offers no end-of-run hook, so a rerun that stopped early
+    (st.stop(), st.rerun(), st.switch_page() or an exception) is closed by
+    the session's next begin_rerun(), ending at its last recorded activity.
+    """
+    state = _session_state()
+    _finish(state.get(_RERUN_KEY), stopped=True)
+    root = Span(page, {"kind": "rerun"})
+    root.started_at = datetime.now(timezone.utc)
+    state[_RERUN_KEY] = root
+    _current.set(root)
+    return root
+
+def end_rerun():
+    """
+    Closes the current rerun's trace and stores it in the ring buffer.
+    """
+    state = _session_state()
+    root = state.get(_RERUN_KEY)
+    if _current.get() is root:
+        _current.set(None)
+    _finish(root, stopped=False)
+
+def _finish(root, stopped: bool):
+    if root is None or root.end is not None:
+        return
+    if stopped:
+        root.end = root.last
+        root.attrs["stopped"] = True
+    else:
+        root.end = time.perf_counter()
+    _record(root)
+
+# --- Reading ---
+
+def recent_traces(kind: str = None) -> list:
+    """
+    Returns the buffered traces, newest first, optionally only one kind
+    (e.g. "rerun").
+    """
+    with _traces_lock:
+        traces = list(_traces)
+    traces.reverse()
+    if kind:
+        traces = [t for t in traces if t.attrs.get("kind") == kind]
+    return traces
+
+def slowest_traces(limit: int = 20, kind: str = None) -> list:
+    return sorted(recent_traces(kind), key=lambda t: t.duration, reverse=True)[:limit]
+
+def breakdown(root: Span) -> list:
+    """
+    Flattens a trace depth-first.
+
+    Returns:
+        list: One dict per span with depth, name, duration and self_time
+              (seconds), error and attrs.
+    """
+    rows = []
+    stack = [(root, 0)]
+    while stack:
+        node, depth = stack.pop()
+        rows.append({
+            "depth": depth, "name": node.name, "duration": node.duration,
+            "self_time": node.self_time, "error": node.error, "attrs": dict(node.attrs),
+        })
+        stack.extend((child, depth + 1) for child in reversed(node.children))
+    return rows
+
+def summarize(traces) -> list:
+    """
+    Totals time per span name over the given traces (roots excluded),
+    slowest total first.
+
+    Returns:
+        list: Dicts with name, count, total, max (seconds) and errors.
+    """
+    totals = {}
+    for root in traces:
+        for row in breakdown(root)[1:]:
+            t = totals.setdefault(row["name"], {"name": row["name"], "count": 0, "total": 0.0, "max": 0.0, "errors": 0})
+            t["count"] += 1
+            t["total"] += row["duration"]
+            t["max"] = max(t["max"], row["duration"])
+            if row["error"]:
+                t["errors"] += 1
+    return sorted(totals.values(), key=lambda t: t["total"], reverse=True)
+
+def clear():
+    with _traces_lock:
+        _traces.clear()
+
+# --- Database client instrumentation ---
+
+_QUERY_OPS = frozenset(["select", "insert", "upsert", "update", "delete"])
+
+class _TracedQuery:
+    """
+    Proxies a query builder, timing execute() as "db.<table>.<operation>".
+    """
+    __slots__ = ("_builder", "_name", "_op")
+
+    def __init__(self, builder, name: str, op: str = None):
+        self._builder = builder
+        self._name = name
+        self._op = op
+
+    def __getattr__(self, attr):
+        value = getattr(self._builder, attr)
+        if not callable(value):
+            return value
+        op = attr if attr in _QUERY_OPS else self._op
+
+        def call(*args, **kwargs):
+            result = value(*args, **kwargs)
+            # Builders return new builders; keep wrapping them
+            if hasattr(result, "execute"):
+                return _TracedQuery(result, self._name, op)
+            return result
+        return call
+
+    def execute(self):
+        with span(f"db.{self._name}.{self._op or 'query'}"):
+            return self._builder.execute()
+
+class TracedClient:
+    """
+    Wraps a Supabase (or SQLiteClient) client so table() and rpc() queries
+    record spans; everything else is passed through.
+    """
+    __slots__ = ("_client",)
+
+    def __init__(self, client):
+        self._client = client
+
+    @property
+    def wrapped(self):
+        return self._client
+
+    def table(self, name: str):
+        return _TracedQuery(self._client.table(name), name)
+
+    from_ = table
+
+    def rpc(self, name: str, *args, **kwargs):
+        return _TracedQuery(self._client.rpc(name, *args, **kwargs), "rpc", name)
+
+    def __getattr__(self, attr):
+        return getattr(self._client, attr)
@@ -0,0 +1,81 @@
+import pandas as pd
+from openpyxl import load_workbook
+
+PREVIEW_ROWS = 5
+BATCH_SIZE = 5000
+
+def _is_excel(filename: str) -> bool:
+    return filename.lower().endswith((".xlsx", ".xlsm"))
+
+def _cell_to_str(value):
+    """
+    Renders a cell as text. Numeric CPFs come back from Excel as int/float,
+    so integral floats lose their trailing `.0`.
+    """
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+def _iter_excel_batches(file, batch_size: int, max_rows: int = None):
+    # read_only streams rows from the zip instead of building the whole sheet
+    wb = load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [_cell_to_str(c) or f"col_{i}" for i, c in enumerate(header)]
+
+        batch = []
+        seen = 0
+        for row in rows:
+            if max_rows is not None and seen >= max_rows:
+                break
+            if all(v is None for v in row):
+                continue
+            batch.append([_cell_to_str(v) for v in row])
+            seen += 1
+            if len(batch) >= batch_size:
+                yield pd.DataFrame(batch, columns=columns, dtype=str)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=columns, dtype=str)
+    finally:
+        wb.close()
+
+def iter_batches(file, filename: str, batch_size: int = BATCH_SIZE):
+    """
+    Streams an uploaded CSV/XLSX as DataFrames of at most `batch_size` rows.
+    Every column is read as text so CPFs keep their leading zeros; peak
+    memory is bounded by the batch size, not the file size.
+
+    Args:
+        file: A binary file-like object (e.g. Streamlit's UploadedFile).
+        filename (str): Original name, used to pick the parser.
+        batch_size (int): Rows per yielded DataFrame.
+
+    Yields:
+        pd.DataFrame: Consecutive batches of rows.
+    """
+    if hasattr(file, "seek"):
+        file.seek(0)
+
+    if _is_excel(filename):
+        yield from _iter_excel_batches(file, batch_size)
+    else:
+        with pd.read_csv(file, dtype=str, chunksize=batch_size) as reader:
+            yield from reader
+
+def read_preview(file, filename: str, n: int = PREVIEW_ROWS) -> pd.DataFrame:
+    """
+    Reads only the first `n` data rows of an upload for display.
+    """
+    if hasattr(file, "seek"):
+        file.seek(0)
+
+    if _is_excel(filename):
+        batches = list(_iter_excel_batches(file, n, max_rows=n))
+        return batches[0] if batches else pd.DataFrame()
+    return pd.read_csv(file, dtype=str, nrows=n)
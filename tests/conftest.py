@@ -0,0 +1,43 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from services import outbox
+from services.sqlite_backend import SQLiteClient, SEED_COMPANY_ID
+from services.supabase_client import SupabaseService
+
+@pytest.fixture(autouse=True)
+def stop_outbox_worker():
+    """
+    Pages start the email worker (require_auth); stop it with the test, so it
+    never outlives the database the test installed.
+    """
+    yield
+    outbox.stop_worker()
+
+@pytest.fixture
+def db(monkeypatch):
+    """A seeded in-memory SQLiteClient, installed as the app's database."""
+    client = SQLiteClient(seed=True)
+    monkeypatch.setattr(SupabaseService(), "_client", client)
+    yield client
+    client.close()
+
+@pytest.fixture
+def add_orders(db):
+    """
+    Factory inserting `n` orders of the seed employee for the seed Apple
+    product. Keyword arguments set columns; a list gives one value per order.
+    """
+    def add(n=1, status="contract_signed", **columns):
+        user = db.table("user_profiles").select("id").eq("role", "employee").execute().data[0]
+        product = db.table("products").select("id").eq("brand", "Apple").execute().data[0]
+        rows = []
+        for i in range(n):
+            row = {"user_id": user["id"], "product_id": product["id"],
+                   "company_id": SEED_COMPANY_ID, "status": status}
+            row.update({k: v[i] if isinstance(v, list) else v for k, v in columns.items()})
+            rows.append(row)
+        return db.table("orders").insert(rows).execute().data
+    return add
@@ -0,0 +1,51 @@
+import sys
+import os
+import threading
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from services.assets import AssetRegistry
+
+def test_sessions_share_one_buffer(tmp_path):
+    (tmp_path / "video.mp4").write_bytes(b"\x00" * 100_000)
+    registry = AssetRegistry(str(tmp_path))
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.get("video.mp4"))) for _ in range(20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert all(r is results[0] for r in results)
+    assert registry.stats()["video.mp4"]["loads"] == 1
+    view = registry.view("video.mp4")
+    assert view.obj is results[0]
+
+def test_missing_asset(tmp_path):
+    registry = AssetRegistry(str(tmp_path))
+    assert registry.get("missing.docx") is None
+    assert registry.view("missing.docx") is None
+
+def test_reload_only_when_checksum_changes(tmp_path):
+    path = tmp_path / "contract.docx"
+    path.write_bytes(b"v1")
+    registry = AssetRegistry(str(tmp_path), check_interval=0)
+    first = registry.get("contract.docx")
+
+    # Touched but identical: same buffer kept
+    os.utime(path, ns=(1, 1))
+    assert registry.get("contract.docx") is first
+    assert registry.stats()["contract.docx"]["loads"] == 1
+
+    path.write_bytes(b"v2-changed")
+    assert registry.get("contract.docx") == b"v2-changed"
+    assert registry.stats()["contract.docx"]["loads"] == 2
+
+def test_changes_are_not_seen_within_check_interval(tmp_path):
+    path = tmp_path / "contract.docx"
+    path.write_bytes(b"v1")
+    registry = AssetRegistry(str(tmp_path), check_interval=3600)
+    registry.get("contract.docx")
+    path.write_bytes(b"v2")
+    assert registry.get("contract.docx") == b"v1"
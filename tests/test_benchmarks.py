@@ -0,0 +1,33 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'benchmarks')))
+
+import pytest
+import run
+import suite
+
+def results(**medians):
+    return {"benchmarks": {name: {"median": value} for name, value in medians.items()}}
+
+def test_compare_flags_regressions_beyond_threshold():
+    baseline = results(a=1.0, b=1.0, c=1.0, gone=1.0)
+    current = results(a=1.05, b=1.2, c=0.5, new=1.0)
+    rows = {row[0]: row[4] for row in run.compare(baseline, current, threshold=0.1)}
+    assert rows == {"a": "ok", "b": "regression", "c": "improvement", "gone": "missing", "new": "new"}
+
+def test_run_saves_and_compare_exits_nonzero_on_regression(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(run, "RESULTS_DIR", str(tmp_path))
+    assert run.main(["-k", "documents.cep.*", "--rounds", "2", "--min-time", "0.001", "--save", "base"]) == 0
+    saved = run.load("base")
+    assert list(saved["benchmarks"]) == ["documents.cep.normalize"]
+
+    # A baseline 100x faster than now means the current tree regressed
+    saved["benchmarks"]["documents.cep.normalize"]["median"] /= 100
+    run.save("fast", saved)
+    assert run.main(["compare", "fast", "base"]) == 1
+    assert "REGRESSION" in capsys.readouterr().out
+
+@pytest.mark.parametrize("name", ["clients.cnpj", "auth.login_by_cpf.cold", "pdf.generate.single"])
+def test_benchmarks_run_against_local_stand_ins(name):
+    result = suite.run([name], rounds=1, min_time=0.001)[name]
+    assert result["median"] > 0
@@ -0,0 +1,57 @@
+import sys
+import os
+import threading
+from unittest.mock import MagicMock, patch
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from services import catalog_service
+
+PRODUCTS = [{"id": "p1", "brand": "Samsung", "model": "Galaxy S23"}, {"id": "p2", "brand": "Apple", "model": "iPhone 14"}]
+
+@pytest.fixture
+def supabase(monkeypatch):
+    monkeypatch.setattr(catalog_service, "_cache", None)
+    client = MagicMock()
+    client.table.return_value.select.return_value.eq.return_value.execute.return_value.data = PRODUCTS
+    with patch("services.repositories.get_supabase", return_value=client):
+        yield client
+
+def loads(client):
+    return client.table.return_value.select.return_value.eq.return_value.execute.call_count
+
+def test_reads_are_served_from_memory(supabase):
+    for _ in range(100):
+        assert catalog_service.get_active_products() == PRODUCTS
+    assert catalog_service.get_product("p2")["model"] == "iPhone 14"
+    assert catalog_service.get_product("missing") is None
+    assert loads(supabase) == 1
+    supabase.table.return_value.select.assert_called_with(catalog_service.CATALOG_COLUMNS)
+
+def test_admin_writes_bump_the_version(supabase):
+    catalog_service.get_active_products()
+    version = catalog_service.catalog_version()
+
+    catalog_service.set_product_active("p1", False)
+    supabase.table.return_value.update.assert_called_with({"active": False}, returning="minimal")
+    assert catalog_service.catalog_version() == version + 1
+    catalog_service.get_active_products()
+    assert loads(supabase) == 2
+
+    catalog_service.create_product({"brand": "Motorola", "model": "G84"})
+    catalog_service.get_active_products()
+    assert loads(supabase) == 3
+
+def test_max_age_forces_reload(supabase, monkeypatch):
+    catalog_service.get_active_products()
+    monkeypatch.setattr(catalog_service, "CATALOG_MAX_AGE", 0)
+    catalog_service.get_active_products()
+    assert loads(supabase) == 2
+
+def test_concurrent_sessions_load_once(supabase):
+    threads = [threading.Thread(target=catalog_service.get_active_products) for _ in range(20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert loads(supabase) == 1
@@ -26,3 +26,53 @@ def test_get_address_from_cep_format():
     address = get_address_from_cep(cep)
     assert address is not None
     assert address["cep"] == "01001000"
+
+from unittest.mock import MagicMock, patch
+from services import cep_service
+from services.cache import TTLCache, SQLiteCache
+
+@pytest.fixture
+def isolated_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(cep_service, "_memory_cache", TTLCache(maxsize=10, ttl=60))
+    monkeypatch.setattr(cep_service, "_disk_cache", SQLiteCache(str(tmp_path / "cep.sqlite3"), table="cep"))
+    yield cep_service
+
+def _response(status_code, payload=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.json.return_value = payload or {}
+    return response
+
+def test_cep_lookup_is_cached(isolated_cache):
+    payload = {"street": "Praça da Sé", "neighborhood": "Sé", "city": "São Paulo", "state": "SP"}
+    with patch("services.http_client.get", return_value=_response(200, payload)) as mock_get:
+        first = get_address_from_cep("01001-000")
+        second = get_address_from_cep("01001000")
+
+    assert first == second
+    assert first["city"] == "São Paulo"
+    assert mock_get.call_count == 1
+    assert isolated_cache.get_cache_stats()["memory"]["hits"] == 1
+
+def test_cep_disk_cache_survives_memory_eviction(isolated_cache):
+    payload = {"street": "Praça da Sé", "city": "São Paulo", "state": "SP"}
+    with patch("services.http_client.get", return_value=_response(200, payload)) as mock_get:
+        get_address_from_cep("01001000")
+        isolated_cache._memory_cache.clear()
+        address = get_address_from_cep("01001000")
+
+    assert address["street"] == "Praça da Sé"
+    assert mock_get.call_count == 1
+    assert isolated_cache.get_cache_stats()["disk"]["hits"] == 1
+
+def test_cep_negative_caching(isolated_cache):
+    with patch("services.http_client.get", return_value=_response(404)) as mock_get:
+        assert get_address_from_cep("99999999") is None
+        assert get_address_from_cep("99999999") is None
+    assert mock_get.call_count == 1
+
+def test_cep_transient_errors_are_not_cached(isolated_cache):
+    with patch("services.http_client.get", side_effect=Exception("timeout")) as mock_get:
+        assert get_address_from_cep("01001000") is None
+        assert get_address_from_cep("01001000") is None
+    assert mock_get.call_count == 2
@@ -0,0 +1,61 @@
+import sys
+import os
+import io
+import time
+from unittest.mock import patch
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from services.company_import import read_company_csv, enrich_companies, build_company_row, insert_companies
+from services.http_client import RateLimiter
+
+def test_read_company_csv_normalizes_and_dedupes():
+    csv = io.StringIO("CNPJ,logo_url\n06.990.590/0001-23,http://logo\n06990590000123,\n,\n11222333000181,\n")
+    rows = read_company_csv(csv)
+    assert [r["cnpj"] for r in rows] == ["06990590000123", "11222333000181"]
+    assert rows[0]["logo_url"] == "http://logo"
+
+def test_read_company_csv_requires_cnpj_column():
+    with pytest.raises(ValueError):
+        read_company_csv(io.StringIO("Nome\nFoo\n"))
+
+def test_enrich_companies_yields_every_row():
+    rows = [{"cnpj": f"{i:014d}"} for i in range(20)]
+
+    def fake_consult(cnpj):
+        if cnpj.endswith("3"):
+            raise RuntimeError("boom")
+        return {"cnpj": cnpj, "name": f"Empresa {cnpj}", "address": "Rua X"}
+
+    with patch("services.company_import.consult_cnpj", side_effect=fake_consult):
+        results = list(enrich_companies(rows, max_workers=4, rate_per_second=1000))
+
+    assert len(results) == 20
+    failed = sorted(row["cnpj"] for row, data in results if data is None)
+    assert failed == ["00000000000003", "00000000000013"]
+
+def test_rate_limiter_spaces_calls():
+    limiter = RateLimiter(50)
+    start = time.monotonic()
+    for _ in range(6):
+        limiter.acquire()
+    assert time.monotonic() - start >= 0.09
+
+def test_insert_companies_single_batch_skips_existing(db):
+    # seed.sql stores its CNPJ formatted
+    companies = [
+        build_company_row({"cnpj": "00000000000100"}, {"cnpj": "00000000000100", "name": "Dup", "address": ""}),
+        build_company_row({"cnpj": "11222333000181", "logo_url": "http://l"},
+                          {"cnpj": "11222333000181", "name": "B", "address": "Rua"}),
+    ]
+    inserted = insert_companies(companies)
+    assert [(c["cnpj"], c["logo_url"]) for c in inserted] == [("11222333000181", "http://l")]
+    assert db.table("companies").select("id", count="exact").execute().count == 2
+
+def test_insert_companies_skips_conflicts_instead_of_failing(db):
+    # Registered between the existence check and the insert
+    with patch("services.repositories.CompanyRepository.existing_cnpjs", return_value=set()):
+        first = insert_companies([{"cnpj": "11222333000181", "name": "A"}])
+        again = insert_companies([{"cnpj": "11222333000181", "name": "A"}, {"cnpj": "06990590000123", "name": "C"}])
+    assert len(first) == 1
+    assert [c["cnpj"] for c in again] == ["06990590000123"]
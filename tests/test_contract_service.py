@@ -0,0 +1,62 @@
+import sys
+import os
+from unittest.mock import MagicMock, patch
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from services.contract_service import build_contract_data, regenerate_contract_pdfs, render_orders
+from services.storage import LocalContentStore
+
+def make_order(i, imei=None):
+    return {
+        "id": f"order-{i}",
+        "company_id": "company-1",
+        "signed_at": "2024-03-15T10:30:00",
+        "imei": imei,
+        "delivery_address": {"full": f"Rua {i}, 10 - Centro - CEP 01001000"},
+        "user_profiles": {"name": f"Func {i}", "cpf": f"{i:011d}", "email": None, "phone": "11999999999"},
+        "products": {"brand": "Samsung", "model": "Galaxy S23", "description": "128GB",
+                     "monthly_price": 100.0, "insurance_price": None, "residual_value": 300.0},
+        "companies": {"name": "Empresa Demo"},
+    }
+
+def test_build_contract_data():
+    contract_data, product_data, company_data = build_contract_data(make_order(1), imei="356938035643809")
+    assert contract_data["start_date"] == "15/03/2024"
+    assert contract_data["end_date"] == "15/12/2025"
+    assert contract_data["value_monthly_total"] == 100.0
+    assert contract_data["address"].startswith("Rua 1, 10")
+    assert product_data["imei"] == "356938035643809"
+    assert company_data == {"name": "Empresa Demo"}
+
+def test_parallel_render_matches_serial():
+    items = [build_contract_data(make_order(i, imei=f"35{i:013d}")) for i in range(30)]
+    serial = render_orders(items, parallel=False)
+    parallel = render_orders(items, parallel=True)
+    assert len(parallel) == 30
+    # Only the creation timestamp may differ between the two runs
+    assert [len(p) for p in parallel] == [len(s) for s in serial]
+
+def test_regenerate_contract_pdfs_manifest(tmp_path, monkeypatch):
+    monkeypatch.setattr("services.storage._storage", LocalContentStore(str(tmp_path)))
+    supabase = MagicMock()
+    bad = make_order(3)
+    bad["signed_at"] = None
+    supabase.table.return_value.select.return_value.in_.return_value.execute.return_value.data = [
+        make_order(1, imei="1"), make_order(2, imei="2"), bad
+    ]
+    with patch("services.repositories.get_supabase", return_value=supabase):
+        manifest = regenerate_contract_pdfs(["order-1", "order-2", "order-3", "order-4"], parallel=False)
+
+    assert supabase.table.return_value.select.return_value.in_.call_count == 1
+    assert manifest["order-3"] is None and manifest["order-4"] is None
+    assert os.path.exists(manifest["order-1"])
+    assert manifest["order-1"] != manifest["order-2"]
+    assert manifest["order-1"].startswith(str(tmp_path))
+
+    # Unchanged orders reuse the stored PDFs instead of rendering again
+    with patch("services.repositories.get_supabase", return_value=supabase), \
+         patch("services.contract_service.render_orders") as render:
+        again = regenerate_contract_pdfs(["order-1", "order-2"], parallel=False)
+    render.assert_called_once_with([], False)
+    assert again["order-1"] == manifest["order-1"]
@@ -0,0 +1,52 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+from services.documents import (
+    only_digits, normalize_cpf, normalize_cnpj, format_cnpj, is_valid_cpf, is_valid_cnpj, is_valid_imei, normalize_imei, imei_for_serial,
+    normalize_cpf_series, normalize_cnpj_series, valid_cpf_mask, valid_cnpj_mask
+)
+
+def test_normalize_scalar():
+    assert only_digits("123.456.789-09") == "12345678909"
+    assert only_digits(None) == ""
+    assert normalize_cpf("1234567890") == "01234567890"
+    assert normalize_cpf("123456789012") is None
+    assert normalize_cnpj("6.990.590/0001-23") == "06990590000123"
+    assert normalize_cnpj("") is None
+    assert format_cnpj("6990590000123") == "06.990.590/0001-23"
+    assert format_cnpj("") is None
+
+def test_check_digits_scalar():
+    assert is_valid_cpf("123.456.789-09")
+    assert is_valid_cpf("529.982.247-25")
+    assert not is_valid_cpf("123.456.789-00")
+    assert not is_valid_cpf("111.111.111-11")
+    assert is_valid_cnpj("06.990.590/0001-23")
+    assert is_valid_cnpj("11.222.333/0001-81")
+    assert not is_valid_cnpj("11.222.333/0001-80")
+    assert not is_valid_cnpj("00000000000000")
+
+def test_imei_luhn():
+    assert is_valid_imei("356938035643809")
+    assert is_valid_imei("35-693803-564380-9")
+    assert normalize_imei("35-693803-564380-9") == "356938035643809"
+    assert is_valid_imei(imei_for_serial(42)) and imei_for_serial(42) != imei_for_serial(43)
+    assert not is_valid_imei("356938035643808")
+    assert not is_valid_imei("35693803564380")
+    assert not is_valid_imei("000000000000000")
+
+def test_vectorized_matches_scalar():
+    raw = pd.Series(["123.456.789-09", "1234567890", "111.111.111-11", "abc", None, "529.982.247-25", "123.456.789-00"])
+    normalized = normalize_cpf_series(raw)
+    assert list(normalized.fillna("")) == [normalize_cpf(v) or "" for v in raw]
+    np.testing.assert_array_equal(valid_cpf_mask(normalized), [is_valid_cpf(v) for v in raw])
+
+    raw = pd.Series(["06.990.590/0001-23", "11222333000180", "", "11.222.333/0001-81"])
+    normalized = normalize_cnpj_series(raw)
+    np.testing.assert_array_equal(valid_cnpj_mask(normalized), [True, False, False, True])
+
+def test_vectorized_handles_empty_series():
+    assert valid_cpf_mask(pd.Series([], dtype=str)).size == 0
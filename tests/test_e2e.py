@@ -94,7 +94,7 @@ def test_03_purchase_flow(page: Page):
     page.goto(BASE_URL)
     time.sleep(2)
     
-    login_if_needed(page, "11122233344", "20/05/1995")
+    login_if_needed(page, "11122233396", "20/05/1995")
     
     # Should be in Store
     expect(page).to_have_title("Trek - Loja", timeout=15000)
@@ -0,0 +1,131 @@
+import sys
+import os
+import socket
+import socketserver
+import threading
+import time
+from unittest.mock import patch
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from services import email_service
+from services.email_service import SMTPPool, build_message
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    """Minimal SMTP server: accepts every message and records it."""
+    sessions = 0
+    messages = []
+    reject = set()
+
+    def reply(self, line):
+        self.wfile.write((line + "\r\n").encode())
+
+    def handle(self):
+        type(self).sessions += 1
+        self.reply("220 localhost ready")
+        rcpt = None
+        while True:
+            line = self.rfile.readline().decode().rstrip("\r\n")
+            if not line:
+                return
+            cmd = line[:4].upper()
+            if cmd in ("EHLO", "HELO"):
+                self.reply("250 localhost")
+            elif cmd == "MAIL" or cmd == "RSET" or cmd == "NOOP":
+                self.reply("250 OK")
+            elif cmd == "RCPT":
+                rcpt = line.split(":", 1)[1].strip("<> ")
+                if rcpt in type(self).reject:
+                    self.reply("550 No such user")
+                else:
+                    self.reply("250 OK")
+            elif cmd == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                while self.rfile.readline() not in (b".\r\n", b""):
+                    pass
+                type(self).messages.append(rcpt)
+                self.reply("250 Queued")
+            elif cmd == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Not implemented")
+
+@pytest.fixture
+def smtp_server():
+    SMTPHandler.sessions = 0
+    SMTPHandler.messages = []
+    SMTPHandler.reject = set()
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), SMTPHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield {"server": "127.0.0.1", "port": server.server_address[1], "starttls": False}
+    server.shutdown()
+    server.server_close()
+
+def make_messages(n):
+    return [build_message("noreply@trek.com.br", f"user{i}@empresa.com", "Assunto", "Corpo") for i in range(n)]
+
+def test_send_many_uses_one_session(smtp_server):
+    pool = SMTPPool(smtp_server)
+    results = pool.send_many(make_messages(50))
+    assert all(results) and len(results) == 50
+    assert len(SMTPHandler.messages) == 50
+    assert SMTPHandler.sessions == 1
+
+    # The session stays open for the next batch
+    assert pool.send(make_messages(1)[0])
+    assert SMTPHandler.sessions == 1
+    pool.close()
+
+def test_rejected_recipient_does_not_break_batch(smtp_server):
+    SMTPHandler.reject = {"user1@empresa.com"}
+    pool = SMTPPool(smtp_server)
+    assert list(map(bool, pool.send_many(make_messages(3)))) == [True, False, True]
+    assert SMTPHandler.sessions == 1
+    pool.close()
+
+def test_idle_session_is_replaced(smtp_server):
+    pool = SMTPPool(smtp_server, idle_timeout=0.05)
+    pool.send(make_messages(1)[0])
+    time.sleep(0.1)
+    pool.send(make_messages(1)[0])
+    assert SMTPHandler.sessions == 2
+    pool.close()
+
+def test_dropped_session_reconnects(smtp_server):
+    pool = SMTPPool(smtp_server)
+    pool.send(make_messages(1)[0])
+    # Server closed the connection behind our back
+    pool._idle[0][0].sock.shutdown(socket.SHUT_RDWR)
+    assert pool.send(make_messages(1)[0])
+    assert pool.connects == 2
+    pool.close()
+
+def test_unreachable_server_fails_batch_after_one_attempt():
+    attempts = []
+    def factory(*args, **kwargs):
+        attempts.append(args)
+        raise ConnectionRefusedError("connection refused")
+
+    pool = SMTPPool({"server": "127.0.0.1", "port": 1}, factory=factory)
+    results = pool.send_many(make_messages(5))
+    assert not any(results)
+    assert results[4].error == "ConnectionRefusedError: connection refused"
+    assert len(attempts) == 1 and pool.connects == 0
+
+def test_send_email_through_pool(smtp_server, monkeypatch):
+    monkeypatch.setattr(email_service, "_pool", None)
+    with patch('services.email_service.st') as mock_st:
+        mock_st.secrets = {"smtp": smtp_server}
+        results = email_service.send_many([
+            {"to_email": "a@empresa.com", "subject": "S", "body": "B"},
+            {"to_email": None, "subject": "S", "body": "B"},
+            {"to_email": "b@empresa.com", "subject": "S", "body": "B"},
+        ])
+        assert email_service.send_email("c@empresa.com", "S", "B")
+    assert list(map(bool, results)) == [True, False, True]
+    assert results[1].error == "No recipient"
+    assert SMTPHandler.sessions == 1
+    email_service._pool.close()
@@ -0,0 +1,139 @@
+import sys
+import os
+from unittest.mock import MagicMock, patch
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pandas as pd
+import pytest
+from services.employee_import import prepare_employees, import_employees
+from services.documents import cpf_check_digits
+from services.sqlite_backend import SEED_COMPANY_ID as COMPANY_ID
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+def make_cpf(n):
+    base = f"{n + 1000:09d}"
+    return base + cpf_check_digits(base)
+
+def roster():
+    return pd.DataFrame({
+        "nome ": ["Ana", "Bruno", "", "Carla", "Ana Souza", "Davi"],
+        "CPF": ["123.456.789-09", "1234567890", "11144477735", "529.982.247-25", "12345678909", "123.456.789-00"],
+        "EMAIL": ["ANA@X.COM ", "bruno@x.com", "x@x.com", "carla-at-x", "ana@x.com", ""],
+    })
+
+def test_prepare_employees_normalizes_and_reports():
+    valid, errors = prepare_employees(roster())
+
+    assert list(valid["cpf"]) == ["01234567890", "12345678909"]
+    assert list(valid["name"]) == ["Bruno", "Ana Souza"]
+    assert list(valid["email"]) == ["bruno@x.com", "ana@x.com"]
+
+    by_row = {e["row"]: e["error"] for e in errors}
+    assert by_row == {
+        2: "CPF duplicado no arquivo",
+        4: "Nome vazio",
+        5: "E-mail inválido",
+        7: "CPF inválido",
+    }
+
+def test_example_roster_imports(db):
+    df = pd.read_csv(os.path.join(ROOT, "funcionarios_exemplo.csv"), dtype=str)
+    with patch("services.repositories.get_supabase", return_value=db):
+        report = import_employees([df], COMPANY_ID, "funcionarios_exemplo.csv")
+    assert (report["imported"], report["errors"]) == (4, [])
+    # João Silva is the seed employee: updated in place, not duplicated
+    joao, = db.table("user_profiles").select("email, birth_date").eq("cpf", "11122233396").execute().data
+    assert joao == {"email": "joao@empresa.com.br", "birth_date": "1995-05-20"}
+
+def test_prepare_employees_requires_columns():
+    with pytest.raises(ValueError):
+        prepare_employees(pd.DataFrame({"Nome": ["A"], "CPF": ["1"]}))
+
+def test_import_employees_upserts_in_chunks():
+    supabase = MagicMock()
+    df = pd.DataFrame({
+        "Nome": [f"Func {i}" for i in range(1200)],
+        "CPF": [make_cpf(i) for i in range(1200)],
+        "Email": [f"f{i}@empresa.com" for i in range(1200)],
+    })
+    with patch("services.repositories.get_supabase", return_value=supabase):
+        report = import_employees([df], "company-1", "roster.csv", chunk_size=500)
+
+    assert report == {"total": 1200, "imported": 1200, "errors": []}
+    upserts = supabase.table.return_value.upsert.call_args_list
+    assert [len(call.args[0]) for call in upserts] == [500, 500, 200]
+    assert upserts[0].kwargs["on_conflict"] == "cpf"
+    assert upserts[0].args[0][0] == {
+        "name": "Func 0", "cpf": make_cpf(0), "email": "f0@empresa.com",
+        "company_id": "company-1", "active": True
+    }
+    supabase.table.return_value.insert.assert_called_once_with(
+        {"company_id": "company-1", "filename": "roster.csv", "type": "admissao"}, returning="minimal"
+    )
+
+def test_import_employees_reports_failed_chunk():
+    supabase = MagicMock()
+    supabase.table.return_value.upsert.return_value.execute.side_effect = [None, Exception("timeout")]
+    df = pd.DataFrame({
+        "Nome": ["A", "B", "C"],
+        "CPF": [make_cpf(1), make_cpf(2), make_cpf(3)],
+        "Email": ["", "", ""],
+    })
+    with patch("services.repositories.get_supabase", return_value=supabase):
+        report = import_employees([df], "company-1", "roster.csv", chunk_size=2)
+
+    assert report["imported"] == 2
+    assert [e["row"] for e in report["errors"]] == [4]
+    assert "timeout" in report["errors"][0]["error"]
+
+def test_import_employees_dedupes_across_batches():
+    supabase = MagicMock()
+    first = pd.DataFrame({"Nome": ["A", "B"], "CPF": [make_cpf(1), make_cpf(2)], "Email": ["", ""]})
+    second = pd.DataFrame({"Nome": ["A2"], "CPF": [make_cpf(1)], "Email": [""]})
+    with patch("services.repositories.get_supabase", return_value=supabase):
+        report = import_employees(iter([first, second]), "company-1", "roster.csv")
+
+    assert report["total"] == 3
+    assert report["imported"] == 2
+    assert report["errors"] == [{"row": 2, "cpf": make_cpf(1), "error": "CPF duplicado no arquivo"}]
+
+def test_import_employees_leaves_foreign_profiles_and_emails(db):
+    company, other = COMPANY_ID, "00000000-0000-0000-0000-000000000002"
+    db.table("companies").insert({"id": other, "cnpj": "11.222.333/0001-81", "name": "Outra"}).execute()
+    db.table("user_profiles").insert([
+        {"company_id": company, "name": "Ana", "cpf": make_cpf(1), "email": "ana@x.com", "role": "employee", "active": False},
+        {"company_id": company, "name": "Expedição", "cpf": make_cpf(2), "role": "dispatch"},
+        {"company_id": other, "name": "Bia", "cpf": make_cpf(3), "role": "employee"},
+    ]).execute()
+    df = pd.DataFrame({
+        "Nome": ["Ana Souza", "X", "Y", "Novo"],
+        "CPF": [make_cpf(1), make_cpf(2), make_cpf(3), make_cpf(4)],
+        "Email": ["", "x@x.com", "y@x.com", ""],
+    })
+    with patch("services.repositories.get_supabase", return_value=db):
+        report = import_employees([df], company, "roster.csv")
+
+    assert report["imported"] == 2
+    assert {e["row"]: e["error"] for e in report["errors"]} == {
+        3: "CPF pertence a um usuário que não é funcionário",
+        4: "CPF pertence a funcionário de outra empresa",
+    }
+    profiles = {p["cpf"]: p for p in db.table("user_profiles").select("*").execute().data}
+    assert (profiles[make_cpf(1)]["name"], profiles[make_cpf(1)]["email"]) == ("Ana Souza", "ana@x.com")
+    assert profiles[make_cpf(1)]["active"]
+    assert (profiles[make_cpf(2)]["role"], profiles[make_cpf(2)]["email"]) == ("dispatch", None)
+    assert profiles[make_cpf(3)]["company_id"] == other
+    assert profiles[make_cpf(4)]["role"] == "employee"
+
+def test_import_employees_counts_only_stored_duplicates():
+    supabase = MagicMock()
+    # The first batch fails; the CPF's later occurrence is the one stored
+    supabase.table.return_value.upsert.return_value.execute.side_effect = [Exception("timeout"), None]
+    first = pd.DataFrame({"Nome": ["A"], "CPF": [make_cpf(1)], "Email": [""]})
+    second = pd.DataFrame({"Nome": ["A2"], "CPF": [make_cpf(1)], "Email": [""]})
+    with patch("services.repositories.get_supabase", return_value=supabase):
+        report = import_employees(iter([first, second]), "company-1", "roster.csv")
+
+    assert report["imported"] == 1
+    assert [(e["row"], e["error"]) for e in report["errors"]] == [(2, "Falha ao gravar: timeout")]
@@ -1,8 +1,6 @@
 import sys
 import os
-import toml
 import pytest
-from supabase import create_client
 import datetime
 from dateutil.relativedelta import relativedelta
 import time
@@ -12,17 +10,18 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from services.auth_service import login_by_cpf
 from services.pdf_service import generate_contract_pdf
-
-SECRETS_PATH = os.path.join(os.path.dirname(__file__), '..', 'secrets.toml')
+from services.sqlite_backend import SQLiteClient
+from services.storage import LocalContentStore
+from services.supabase_client import SupabaseService
 
 @pytest.fixture
-def supabase():
-    if not os.path.exists(SECRETS_PATH):
-        pytest.skip("Supabase credentials not found.")
-    secrets = toml.load(SECRETS_PATH)
-    url = secrets["supabase"]["url"]
-    key = secrets["supabase"]["key"]
-    return create_client(url, key)
+def supabase(monkeypatch, tmp_path):
+    # The whole flow runs against the embedded SQLite backend
+    client = SQLiteClient()
+    monkeypatch.setattr(SupabaseService(), "_client", client)
+    monkeypatch.setattr("services.storage._storage", LocalContentStore(str(tmp_path)))
+    yield client
+    client.close()
 
 @pytest.fixture
 def test_data(supabase):
@@ -0,0 +1,71 @@
+import sys
+import os
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from services import http_client
+
+class FlakyHandler(BaseHTTPRequestHandler):
+    """Fails with 503 for the first `failures` requests, then answers 200."""
+    failures = 0
+    calls = 0
+
+    def do_GET(self):
+        type(self).calls += 1
+        if type(self).calls <= type(self).failures:
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = json.dumps({"path": self.path}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setattr(http_client, "BACKOFF_FACTOR", 0.01)
+    http_client.reset_session()
+    http_client.reset_metrics()
+    FlakyHandler.failures = 0
+    FlakyHandler.calls = 0
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), FlakyHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    http_client.reset_session()
+
+def test_session_is_shared():
+    assert http_client.get_session() is http_client.get_session()
+
+def test_get_retries_transient_errors(server):
+    FlakyHandler.failures = 2
+    response = http_client.get(f"{server}/cep/v2/01001000", endpoint="test")
+    assert response.status_code == 200
+    assert response.json()["path"] == "/cep/v2/01001000"
+    assert FlakyHandler.calls == 3
+
+def test_get_gives_up_after_max_retries(server):
+    FlakyHandler.failures = 100
+    response = http_client.get(f"{server}/x", endpoint="test")
+    assert response.status_code == 503
+    assert FlakyHandler.calls == http_client.MAX_RETRIES + 1
+    assert http_client.get_metrics()["test"]["errors"] == 1
+
+def test_metrics_per_endpoint(server):
+    http_client.get(f"{server}/a", endpoint="a")
+    http_client.get(f"{server}/a", endpoint="a")
+    http_client.get(f"{server}/b", endpoint="b")
+    metrics = http_client.get_metrics()
+    assert metrics["a"]["count"] == 2
+    assert metrics["b"]["count"] == 1
+    assert metrics["a"]["max_time"] >= metrics["a"]["avg_time"] > 0
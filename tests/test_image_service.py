@@ -0,0 +1,133 @@
+import sys
+import os
+import io
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+import requests
+from PIL import Image
+from services import http_client, image_service
+
+def make_png(width=1200, height=900):
+    out = io.BytesIO()
+    Image.new("RGB", (width, height), (200, 30, 30)).save(out, "PNG")
+    return out.getvalue()
+
+class ImageHandler(BaseHTTPRequestHandler):
+    """Serves a PNG on /<name>.png and counts requests."""
+    calls = 0
+    body = make_png()
+
+    def do_GET(self):
+        type(self).calls += 1
+        if not self.path.endswith(".png"):
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "image/png")
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    monkeypatch.setattr(image_service, "THUMB_DIR", str(tmp_path))
+    monkeypatch.setattr(image_service, "_cache_bytes", {})
+    image_service._memory_cache.clear()
+    ImageHandler.calls = 0
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), ImageHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+def test_thumbnails_are_resized_and_fetched_once(server):
+    url = f"{server}/phone.png"
+    card = image_service.get_thumbnail(url, image_service.CARD_WIDTH)
+    with Image.open(io.BytesIO(card)) as img:
+        assert img.format == image_service.FORMAT
+        assert img.size == (image_service.CARD_WIDTH, 360)
+    assert len(card) < len(ImageHandler.body)
+
+    # Other sizes were produced from the same download, and survive a
+    # cleared memory cache (served from disk)
+    image_service._memory_cache.clear()
+    logo = image_service.get_thumbnail(url, image_service.LOGO_WIDTH)
+    with Image.open(io.BytesIO(logo)) as img:
+        assert img.width == image_service.LOGO_WIDTH
+    assert ImageHandler.calls == 1
+
+def test_small_images_are_not_upscaled(server):
+    ImageHandler.body = make_png(100, 50)
+    try:
+        thumb = image_service.get_thumbnail(f"{server}/small.png", image_service.CARD_WIDTH)
+    finally:
+        ImageHandler.body = make_png()
+    with Image.open(io.BytesIO(thumb)) as img:
+        assert img.size == (100, 50)
+
+def test_broken_url_falls_back_and_is_not_retried(server):
+    url = f"{server}/missing.jpg"
+    assert image_service.image_source(url) == url
+    image_service.warm_thumbnail(url).result(timeout=10)
+    assert image_service.image_source(url) == url
+    assert ImageHandler.calls == 1
+    assert image_service.image_source(None, fallback="placeholder") == "placeholder"
+
+def test_failed_fetches_release_their_connections(server):
+    http_client.reset_session()
+    errors = []
+    def fetch_all():
+        for i in range(http_client.POOL_MAXSIZE + 2):
+            try:
+                image_service._fetch(f"{server}/missing-{i}.jpg")
+            except requests.HTTPError as e:
+                errors.append(e)
+    worker = threading.Thread(target=fetch_all, daemon=True)
+    worker.start()
+    worker.join(timeout=30)
+    # A leaked connection per failure would block the pool's 11th checkout
+    assert not worker.is_alive()
+    assert len(errors) == http_client.POOL_MAXSIZE + 2
+
+def test_image_source_never_downloads_in_the_rerun(server):
+    url = f"{server}/phone.png"
+    assert image_service.image_source(url, image_service.CARD_WIDTH) == url
+    image_service.warm_thumbnail(url).result(timeout=10)
+    thumb = image_service.image_source(url, image_service.CARD_WIDTH)
+    assert isinstance(thumb, bytes) and len(thumb) < len(ImageHandler.body)
+    assert ImageHandler.calls == 1
+
+def test_cache_size_is_tracked_without_rescanning(server, monkeypatch):
+    walks = []
+    entries = image_service._entries
+    monkeypatch.setattr(image_service, "_entries", lambda: walks.append(1) or entries())
+    for name in ("a", "b", "c"):
+        image_service.get_thumbnail(f"{server}/{name}.png")
+    assert len(walks) == 1
+
+    # Over the limit: one walk evicts and re-measures
+    monkeypatch.setattr(image_service, "MAX_CACHE_BYTES", image_service._cache_bytes[image_service.THUMB_DIR])
+    image_service.get_thumbnail(f"{server}/d.png")
+    assert len(walks) == 2
+    assert image_service._cache_bytes[image_service.THUMB_DIR] <= image_service.MAX_CACHE_BYTES
+
+def test_cache_limit_evicts_least_recently_used(server, tmp_path):
+    image_service.get_thumbnail(f"{server}/a.png")
+    image_service.get_thumbnail(f"{server}/b.png")
+    a_path = image_service._thumb_path(image_service._key(f"{server}/a.png"), image_service.CARD_WIDTH)
+    b_path = image_service._thumb_path(image_service._key(f"{server}/b.png"), image_service.CARD_WIDTH)
+    os.utime(a_path, (1, 1))
+
+    sizes = sum(os.path.getsize(os.path.join(r, f)) for r, _, fs in os.walk(tmp_path) for f in fs)
+    image_service.enforce_cache_limit(sizes - 1)
+    assert not os.path.exists(a_path)
+    assert os.path.exists(b_path)
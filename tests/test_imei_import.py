@@ -0,0 +1,119 @@
+import sys
+import os
+import io
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pandas as pd
+import pytest
+from streamlit.testing.v1 import AppTest
+from services.documents import imei_for_serial
+from services.imei_import import parse_scanned, read_links, prepare_links, link_imei_batch
+from services.repositories import OrderRepository
+from services.upload_reader import iter_batches
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+@pytest.fixture
+def db(db, monkeypatch):
+    """Linking queues the employee's notice; keep the worker from sending it."""
+    monkeypatch.setattr("services.outbox.ensure_worker", lambda: None)
+    db.table("user_profiles").update({"email": "joao@x.com"}).eq("role", "employee").execute()
+    return db
+
+def test_parse_scanned_and_read_links():
+    df = parse_scanned("order_id;imei\n\n1a2b3c4d, 356938035643809\nabc\t35-693803-564380-9\n356938035643809\n")
+    assert df.to_dict("records") == [
+        {"row": 3, "order_id": "1a2b3c4d", "imei": "356938035643809"},
+        {"row": 4, "order_id": "abc", "imei": "35-693803-564380-9"},
+        {"row": 5, "order_id": "", "imei": "356938035643809"},
+    ]
+
+    csv = io.BytesIO(b"Pedido,IMEI\n1a2b3c4d,356938035643809\nffff0000,356938035643808\n")
+    df = read_links(iter_batches(csv, "imeis.csv", batch_size=1))
+    assert list(df["row"]) == [2, 3]
+    assert list(df["order_id"]) == ["1a2b3c4d", "ffff0000"]
+
+    with pytest.raises(ValueError):
+        read_links([pd.DataFrame({"Pedido": ["x"]})])
+
+def test_prepare_links_reports_every_problem(db, add_orders):
+    orders = add_orders(5)
+    OrderRepository(db).update(orders[4]["id"], {"imei": imei_for_serial(99)})
+    pending = orders[:4]
+    df = pd.DataFrame({
+        "row": range(1, 8),
+        "order_id": [
+            orders[0]["id"], "#" + orders[1]["id"][:8].upper(), orders[2]["id"], orders[3]["id"],
+            orders[3]["id"], "deadbeef", orders[2]["id"][:4],
+        ],
+        "imei": [imei_for_serial(1), imei_for_serial(2), "356938035643808", imei_for_serial(99), imei_for_serial(3), imei_for_serial(4), imei_for_serial(5)],
+    })
+    valid, errors = prepare_links(df, pending)
+
+    assert [(v["row"], v["order_id"]) for v in valid] == [(1, orders[0]["id"]), (2, orders[1]["id"])]
+    assert [(e["row"], e["error"]) for e in errors] == [
+        (3, "IMEI inválido"),
+        (4, "Pedido duplicado no arquivo"),
+        (5, "Pedido duplicado no arquivo"),
+        (6, "Pedido não encontrado ou não aguarda IMEI"),
+        (7, "Pedido não encontrado ou não aguarda IMEI"),
+    ]
+
+    df = pd.DataFrame({"row": [1, 2, 3], "order_id": [o["id"] for o in orders[:3]], "imei": [imei_for_serial(7), imei_for_serial(7), imei_for_serial(99)]})
+    _, errors = prepare_links(df, pending)
+    assert [e["error"] for e in errors] == [
+        "IMEI duplicado no arquivo", "IMEI duplicado no arquivo", f"IMEI já vinculado ao pedido #{orders[4]['id'][:8]}"
+    ]
+
+def test_link_imei_batch_single_round_trip(db, add_orders):
+    orders = add_orders(300)
+    df = pd.DataFrame({"row": range(2, 302), "order_id": [o["id"] for o in orders], "imei": [imei_for_serial(i) for i in range(300)]})
+
+    # An order dispatched by someone else after the queue was loaded
+    OrderRepository(db).update(orders[0]["id"], {"status": "cancelled"})
+
+    calls = []
+    original = db.rpc
+    db.rpc = lambda name, *args, **kwargs: calls.append(name) or original(name, *args, **kwargs)
+    report = link_imei_batch(df, orders)
+
+    assert calls == ["link_imeis"]
+    assert report["linked"] == 299 and report["notified"] == 299
+    assert report["errors"] == [{"row": 2, "order_id": orders[0]["id"], "imei": imei_for_serial(0),
+                                 "error": "Pedido ou IMEI alterado por outro usuário"}]
+    linked = db.table("orders").select("imei", count="exact").eq("status", "imei_linked").execute()
+    assert linked.count == 299
+    outbox = db.table("email_outbox").select("to_email, body").execute().data
+    assert len(outbox) == 299
+    assert any(imei_for_serial(1) in o["body"] for o in outbox)
+
+def test_link_imeis_skips_conflicting_pairs(db, add_orders):
+    orders = sorted(add_orders(4), key=lambda o: o["id"])
+    # Linked by another dispatcher after the batch was validated
+    OrderRepository(db).update(orders[0]["id"], {"imei": imei_for_serial(0), "status": "imei_linked"})
+    links = [
+        {"order_id": orders[3]["id"], "imei": imei_for_serial(7)},
+        {"order_id": orders[1]["id"], "imei": imei_for_serial(0)},  # in use
+        {"order_id": orders[2]["id"], "imei": imei_for_serial(7)},  # repeated: lower order id wins
+    ]
+    linked = OrderRepository(db).link_imeis(links)
+    assert [(o["id"], o["imei"]) for o in linked] == [(orders[2]["id"], imei_for_serial(7))]
+
+def test_dispatch_page_batch_mode(db, add_orders):
+    orders = add_orders(2)
+    db.table("products").update({"image_url": None}).neq("brand", "").execute()
+
+    at = AppTest.from_file(os.path.join(ROOT, "pages", "4_Dispatch.py"), default_timeout=30)
+    at.session_state["logged_in"] = True
+    at.session_state["role"] = "dispatch"
+    at.session_state["user"] = {"name": "Expedição", "role": "dispatch"}
+    at.run()
+    at.text_area(key="imei_scan").input(
+        f"{orders[0]['id'][:8]}, {imei_for_serial(1)}\n{orders[1]['id'][:8]}, 356938035643808"
+    ).run()
+    at.button[0].click().run()
+
+    assert not at.exception
+    assert "1 de 2 IMEIs vinculados" in at.success[0].value
+    assert at.text_area(key="imei_scan").value == ""
+    assert db.table("orders").select("status").eq("id", orders[0]["id"]).execute().data == [{"status": "imei_linked"}]
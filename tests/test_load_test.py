@@ -0,0 +1,28 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'benchmarks')))
+
+import pytest
+import load_test
+
+def test_percentile():
+    values = list(range(1, 101))
+    assert load_test.percentile(values, 50) == 50
+    assert load_test.percentile(values, 99) == 99
+    assert load_test.percentile([7], 95) == 7
+
+def test_concurrent_sessions_sign_up_and_get_dispatched():
+    report = load_test.run_load_test(sessions=3, concurrency=3, dispatchers=2)
+
+    assert report["errors"] == []
+    assert report["orders"] == {"dispatched": 3}
+    assert set(report["pages"]) == {"Login", "Store", "Contract", "Dispatch"}
+    assert report["pages"]["Contract"]["reruns"] == 3 * 4
+    assert report["emails"]["sent"] == 3 * 3
+    assert report["memory"]["peak_mb"] >= report["memory"]["start_mb"] > 0
+
+def test_other_streamlit_versions_fail_fast(monkeypatch):
+    monkeypatch.setattr(load_test.streamlit, "__version__", "0.0.1")
+    with pytest.raises(RuntimeError, match="streamlit=="):
+        with load_test.shared_runtime():
+            pass
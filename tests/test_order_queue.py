@@ -0,0 +1,123 @@
+import sys
+import os
+import datetime
+from unittest.mock import MagicMock, patch
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from services import order_queue
+from services.order_queue import fetch_order_page, QUEUE_COLUMNS, DispatchQueue
+from services.repositories import OrderRepository
+
+class RecordingQuery:
+    """Query builder stand-in recording each chained call."""
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = []
+
+    def __getattr__(self, name):
+        def method(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+            return self
+        return method
+
+    def execute(self):
+        return MagicMock(data=self.rows)
+
+def make_rows(n):
+    return [{"id": f"id-{i}", "created_at": f"2024-01-{30 - i:02d}T10:00:00+00:00", "status": "dispatched"} for i in range(n)]
+
+def run(rows, **kwargs):
+    query = RecordingQuery(rows)
+    supabase = MagicMock()
+    supabase.table.return_value = query
+    with patch("services.repositories.get_supabase", return_value=supabase):
+        result = fetch_order_page(**kwargs)
+    return result, query.calls
+
+def test_first_page_projects_columns_and_orders_by_key():
+    (orders, cursor), calls = run(make_rows(3), page_size=2)
+    assert calls[0] == ("select", (QUEUE_COLUMNS,), {})
+    assert ("order", ("created_at",), {"desc": True}) in calls
+    assert ("order", ("id",), {"desc": True}) in calls
+    assert ("limit", (3,), {}) in calls
+    assert [o["id"] for o in orders] == ["id-0", "id-1"]
+    assert cursor == ("2024-01-29T10:00:00+00:00", "id-1")
+
+def test_last_page_has_no_cursor():
+    (orders, cursor), calls = run(make_rows(2), page_size=2)
+    assert len(orders) == 2 and cursor is None
+    assert not any(name == "or_" for name, _, _ in calls)
+
+def test_cursor_and_filters_are_server_side():
+    cursor = ("2024-01-29T10:00:00.5+00:00", "id-1")
+    _, calls = run([], cursor=cursor, status=["dispatched"], company_id="c1",
+                   date_from=datetime.date(2024, 1, 1), date_to=datetime.date(2024, 1, 31))
+    assert ("in_", ("status", ["dispatched"]), {}) in calls
+    assert ("eq", ("company_id", "c1"), {}) in calls
+    assert ("gte", ("created_at", "2024-01-01"), {}) in calls
+    assert ("lt", ("created_at", "2024-02-01"), {}) in calls
+    (filter_arg,), = [args for name, args, _ in calls if name == "or_"]
+    assert filter_arg == (
+        'created_at.lt."2024-01-29T10:00:00.5+00:00",'
+        'and(created_at.eq."2024-01-29T10:00:00.5+00:00",id.lt.id-1)'
+    )
+
+def stamped_orders(add_orders, n):
+    """`n` orders last updated a minute apart, long ago."""
+    return add_orders(n, updated_at=[f"2024-05-10T10:{i:02d}:00+00:00" for i in range(n)])
+
+def test_updates_bump_updated_at(db, add_orders):
+    order, = stamped_orders(add_orders, 1)
+    OrderRepository(db).update(order["id"], {"status": "imei_linked", "imei": "356938035643809"})
+    row, = db.table("orders").select("updated_at").eq("id", order["id"]).execute().data
+    assert row["updated_at"] > "2024-05-10T10:00:00+00:00"
+
+def test_dispatch_queue_fetches_only_changes(db, add_orders):
+    backlog = stamped_orders(add_orders, 50)
+    queue = DispatchQueue()
+    assert len(queue.refresh()) == 50
+
+    orders = OrderRepository(db)
+    orders.update(backlog[0]["id"], {"status": "imei_linked", "imei": "356938035643809"})
+    orders.update(backlog[1]["id"], {"status": "cancelled"})
+    new, = add_orders(updated_at=order_queue._now().isoformat())
+
+    fetched, original = [], OrderRepository.changed_since
+    def changed_since(self, since):
+        fetched.extend(original(self, since))
+        return fetched
+
+    with patch.object(OrderRepository, "for_dispatch") as full, \
+         patch.object(OrderRepository, "changed_since", changed_since):
+        snapshot = queue.refresh()
+    full.assert_not_called()
+    # The three changes plus the newest backlog order, inside the overlap window
+    assert len(fetched) == 4
+    ids = [o["id"] for o in snapshot]
+    assert len(ids) == 50
+    assert backlog[1]["id"] not in ids and new["id"] in ids
+    assert queue.orders[backlog[0]["id"]]["status"] == "imei_linked"
+
+def test_dispatch_queue_reloads_periodically(db, add_orders):
+    stamped_orders(add_orders, 2)
+    queue = DispatchQueue()
+    queue.refresh()
+    later = order_queue._now() + order_queue.FULL_REFRESH_INTERVAL
+    with patch("services.order_queue._now", return_value=later), \
+         patch.object(OrderRepository, "for_dispatch", return_value=[]) as full:
+        assert queue.refresh() == []
+    full.assert_called_once()
+
+
+def test_dispatch_queue_watermark_covers_orders_out_of_the_queue(db, add_orders):
+    stamped_orders(add_orders, 30)
+    add_orders(status="dispatched", updated_at=order_queue._now().isoformat())
+    queue = DispatchQueue()
+    assert len(queue.refresh()) == 30
+
+    with patch.object(OrderRepository, "changed_since", return_value=[]) as delta:
+        queue.refresh()
+    # Starting from the pending orders' stamps would fetch the whole backlog again
+    since, = delta.call_args.args
+    assert since > "2024-05-10T10:29:00+00:00"
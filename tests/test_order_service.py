@@ -0,0 +1,92 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from services import order_service
+from services.contract_service import contract_pdfs_for_orders, regenerate_contract_pdfs
+from services.order_service import TransitionError
+from services.storage import MemoryStorage
+from services.sqlite_backend import SEED_COMPANY_ID as COMPANY_ID
+
+@pytest.fixture
+def add_order(add_orders):
+    """Factory for a signed order with a delivery address."""
+    def add():
+        order, = add_orders(signed_at="2024-05-10T10:00:00+00:00",
+                            delivery_address={"full": "Praça da Sé, 1 - Sé - CEP 01001-000"})
+        return order
+    return add
+
+def test_allowed_actions():
+    assert order_service.allowed("contract_signed") == ["link_imei", "cancel"]
+    assert order_service.allowed("imei_linked") == ["dispatch", "cancel"]
+    assert order_service.allowed("dispatched") == ["return"]
+    assert order_service.allowed("returned") == []
+
+def test_full_lifecycle_returns_joined_payload(add_order, monkeypatch):
+    order = add_order()
+    linked = order_service.link_imei(order["id"], " 356938035643809 ")
+    assert (linked["status"], linked["imei"]) == ("imei_linked", "356938035643809")
+    assert linked["user_profiles"]["cpf"] == "11122233396"
+    assert linked["products"]["brand"] == "Apple"
+    assert linked["companies"]["id"] == COMPANY_ID
+
+    dispatched = order_service.dispatch(order["id"])
+    assert dispatched["status"] == "dispatched"
+    # The payload is enough to rebuild the addendum without another query
+    monkeypatch.setattr("services.storage._storage", MemoryStorage())
+    assert contract_pdfs_for_orders([dispatched])[order["id"]]
+
+    assert order_service.return_order(order["id"])["status"] == "returned"
+
+def test_regenerated_addendum_is_stored_on_the_order(db, add_order, monkeypatch):
+    monkeypatch.setattr("services.storage._storage", MemoryStorage())
+    order = add_order()
+    first = regenerate_contract_pdfs([order["id"]])[order["id"]]
+    dispatched = order_service.dispatch(order["id"], imei="356938035643809")
+    second = contract_pdfs_for_orders([dispatched])[order["id"]]
+
+    # The IMEI changes the fingerprint, so the addendum moves
+    assert first and second and second != first
+    stored, = db.table("orders").select("contract_url").eq("id", order["id"]).execute().data
+    assert stored["contract_url"] == second
+    assert regenerate_contract_pdfs([order["id"]]) == {order["id"]: second}
+
+def test_dispatch_with_imei_links_and_ships(add_order):
+    order = add_order()
+    assert order_service.dispatch(order["id"], imei="356938035643809")["status"] == "dispatched"
+
+def test_rejected_transitions(add_order):
+    order = add_order()
+    with pytest.raises(TransitionError):
+        order_service.dispatch(order["id"])   # no IMEI yet
+    with pytest.raises(ValueError):
+        order_service.link_imei(order["id"], "  ")
+    # The batch import's rule: 15 digits and a valid check digit
+    for imei in ("IMEI-123", "356938035643808", "111111111111111"):
+        with pytest.raises(TransitionError, match="IMEI inválido"):
+            order_service.link_imei(order["id"], imei)
+    assert order_service.link_imei(order["id"], "35-693803-564380-9")["imei"] == "356938035643809"
+    order_service.cancel(order["id"])
+    order = add_order()
+    with pytest.raises(TransitionError, match="não encontrado"):
+        order_service.cancel("00000000-0000-0000-0000-00000000ffff")
+
+    order_service.link_imei(order["id"], "356938035643809")
+    order_service.dispatch(order["id"])
+    # A second dispatcher acting on the stale queue
+    with pytest.raises(TransitionError):
+        order_service.dispatch(order["id"])
+    with pytest.raises(TransitionError):
+        order_service.cancel(order["id"])
+
+def test_imei_is_unique_among_active_orders(add_order):
+    first, second, third = add_order(), add_order(), add_order()
+    order_service.link_imei(first["id"], "356938035643809")
+    with pytest.raises(TransitionError, match="IMEI"):
+        order_service.link_imei(second["id"], "356938035643809")
+
+    # Cancelling frees the device
+    order_service.cancel(first["id"])
+    assert order_service.link_imei(third["id"], "356938035643809")["status"] == "imei_linked"
@@ -0,0 +1,98 @@
+import sys
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from services import outbox
+from services.email_service import Delivery
+
+def make_row(i, attempts=1, age=10):
+    created = datetime.now(timezone.utc) - timedelta(seconds=age)
+    return {"id": f"msg-{i}", "to_email": f"user{i}@empresa.com", "subject": "S", "body": "B",
+            "attachment_path": None, "attempts": attempts, "created_at": created.isoformat()}
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    outbox.reset_metrics()
+    yield
+    outbox.stop_worker()
+
+def updates(supabase):
+    """Payloads of every update issued on email_outbox, in order."""
+    return [call.args[0] for call in supabase.table.return_value.update.call_args_list]
+
+def test_enqueue_is_a_single_insert():
+    supabase = MagicMock()
+    with patch("services.repositories.get_supabase", return_value=supabase), \
+         patch("services.outbox.ensure_worker") as ensure:
+        assert outbox.enqueue_email("a@empresa.com", "S", "B")
+        assert not outbox.enqueue_email(None, "S", "B")
+    supabase.table.assert_called_once_with("email_outbox")
+    payload = supabase.table.return_value.insert.call_args.args[0]
+    assert payload["to_email"] == "a@empresa.com"
+    ensure.assert_called_once()
+
+def test_enqueue_failure_is_reported():
+    supabase = MagicMock()
+    supabase.table.return_value.insert.return_value.execute.side_effect = Exception("offline")
+    with patch("services.repositories.get_supabase", return_value=supabase):
+        assert outbox.enqueue_email("a@empresa.com", "S", "B") is False
+
+def test_process_batch_marks_sent_retries_and_dead_letters():
+    supabase = MagicMock()
+    supabase.rpc.return_value.execute.return_value.data = [
+        make_row(1), make_row(2, attempts=2), make_row(3, attempts=outbox.MAX_ATTEMPTS)
+    ]
+    with patch("services.repositories.get_supabase", return_value=supabase), \
+         patch("services.outbox.email_service.send_many",
+               return_value=[Delivery(), Delivery("SMTPDataError: quota"), Delivery("SMTPRecipientsRefused: x")]):
+        counts = outbox.process_batch()
+
+    assert counts == {"sent": 1, "retried": 1, "dead": 1}
+    supabase.rpc.assert_called_once_with("claim_email_outbox", {"p_limit": outbox.BATCH_SIZE, "p_lease_seconds": outbox.LEASE_SECONDS})
+    sent, retried, dead = updates(supabase)
+    assert sent["status"] == "sent"
+    supabase.table.return_value.update.return_value.in_.assert_called_once_with("id", ["msg-1"])
+    assert retried["status"] == "pending" and retried["last_error"] == "SMTPDataError: quota"
+    next_attempt = datetime.fromisoformat(retried["next_attempt_at"])
+    assert next_attempt - datetime.now(timezone.utc) > timedelta(seconds=outbox.retry_delay(2) - 5)
+    assert dead["status"] == "dead" and dead["last_error"] == "SMTPRecipientsRefused: x"
+
+    metrics = outbox.get_metrics()
+    assert metrics["sent"] == 1 and metrics["dead"] == 1
+    assert 9 < metrics["latency_p50"] < 60
+
+def test_retry_delay_backs_off():
+    assert [outbox.retry_delay(n) for n in (1, 2, 3)] == [outbox.RETRY_BACKOFF, outbox.RETRY_BACKOFF * 2, outbox.RETRY_BACKOFF * 4]
+
+def test_worker_drains_in_background():
+    batches = [[make_row(1), make_row(2)], []]
+    supabase = MagicMock()
+    supabase.rpc.return_value.execute.side_effect = lambda: MagicMock(data=batches.pop(0) if batches else [])
+    with patch("services.repositories.get_supabase", return_value=supabase), \
+         patch("services.outbox.email_service.send_many", side_effect=lambda emails: [True] * len(emails)):
+        worker = outbox.ensure_worker()
+        deadline = time.time() + 5
+        while outbox.get_metrics()["sent"] < 2 and time.time() < deadline:
+            time.sleep(0.01)
+        outbox.stop_worker()
+    assert outbox.get_metrics()["sent"] == 2
+    assert not worker.is_alive()
+
+def test_worker_starts_without_an_enqueue():
+    # Rows left by a previous process are sent as soon as the app serves a page
+    batches = [[make_row(1)]]
+    supabase = MagicMock()
+    supabase.rpc.return_value.execute.side_effect = lambda: MagicMock(data=batches.pop(0) if batches else [])
+    with patch("services.repositories.get_supabase", return_value=supabase), \
+         patch("services.outbox.email_service.send_many", side_effect=lambda emails: [Delivery()] * len(emails)):
+        assert outbox.start_worker() is outbox.start_worker()
+        deadline = time.time() + 5
+        while outbox.get_metrics()["sent"] < 1 and time.time() < deadline:
+            time.sleep(0.01)
+        outbox.stop_worker()
+    assert outbox.get_metrics()["sent"] == 1
+
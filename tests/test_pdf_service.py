@@ -0,0 +1,77 @@
+import sys
+import os
+import re
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from services import pdf_service
+from services.pdf_service import render_contract_pdf, render_contract_pdfs, get_template
+
+CONTRACT = {
+    "name": "João da Silva (Jr)", "cpf": "12345678909",
+    "address": "Rua X, 123 - Centro - CEP 01001000",
+    "phone": "11999999999", "email": "joao@empresa.com",
+    "start_date": "01/01/2024", "end_date": "01/10/2025", "months": 21,
+    "value_monthly_total": 150.0, "residual_value": None
+}
+PRODUCT = {"brand": "Samsung", "model": "Galaxy S23", "description": "", "imei": None}
+DATE = b"20240101000000"
+
+def legacy_render(contract_data, product_data):
+    data = pdf_service._render_with_fpdf(pdf_service._contract_fields(contract_data, product_data))
+    return re.sub(rb"D:\d{14}", b"D:" + DATE, data)
+
+def test_template_output_matches_fpdf_layout():
+    assert render_contract_pdf(CONTRACT, PRODUCT, {}, creation_date=DATE) == legacy_render(CONTRACT, PRODUCT)
+
+@pytest.mark.parametrize("overrides", [
+    {"address": "Rua muito longa " * 12},
+    {"name": "Linha 1\nLinha 2"},
+])
+def test_wrapping_values_fall_back_to_fpdf(overrides):
+    contract = dict(CONTRACT, **overrides)
+    assert not get_template().fits(pdf_service._contract_fields(contract, PRODUCT))
+    data = render_contract_pdf(contract, PRODUCT, {})
+    assert data.startswith(b"%PDF-1.3") and data.rstrip().endswith(b"%%EOF")
+
+def test_other_fpdf_versions_skip_the_template(monkeypatch):
+    monkeypatch.setattr(pdf_service.fpdf, "FPDF_VERSION", "2.7.0")
+    assert get_template() is None
+    data = render_contract_pdf(CONTRACT, PRODUCT, {})
+    assert re.sub(rb"D:\d{14}", b"D:" + DATE, data) == legacy_render(CONTRACT, PRODUCT)
+
+def test_batch_render():
+    items = [(dict(CONTRACT, cpf=str(i)), dict(PRODUCT, imei=f"35{i:013d}"), {}) for i in range(5)]
+    pdfs = render_contract_pdfs(items)
+    assert len(pdfs) == 5
+    assert len(set(pdfs)) == 5
+    date = re.search(rb"D:(\d{14})", pdfs[0]).group(1)
+    assert pdfs[3] == render_contract_pdf(*items[3], creation_date=date)
+
+def test_fingerprint_is_canonical():
+    reordered = dict(reversed(list(CONTRACT.items())))
+    assert pdf_service.contract_fingerprint(CONTRACT, PRODUCT) == pdf_service.contract_fingerprint(reordered, PRODUCT)
+    assert pdf_service.contract_fingerprint(CONTRACT, PRODUCT) != pdf_service.contract_fingerprint(CONTRACT, dict(PRODUCT, imei="1"))
+
+def test_fingerprint_ignores_unprinted_columns():
+    catalog_row = dict(PRODUCT, id="p1", image_url="https://x/a.png", active=False, created_at="2024-01-01")
+    assert pdf_service.contract_fingerprint(CONTRACT, catalog_row) == pdf_service.contract_fingerprint(CONTRACT, PRODUCT)
+
+def test_fingerprint_includes_template_version(monkeypatch):
+    before = pdf_service.contract_fingerprint(CONTRACT, PRODUCT)
+    monkeypatch.setattr(pdf_service, "TEMPLATE_VERSION", "test")
+    assert pdf_service.contract_fingerprint(CONTRACT, PRODUCT) != before
+
+def test_unchanged_inputs_are_not_rendered_again(monkeypatch):
+    from services import storage
+    monkeypatch.setattr(storage, "_storage", storage.MemoryStorage())
+    calls = []
+    original = pdf_service.render_contract_pdf
+    monkeypatch.setattr(pdf_service, "render_contract_pdf", lambda *a, **k: calls.append(a) or original(*a, **k))
+
+    first = pdf_service.generate_contract_pdf(CONTRACT, PRODUCT, {})
+    second = pdf_service.generate_contract_pdf(dict(CONTRACT), dict(PRODUCT), {})
+    assert first == second and len(calls) == 1
+
+    locations = pdf_service.generate_contract_pdfs([(CONTRACT, PRODUCT, {}), (CONTRACT, dict(PRODUCT, imei="2"), {})])
+    assert locations[0] == first and len(calls) == 2
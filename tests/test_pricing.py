@@ -1,5 +1,6 @@
 import unittest
-from services.pricing import calculate_contract_totals
+import datetime
+from services.pricing import calculate_contract_totals, prorate_factor, calculate_monthly_deduction
 
 class TestPricing(unittest.TestCase):
     def test_calculate_totals_all_values_present(self):
@@ -33,5 +34,18 @@ class TestPricing(unittest.TestCase):
         self.assertEqual(total, 0.0)
         self.assertEqual(residual, 0.0)
 
+    def test_prorate_factor(self):
+        month = datetime.date(2024, 2, 10)
+        self.assertEqual(prorate_factor(datetime.date(2024, 1, 15), month), 1.0)
+        self.assertEqual(prorate_factor(datetime.date(2024, 2, 1), month), 1.0)
+        self.assertAlmostEqual(prorate_factor(datetime.date(2024, 2, 15), month), 15 / 29)
+        self.assertAlmostEqual(prorate_factor(datetime.datetime(2024, 2, 29, 18, 0), month), 1 / 29)
+        self.assertEqual(prorate_factor(datetime.date(2024, 3, 1), month), 0.0)
+
+    def test_calculate_monthly_deduction(self):
+        product = {'monthly_price': 100.0, 'insurance_price': 50.0}
+        deduction = calculate_monthly_deduction(product, datetime.date(2024, 4, 16), datetime.date(2024, 4, 1))
+        self.assertEqual(deduction, 75.0)
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,32 +1,19 @@
 import sys
 import os
-import toml
 import pytest
-from supabase import create_client
 import time
 
 # Add project root to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-SECRETS_PATH = os.path.join(os.path.dirname(__file__), '..', 'secrets.toml')
+from services.sqlite_backend import SQLiteClient
 
 def get_test_supabase_client():
-    if not os.path.exists(SECRETS_PATH):
-        return None
-    
-    try:
-        secrets = toml.load(SECRETS_PATH)
-        url = secrets["supabase"]["url"]
-        key = secrets["supabase"]["key"]
-        return create_client(url, key)
-    except Exception as e:
-        print(f"Error loading secrets: {e}")
-        return None
+    # Embedded stand-in for the Supabase project (schema.sql)
+    return SQLiteClient()
 
 def test_create_and_fetch_product():
     supabase = get_test_supabase_client()
-    if not supabase:
-        pytest.skip("Supabase credentials not found or invalid.")
     
     # Random suffix to avoid clutter
     suffix = str(int(time.time()))
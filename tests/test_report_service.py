@@ -0,0 +1,56 @@
+import sys
+import os
+import io
+import csv
+import datetime
+from unittest.mock import MagicMock, patch
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from openpyxl import load_workbook
+from services.report_service import iter_payroll_deductions, build_payroll_report
+
+def make_rows(n):
+    return [
+        {"user_id": str(i), "name": f"Func {i}", "cpf": f"{i:011d}", "contracts": 1,
+         "monthly_total": 150.0, "deduction": 75.5}
+        for i in range(n)
+    ]
+
+def mock_rpc(rows):
+    """Supabase mock whose rpc().range(a, b) serves slices of `rows`."""
+    supabase = MagicMock()
+
+    def ranged(start, end):
+        query = MagicMock()
+        query.execute.return_value.data = rows[start:end + 1]
+        return query
+
+    supabase.rpc.return_value.range.side_effect = ranged
+    return supabase
+
+def test_iter_payroll_deductions_pages_through_rpc():
+    supabase = mock_rpc(make_rows(25))
+    with patch("services.repositories.get_supabase", return_value=supabase):
+        rows = list(iter_payroll_deductions("company-1", datetime.date(2024, 5, 17), page_size=10))
+
+    assert len(rows) == 25
+    supabase.rpc.assert_called_with("payroll_deductions", {"p_company_id": "company-1", "p_month": "2024-05-01"})
+    assert supabase.rpc.return_value.range.call_count == 3
+
+def test_build_csv_report():
+    with patch("services.repositories.get_supabase", return_value=mock_rpc(make_rows(3))):
+        report = build_payroll_report("company-1", datetime.date(2024, 5, 1), "csv")
+
+    lines = list(csv.reader(io.StringIO(report.read().decode("utf-8-sig"))))
+    assert lines[0] == ["Nome", "CPF", "Contratos", "Mensalidade (R$)", "Desconto (R$)"]
+    assert lines[1] == ["Func 0", "00000000000", "1", "150.0", "75.5"]
+    assert len(lines) == 4
+
+def test_build_xlsx_report():
+    with patch("services.repositories.get_supabase", return_value=mock_rpc(make_rows(3))):
+        report = build_payroll_report("company-1", datetime.date(2024, 5, 1), "xlsx")
+
+    ws = load_workbook(report).active
+    rows = list(ws.iter_rows(values_only=True))
+    assert rows[0][0] == "Nome"
+    assert rows[3] == ("Func 2", "00000000002", 1, 150.0, 75.5)
@@ -7,7 +7,7 @@ from unittest.mock import MagicMock, patch
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from services.supabase_client import SupabaseService, get_supabase
-from services.auth_service import login_by_cpf, require_auth, logout
+from services.auth_service import login_by_cpf, require_auth, logout, _profile_cache, _company_cache
 from services.pdf_service import generate_contract_pdf
 
 # Mock Streamlit secrets and session state
@@ -24,6 +24,8 @@ def mock_supabase():
         mock_create.return_value = client_instance
         # Reset singleton logic for tests
         SupabaseService._instance = None 
+        _profile_cache.clear()
+        _company_cache.clear()
         yield client_instance
 
 def test_supabase_singleton(mock_supabase):
@@ -40,7 +42,8 @@ from services.email_service import send_email
 def test_login_success(mock_supabase):
     """Test successful login with valid CPF and DOB."""
     # Mock DB response
-    mock_user = {"id": "123", "name": "Test User", "role": "employee", "active": True}
+    mock_user = {"id": "123", "name": "Test User", "cpf": "12345678900", "birth_date": "1990-01-01",
+                 "role": "employee", "active": True}
     mock_response = MagicMock()
     mock_response.data = [mock_user]
     
@@ -59,7 +62,7 @@ def test_login_success(mock_supabase):
         
         assert success is True
         assert mock_st.session_state["logged_in"] is True
-        assert mock_st.session_state["user"] == mock_user
+        assert mock_st.session_state["user"] == dict(mock_user, companies={})
 
 def test_login_invalid_cpf(mock_supabase):
     mock_response = MagicMock()
@@ -98,3 +101,32 @@ def test_pdf_generation():
         # Cleanup
         if os.path.exists(path):
             os.remove(path)
+
+def test_login_reuses_cached_profile(mock_supabase):
+    """Repeated logins for a CPF hit the database once; wrong birth dates fail."""
+    mock_user = {"id": "123", "name": "Test User", "cpf": "12345678900", "birth_date": "1990-01-01",
+                 "role": "employee", "active": True, "company_id": "c1"}
+    profiles = mock_supabase.table.return_value.select.return_value.eq.return_value
+    profiles.execute.return_value.data = [mock_user]
+
+    with patch('services.auth_service.st') as mock_st:
+        mock_st.session_state = {}
+        assert login_by_cpf("123.456.789-00", "1990-01-01")[0] is True
+        assert login_by_cpf("12345678900", "1990-01-01")[0] is True
+        assert login_by_cpf("12345678900", "2000-01-01")[0] is False
+
+    # One profile query plus one company query
+    assert profiles.execute.call_count == 2
+    select_args = [c.args[0] for c in mock_supabase.table.return_value.select.call_args_list]
+    assert "*" not in " ".join(select_args)
+
+def test_invalidate_profile_reloads(mock_supabase):
+    from services.auth_service import load_profile, invalidate_profile
+    profiles = mock_supabase.table.return_value.select.return_value.eq.return_value
+    profiles.execute.return_value.data = [{"id": "1", "cpf": "12345678900", "phone": "old", "company_id": None}]
+    assert load_profile("12345678900")["phone"] == "old"
+
+    profiles.execute.return_value.data = [{"id": "1", "cpf": "12345678900", "phone": "new", "company_id": None}]
+    assert load_profile("12345678900")["phone"] == "old"
+    invalidate_profile("123.456.789-00")
+    assert load_profile("12345678900")["phone"] == "new"
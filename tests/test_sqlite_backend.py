@@ -0,0 +1,132 @@
+import sys
+import os
+import datetime
+from unittest.mock import patch
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pandas as pd
+import pytest
+from postgrest.exceptions import APIError
+from services.repositories import OrderRepository, CompanyRepository, ProductRepository
+from services.order_queue import fetch_order_page
+from services.pricing import calculate_monthly_deduction
+from services.report_service import iter_payroll_deductions
+from services.employee_import import import_employees
+from services.sqlite_backend import SEED_COMPANY_ID as COMPANY_ID
+
+@pytest.fixture
+def add_order(add_orders):
+    """Factory for an order created (and signed) at `created_at`."""
+    def add(created_at, status="contract_signed"):
+        order, = add_orders(status=status, created_at=created_at, signed_at=created_at,
+                            delivery_address={"cep": "01001-000"})
+        return order
+    return add
+
+def test_defaults_types_and_embedding(db, add_order):
+    order = add_order("2024-05-10T10:00:00+00:00")
+    assert len(order["id"]) == 36
+    assert order["delivery_address"] == {"cep": "01001-000"}
+
+    res = db.table("orders").select("id, user_profiles(name, cpf), products(brand, active)").execute()
+    assert res.data == [{
+        "id": order["id"],
+        "user_profiles": {"name": "João Silva", "cpf": "11122233396"},
+        "products": {"brand": "Apple", "active": True},
+    }]
+    company = db.table("companies").select("name, orders(status)").execute().data[0]
+    assert company == {"name": "Empresa Demo", "orders": [{"status": "contract_signed"}]}
+
+def test_filters_order_range_and_count(db):
+    res = db.table("user_profiles").select("name", count="exact").in_("role", ["admin", "dispatch"]).order("name").execute()
+    assert [r["name"] for r in res.data] == ["Admin Trek", "Expedição"]
+    assert res.count == 2
+    assert db.table("products").select("model").ilike("model", "%iphone%").execute().data == [{"model": "iPhone 14"}]
+    assert len(db.table("user_profiles").select("id").order("name").range(1, 5).execute().data) == 2
+    assert db.table("user_profiles").select("id").is_("email", "null").execute().data
+
+    with pytest.raises(APIError):
+        db.table("products").select("missing_column").execute()
+
+def test_unique_violation_and_upsert(db):
+    with pytest.raises(APIError) as e:
+        db.table("companies").insert({"cnpj": "00.000.000/0001-00", "name": "Dup"}).execute()
+    assert e.value.code == "23505"
+
+    db.table("user_profiles").upsert(
+        [{"cpf": "11122233396", "name": "João S."}, {"cpf": "52998224725", "name": "Carla"}],
+        on_conflict="cpf", returning="minimal"
+    ).execute()
+    rows = db.table("user_profiles").select("name, role, birth_date").in_("cpf", ["11122233396", "52998224725"]).order("cpf").execute().data
+    # Existing rows keep the columns not sent; new ones get defaults
+    assert rows == [
+        {"name": "João S.", "role": "employee", "birth_date": "1995-05-20"},
+        {"name": "Carla", "role": "employee", "birth_date": None},
+    ]
+
+def test_order_queue_keyset_pages(db, add_order):
+    for day in range(1, 6):
+        add_order(f"2024-05-{day:02d}T10:00:00.5+00:00")
+    add_order("2024-05-05T10:00:00.5+00:00")
+
+    with patch("services.repositories.get_supabase", return_value=db):
+        seen, cursor = [], None
+        while True:
+            page, cursor = fetch_order_page(cursor, page_size=4)
+            seen.extend(page)
+            if cursor is None:
+                break
+        assert len({o["id"] for o in seen}) == 6
+        assert [o["created_at"][:10] for o in seen] == sorted((o["created_at"][:10] for o in seen), reverse=True)
+
+        filtered, _ = fetch_order_page(date_from=datetime.date(2024, 5, 2), date_to=datetime.date(2024, 5, 3))
+        assert len(filtered) == 2
+
+def test_payroll_deductions_rpc(db, add_order):
+    add_order("2024-04-20T10:00:00+00:00")   # full month
+    add_order("2024-05-16T10:00:00+00:00")   # pro-rated: 16/31
+    add_order("2024-06-01T10:00:00+00:00")   # next month, ignored
+
+    with patch("services.repositories.get_supabase", return_value=db):
+        rows = list(iter_payroll_deductions(COMPANY_ID, datetime.date(2024, 5, 20), page_size=1))
+    assert len(rows) == 1
+    assert rows[0]["contracts"] == 2
+    assert rows[0]["deduction"] == round(199.9 + 199.9 * 16 / 31, 2)
+
+def test_payroll_deductions_rpc_matches_pricing(db, add_order):
+    product = db.table("products").select("*").eq("brand", "Apple").execute().data[0]
+    month = datetime.date(2024, 2, 10)  # leap February
+    for signed in ["2024-01-31T23:00:00+00:00", "2024-02-01T00:00:00+00:00", "2024-02-15T10:00:00+00:00",
+                   "2024-02-29T18:00:00+00:00", "2024-03-01T00:00:00+00:00"]:
+        order = add_order(signed)
+        rows = db.rpc("payroll_deductions", {"p_company_id": COMPANY_ID, "p_month": month.isoformat()}).execute().data
+        expected = calculate_monthly_deduction(product, datetime.datetime.fromisoformat(signed), month)
+        assert (rows[0]["deduction"] if rows else 0.0) == expected, signed
+        db.table("orders").update({"status": "cancelled"}).eq("id", order["id"]).execute()
+
+def test_claim_email_outbox_rpc(db):
+    db.table("email_outbox").insert([
+        {"to_email": f"u{i}@x.com", "subject": "s", "body": "b"} for i in range(3)
+    ]).execute()
+    first = db.rpc("claim_email_outbox", {"p_limit": 2, "p_lease_seconds": 60}).execute().data
+    second = db.rpc("claim_email_outbox", {"p_limit": 2, "p_lease_seconds": 60}).execute().data
+    assert len(first) == 2 and len(second) == 1
+    assert all(r["status"] == "sending" and r["attempts"] == 1 for r in first + second)
+
+def test_employee_import_and_repositories(db, add_order):
+    df = pd.DataFrame({"nome": ["Carla"], "cpf": ["529.982.247-25"], "email": ["carla@x.com"]})
+    with patch("services.repositories.get_supabase", return_value=db):
+        result = import_employees([df], COMPANY_ID, "roster.csv")
+    assert result["imported"] == 1
+    assert db.table("movements").select("filename").execute().data == [{"filename": "roster.csv"}]
+
+    orders = OrderRepository(db)
+    order = add_order("2024-05-10T10:00:00+00:00")
+    add_order("2024-05-11T10:00:00+00:00", status="dispatched")
+    assert [o["id"] for o in orders.for_dispatch()] == [order["id"]]
+    assert orders.update(order["id"], {"imei": "356938035643809", "status": "imei_linked"})["status"] == "imei_linked"
+
+    assert [c["name"] for c in CompanyRepository(db).list_names()] == ["Empresa Demo"]
+    products = ProductRepository(db)
+    products.set_active(products.list_all()[0]["id"], False)
+    assert len(products.list_active()) == 1
@@ -0,0 +1,89 @@
+import sys
+import os
+import io
+import hashlib
+import threading
+from unittest.mock import MagicMock
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from services import storage
+from services.storage import LocalContentStore, MemoryStorage, SupabaseStorage
+
+DATA = b"%PDF-1.3 fake contract" * 10000
+
+def test_local_store_is_content_addressed(tmp_path):
+    store = LocalContentStore(str(tmp_path))
+    key = hashlib.sha256(DATA).hexdigest()
+
+    path = store.put(DATA)
+    assert path == os.path.join(str(tmp_path), key[:2], f"{key}.pdf")
+    assert store.exists(key) and store.get(key) == DATA
+    # Same content, same location; no leftover temporary files
+    assert store.put(io.BytesIO(DATA)) == path
+    assert [p for p in os.listdir(tmp_path) if p.endswith(".part")] == []
+
+def test_local_store_concurrent_writers(tmp_path):
+    store = LocalContentStore(str(tmp_path))
+    paths = []
+    threads = [threading.Thread(target=lambda: paths.append(store.put(DATA))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(set(paths)) == 1
+    with open(paths[0], "rb") as f:
+        assert f.read() == DATA
+
+def test_local_store_cleans_up_failed_write(tmp_path):
+    class Broken(io.BytesIO):
+        def read(self, n=-1):
+            raise IOError("disk full")
+
+    store = LocalContentStore(str(tmp_path))
+    with pytest.raises(IOError):
+        store.put(Broken())
+    assert os.listdir(tmp_path) == []
+
+def test_memory_storage_explicit_key():
+    store = MemoryStorage()
+    assert store.put(DATA, key="abc") == "memory://abc.pdf"
+    assert store.exists("abc") and not store.exists("def")
+
+def test_supabase_storage_uploads_to_bucket():
+    client = MagicMock()
+    store = SupabaseStorage("contracts", client=client)
+    key = hashlib.sha256(DATA).hexdigest()
+
+    location = store.put(io.BytesIO(DATA))
+    assert location == f"supabase://contracts/{key[:2]}/{key}.pdf"
+    client.storage.from_.assert_called_with("contracts")
+    path, body, options = client.storage.from_.return_value.upload.call_args[0]
+    assert path == f"{key[:2]}/{key}.pdf" and body == DATA
+    assert options["content-type"] == "application/pdf"
+
+def test_save_contract_pdf_uses_configured_storage(monkeypatch):
+    from services.pdf_service import generate_contract_pdf
+    store = MemoryStorage()
+    monkeypatch.setattr(storage, "_storage", store)
+
+    location = generate_contract_pdf({"name": "Test", "cpf": "123"}, {"model": "X"}, {})
+    assert location.startswith("memory://")
+    assert len(store.objects) == 1
+
+def test_storage_interface_is_abstract():
+    with pytest.raises(TypeError):
+        storage.ContractStorage()
+
+def test_email_attaches_contract_from_storage(monkeypatch):
+    from services.email_service import build_message
+    store = MemoryStorage()
+    monkeypatch.setattr(storage, "_storage", store)
+    location = store.put(DATA, key="abc")
+
+    msg = build_message("noreply@trek.com.br", "joao@empresa.com", "Contrato", "Segue.", location)
+    attachment = msg.get_payload()[1]
+    assert attachment.get_filename() == "abc.pdf"
+    assert attachment.get_payload(decode=True) == DATA
+    with pytest.raises(KeyError):
+        build_message("noreply@trek.com.br", "joao@empresa.com", "Contrato", "Segue.", "memory://missing.pdf")
@@ -0,0 +1,118 @@
+import sys
+import os
+import time
+from unittest.mock import patch
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from streamlit.testing.v1 import AppTest
+from services import tracing
+from services.sqlite_backend import SQLiteClient
+from services.supabase_client import SupabaseService
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+@pytest.fixture(autouse=True)
+def empty_buffer():
+    tracing.clear()
+    yield
+    tracing.clear()
+
+@pytest.fixture
+def session_state():
+    state = {}
+    with patch("services.tracing._session_state", return_value=state):
+        yield state
+
+def test_nested_spans_and_breakdown():
+    @tracing.traced("work.step")
+    def step():
+        time.sleep(0.01)
+
+    with tracing.trace("job", kind="script") as root:
+        with tracing.span("work.outer"):
+            step()
+            step()
+        with pytest.raises(ValueError), tracing.span("work.failing"):
+            raise ValueError
+
+    assert tracing.recent_traces() == [root]
+    rows = tracing.breakdown(root)
+    assert [(r["depth"], r["name"]) for r in rows] == [
+        (0, "job"), (1, "work.outer"), (2, "work.step"), (2, "work.step"), (1, "work.failing")
+    ]
+    assert rows[1]["duration"] >= 0.02
+    assert rows[1]["self_time"] < rows[1]["duration"]
+    assert rows[4]["error"] == "ValueError"
+
+    summary = {r["name"]: r for r in tracing.summarize([root])}
+    assert summary["work.step"]["count"] == 2
+    assert summary["work.failing"]["errors"] == 1
+
+def test_spans_outside_a_trace_are_not_recorded():
+    with tracing.span("orphan"):
+        pass
+    assert tracing.traced()(lambda: 42)() == 42
+    assert tracing.recent_traces() == []
+
+def test_ring_buffer_is_bounded():
+    for i in range(tracing.TRACE_BUFFER_SIZE + 10):
+        with tracing.trace(f"t{i}"):
+            pass
+    traces = tracing.recent_traces()
+    assert len(traces) == tracing.TRACE_BUFFER_SIZE
+    assert traces[0].name == f"t{tracing.TRACE_BUFFER_SIZE + 9}"
+
+def test_reruns_and_early_stops(session_state):
+    tracing.begin_rerun("Store")
+    with tracing.span("db.products.select"):
+        pass
+    tracing.end_rerun()
+
+    # st.stop()/st.rerun() skip end_rerun(); the next rerun closes it
+    stopped = tracing.begin_rerun("Contract")
+    with tracing.span("pdf.generate"):
+        time.sleep(0.01)
+    time.sleep(0.05)
+    tracing.begin_rerun("Admin")
+
+    traces = tracing.recent_traces(kind="rerun")
+    assert [t.name for t in traces] == ["Contract", "Store"]
+    assert traces[0].attrs["stopped"] is True
+    assert 0.01 <= stopped.duration < 0.05
+    assert tracing.slowest_traces(1, kind="rerun") == [stopped]
+
+def test_traced_client_names_database_spans():
+    db = SQLiteClient(seed=True)
+    client = tracing.TracedClient(db)
+    with tracing.trace("job") as root:
+        products = client.table("products").select("id, brand").eq("active", True).order("brand").execute().data
+        client.table("products").update({"active": False}).eq("id", products[0]["id"]).execute()
+        client.rpc("claim_email_outbox", {"p_limit": 1}).execute()
+    db.close()
+
+    assert len(products) == 2
+    assert [c.name for c in root.children] == [
+        "db.products.select", "db.products.update", "db.rpc.claim_email_outbox"
+    ]
+
+def test_admin_performance_tab():
+    service = SupabaseService()
+    previous, service._client = service._client, SQLiteClient(seed=True)
+    service._client.table("products").update({"image_url": None}).neq("brand", "").execute()  # no downloads
+    try:
+        with tracing.trace("Contract", kind="rerun"):
+            with tracing.span("pdf.generate"):
+                pass
+
+        at = AppTest.from_file(os.path.join(ROOT, "pages", "1_Admin.py"), default_timeout=30)
+        at.session_state["logged_in"] = True
+        at.session_state["role"] = "admin"
+        at.session_state["user"] = {"name": "Admin Trek", "role": "admin"}
+        at.run()
+        assert not at.exception
+        assert any(tab.label == "Desempenho" for tab in at.tabs)
+        assert "Detalhar rerun" in [s.label for s in at.selectbox]
+    finally:
+        service._client.close()
+        service._client = previous
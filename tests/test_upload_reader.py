@@ -0,0 +1,41 @@
+import sys
+import os
+import io
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from openpyxl import Workbook
+from services.upload_reader import iter_batches, read_preview
+
+def make_csv(rows):
+    lines = ["Nome,CPF,Email"] + [f"Func {i},{i:011d},f{i}@x.com" for i in range(rows)]
+    return io.BytesIO("\n".join(lines).encode())
+
+def make_xlsx(rows):
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["Nome", "CPF", "Email"])
+    for i in range(rows):
+        # CPFs typed as numbers in Excel lose their leading zeros
+        ws.append([f"Func {i}", float(1000 + i), f"f{i}@x.com"])
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    buffer.seek(0)
+    return buffer
+
+def test_csv_batches_keep_cpf_as_text():
+    batches = list(iter_batches(make_csv(25), "roster.csv", batch_size=10))
+    assert [len(b) for b in batches] == [10, 10, 5]
+    assert batches[0]["CPF"].iloc[0] == "00000000000"
+
+def test_xlsx_batches():
+    batches = list(iter_batches(make_xlsx(25), "roster.xlsx", batch_size=10))
+    assert [len(b) for b in batches] == [10, 10, 5]
+    assert list(batches[0].columns) == ["Nome", "CPF", "Email"]
+    assert batches[2]["CPF"].iloc[-1] == "1024"
+
+def test_preview_reads_first_rows_only():
+    csv = make_csv(100)
+    assert len(read_preview(csv, "roster.csv", n=3)) == 3
+    assert len(read_preview(make_xlsx(100), "roster.XLSX", n=3)) == 3
+    # Preview rewinds, so the same upload can still be streamed afterwards
+    assert sum(len(b) for b in iter_batches(csv, "roster.csv", batch_size=40)) == 100